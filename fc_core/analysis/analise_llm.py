@@ -0,0 +1,162 @@
+"""
+Análise jurídica e resumo de documentos via LLM local (Ollama).
+
+- Modo "combinado" (padrão): análise e resumo numa única passada pelo texto.
+  O modo "separado" faz duas chamadas, como o fluxo antigo.
+- Textos acima de `llm_chunk_caracteres` passam por map-reduce. Cada trecho
+  é analisado em paralelo, e as respostas parciais são consolidadas em
+  rodadas até sobrar uma.
+- Toda chamada passa pelo CacheLLM, com chave (modelo, versão do prompt,
+  hash da entrada). O resultado final do documento também é cacheado, então
+  reanalisar um documento idêntico não chama o modelo.
+
+Suba PROMPT_VERSAO sempre que editar um template.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from string import Template
+from typing import Any, Dict, List, Optional
+import json
+import logging
+import threading
+
+from fc_core.analysis.indexacao import dividir_texto
+from fc_core.analysis.llm_cache import CacheLLM, chave_llm
+from fc_core.analysis.ollama_http import OllamaHTTP
+from fc_core.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PROMPT_VERSAO = "1"
+
+FORMATOS = {
+    "completo": '{"analise": {"tipo_documento": "", "partes": [], "pedidos": [], "valores": [], "prazos": [], "riscos": []}, "resumo": ""}',
+    "analise": '{"analise": {"tipo_documento": "", "partes": [], "pedidos": [], "valores": [], "prazos": [], "riscos": []}}',
+    "resumo": '{"resumo": ""}',
+}
+
+INSTRUCOES = {
+    "completo": "Analise o documento jurídico abaixo (tipo, partes, pedidos, valores, prazos e riscos) e escreva um resumo objetivo em até 10 linhas.",
+    "analise": "Analise o documento jurídico abaixo: tipo, partes, pedidos, valores, prazos e riscos.",
+    "resumo": "Escreva um resumo objetivo, em até 10 linhas, do documento jurídico abaixo.",
+}
+
+PROMPT_MAPA = Template(
+    "Você é um assistente jurídico brasileiro. $instrucao\n"
+    "${trecho}"
+    "Responda somente com JSON no formato:\n$formato\n\n"
+    "Documento:\n$texto"
+)
+
+PROMPT_REDUCAO = Template(
+    "Você é um assistente jurídico brasileiro. As respostas abaixo foram geradas "
+    "para trechos consecutivos de um mesmo documento. Consolide-as numa única "
+    "resposta, sem repetir itens, no formato:\n$formato\n\n"
+    "Respostas parciais:\n$parciais"
+)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _executor_map() -> ThreadPoolExecutor:
+    """Pool compartilhado: limita as chamadas simultâneas ao Ollama no processo"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.llm_map_workers, thread_name_prefix="llm-map")
+        return _executor
+
+
+class AnalisadorLLM:
+    def __init__(
+        self,
+        cliente: Optional[OllamaHTTP] = None,
+        cache: Optional[CacheLLM] = None,
+        modelo: Optional[str] = None,
+        tamanho_chunk: Optional[int] = None
+    ):
+        self.cliente = cliente or OllamaHTTP()
+        self.cache = cache or CacheLLM()
+        self.modelo = modelo or settings.llm_model
+        self.tamanho_chunk = tamanho_chunk or settings.llm_chunk_caracteres
+
+    def _chamar(self, etapa: str, prompt: str, entrada: str) -> Dict[str, Any]:
+        chave = chave_llm(self.modelo, f"{etapa}:{PROMPT_VERSAO}", entrada)
+        em_cache = self.cache.get(chave)
+        if em_cache is not None:
+            return em_cache
+
+        resposta = self.cliente.gerar(prompt, self.modelo, json_mode=True, opcoes={"temperature": 0})
+        try:
+            valor = json.loads(resposta)
+        except ValueError:
+            logger.warning(f"Resposta do LLM não é JSON válido ({etapa}); não será cacheada")
+            return {"texto_bruto": resposta}
+        self.cache.set(chave, valor)
+        return valor
+
+    def _mapa(self, tarefa: str, texto: str, parte: int = 0, total: int = 1) -> Dict[str, Any]:
+        trecho = f"Este é o trecho {parte + 1} de {total} do documento.\n" if total > 1 else ""
+        prompt = PROMPT_MAPA.substitute(
+            instrucao=INSTRUCOES[tarefa], trecho=trecho, formato=FORMATOS[tarefa], texto=texto
+        )
+        return self._chamar(f"mapa-{tarefa}", prompt, f"{parte}/{total}\0{texto}")
+
+    def _reduzir(self, tarefa: str, parciais: List[Dict[str, Any]]) -> Dict[str, Any]:
+        entrada = "\n".join(json.dumps(p, ensure_ascii=False) for p in parciais)
+        prompt = PROMPT_REDUCAO.substitute(formato=FORMATOS[tarefa], parciais=entrada)
+        return self._chamar(f"reducao-{tarefa}", prompt, entrada)
+
+    def _agrupar(self, parciais: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Agrupa respostas parciais que cabem juntas numa chamada (mínimo de 2 por grupo)"""
+        grupos, atual, tamanho = [], [], 0
+        for parcial in parciais:
+            n = len(json.dumps(parcial, ensure_ascii=False))
+            if len(atual) >= 2 and tamanho + n > self.tamanho_chunk:
+                grupos.append(atual)
+                atual, tamanho = [], 0
+            atual.append(parcial)
+            tamanho += n
+        if len(atual) == 1 and grupos:
+            grupos[-1].append(atual[0])
+        elif atual:
+            grupos.append(atual)
+        return grupos
+
+    def _executar(self, tarefa: str, texto: str) -> Dict[str, Any]:
+        if len(texto) <= self.tamanho_chunk:
+            return self._mapa(tarefa, texto)
+
+        chunks = dividir_texto(texto, tamanho=self.tamanho_chunk)
+        executor = _executor_map()
+        parciais = list(executor.map(
+            lambda item: self._mapa(tarefa, item[1], item[0], len(chunks)), enumerate(chunks)
+        ))
+        while len(parciais) > 1:
+            parciais = list(executor.map(lambda grupo: self._reduzir(tarefa, grupo), self._agrupar(parciais)))
+        return parciais[0]
+
+    def analisar(self, texto: str, modo: str = "combinado") -> Dict[str, Any]:
+        """Retorna {"analise": ..., "resumo": ...}"""
+        if modo not in ("combinado", "separado"):
+            raise ValueError(f"Modo {modo} inválido")
+
+        chave = chave_llm(self.modelo, f"documento-{modo}:{PROMPT_VERSAO}:{self.tamanho_chunk}", texto)
+        em_cache = self.cache.get(chave)
+        if em_cache is not None:
+            return em_cache
+
+        if modo == "combinado":
+            completo = self._executar("completo", texto)
+            analise, resumo = completo, completo
+        else:
+            analise, resumo = self._executar("analise", texto), self._executar("resumo", texto)
+
+        resultado = {
+            "analise": analise.get("analise", analise),
+            "resumo": resumo.get("resumo", ""),
+        }
+        if "texto_bruto" not in analise and "texto_bruto" not in resumo:
+            self.cache.set(chave, resultado)
+        return resultado
@@ -0,0 +1,80 @@
+"""
+Benchmark de recall/latência do índice IVF local contra a busca exata.
+
+Uso:
+    python -m fc_core.analysis.benchmark_ann --n 200000 --dim 384 --consultas 200
+
+Gera vetores sintéticos agrupados (parecidos com embeddings reais, que não são
+uniformes), indexa num diretório temporário e compara o top-k do IVF com o
+top-k exato para alguns valores de nprobe.
+"""
+from pathlib import Path
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from fc_core.analysis.indice_local import IndiceVetorialLocal
+
+
+def vetores_sinteticos(n: int, dim: int, grupos: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centros = rng.standard_normal((grupos, dim)).astype(np.float32)
+    rotulos = rng.integers(0, grupos, size=n)
+    return centros[rotulos] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def medir(indice: IndiceVetorialLocal, consultas: np.ndarray, k: int, **kwargs):
+    latencias, resultados = [], []
+    for q in consultas:
+        inicio = time.perf_counter()
+        resultados.append([row for row, _ in indice.buscar_vetor(q, k, **kwargs)])
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    return resultados, np.array(latencias)
+
+
+def executar(n: int, dim: int, n_consultas: int, k: int, nprobes, diretorio: str, lote: int = 10_000):
+    indice = IndiceVetorialLocal(diretorio)
+    dados = vetores_sinteticos(n + n_consultas, dim, grupos=max(32, n // 2000))
+    base, consultas = dados[:n], dados[n:]
+
+    inicio = time.perf_counter()
+    for i in range(0, n, lote):
+        fatia = base[i:i + lote]
+        ids = [f"{j}:0" for j in range(i, i + len(fatia))]
+        metadados = [{"processo_id": str(j % 1000), "cliente": None} for j in range(i, i + len(fatia))]
+        indice.upsert(ids, fatia, [""] * len(fatia), metadados)
+    if indice._centroides is None:
+        indice.treinar()
+    print(f"indexação: {n} vetores dim {dim} em {time.perf_counter() - inicio:.1f}s")
+
+    exatos, lat = medir(indice, consultas, k, exato=True)
+    print(f"exato      p50 {np.percentile(lat, 50):8.2f} ms  p95 {np.percentile(lat, 95):8.2f} ms")
+
+    for nprobe in nprobes:
+        aprox, lat = medir(indice, consultas, k, nprobe=nprobe)
+        recall = np.mean([len(set(a) & set(e)) / len(e) for a, e in zip(aprox, exatos)])
+        print(f"nprobe {nprobe:3d} p50 {np.percentile(lat, 50):8.2f} ms  p95 {np.percentile(lat, 95):8.2f} ms  recall@{k} {recall:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--consultas", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--dir", help="Diretório do índice (padrão: temporário)")
+    args = parser.parse_args()
+
+    if args.dir:
+        Path(args.dir).mkdir(parents=True, exist_ok=True)
+        executar(args.n, args.dim, args.consultas, args.k, args.nprobe, args.dir)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            executar(args.n, args.dim, args.consultas, args.k, args.nprobe, tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Pipeline de indexação de documentos no vector store.
+
+O texto extraído (Documento.texto_extraido) é dividido em chunks, os chunks
+de vários documentos são embeddados em lotes e enviados ao índice com
+upsert. Cada documento indexado fica registrado em ``documentos_indexados``
+com o hash do texto indexado e o modelo; documentos cujo texto não mudou
+são ignorados (um novo OCR do mesmo arquivo muda o texto, não o arquivo).
+
+O vector store precisa expor:
+    upsert(ids, vetores, textos, metadados)
+    remover(ids_prefixo)  # remove todos os chunks de um documento
+"""
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Protocol
+import hashlib
+import logging
+import time
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from fc_core.core.config import get_settings
+from fc_core.core.models import Documento, DocumentoIndexado, Processo
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class IndiceVetorial(Protocol):
+    def upsert(self, ids: List[str], vetores: List[List[float]], textos: List[str], metadados: List[dict]): ...
+    def remover(self, ids_prefixo: str): ...
+
+
+Embedder = Callable[[List[str]], List[List[float]]]
+
+
+def dividir_texto(texto: str, tamanho: int = None, sobreposicao: int = None) -> List[str]:
+    """Divide o texto em janelas de ~`tamanho` caracteres, quebrando em espaços"""
+    tamanho = tamanho or settings.chunk_tamanho
+    sobreposicao = sobreposicao if sobreposicao is not None else settings.chunk_sobreposicao
+    texto = " ".join((texto or "").split())
+    chunks = []
+    inicio = 0
+    while inicio < len(texto):
+        fim = min(inicio + tamanho, len(texto))
+        if fim < len(texto):
+            corte = texto.rfind(" ", inicio + tamanho // 2, fim)
+            fim = corte if corte > inicio else fim
+        chunks.append(texto[inicio:fim].strip())
+        if fim >= len(texto):
+            break
+        inicio = max(fim - sobreposicao, inicio + 1)
+    return [c for c in chunks if c]
+
+
+def hash_texto(texto: Optional[str]) -> str:
+    return hashlib.sha256((texto or "").encode("utf-8")).hexdigest()
+
+
+def documentos_pendentes(db: Session, modelo: str):
+    """Documentos com texto ainda não indexados (ou com texto/modelo alterado)"""
+    return db.query(Documento, Processo.cliente).outerjoin(
+        DocumentoIndexado, DocumentoIndexado.documento_id == Documento.id
+    ).outerjoin(
+        Processo, Processo.id == Documento.processo_id
+    ).filter(
+        Documento.texto_extraido.isnot(None),
+        or_(
+            DocumentoIndexado.documento_id.is_(None),
+            Documento.texto_sha256.is_(None),
+            DocumentoIndexado.texto_sha256.is_(None),
+            DocumentoIndexado.texto_sha256 != Documento.texto_sha256,
+            DocumentoIndexado.modelo != modelo
+        )
+    )
+
+
+class IndexadorDocumentos:
+    def __init__(self, indice: IndiceVetorial, embed: Embedder, modelo: Optional[str] = None, batch_size: Optional[int] = None):
+        self.indice = indice
+        self.embed = embed
+        self.modelo = modelo or settings.embedding_model
+        self.batch_size = batch_size or settings.embedding_batch_size
+
+    def _lotes(self, itens: Iterable) -> Iterator[list]:
+        lote = []
+        for item in itens:
+            lote.append(item)
+            if len(lote) >= self.batch_size:
+                yield lote
+                lote = []
+        if lote:
+            yield lote
+
+    def indexar(self, db: Session, documentos: Iterable[tuple]) -> Dict[str, int]:
+        """
+        Indexa (documento, cliente) em lotes de embedding compartilhados entre documentos.
+        Um documento só é marcado como indexado depois de todos os seus chunks.
+        """
+        chunks = []
+        docs = []
+        for documento, cliente in documentos:
+            if documento.texto_sha256 is None:  # Texto gravado antes do hash existir
+                documento.texto_sha256 = hash_texto(documento.texto_extraido)
+            docs.append(documento)
+            self.indice.remover(f"{documento.id}:")
+            metadados = {
+                "documento_id": str(documento.id),
+                "processo_id": str(documento.processo_id) if documento.processo_id else None,
+                "cliente": cliente,
+                "sha256_hash": documento.sha256_hash,
+            }
+            for i, texto in enumerate(dividir_texto(documento.texto_extraido)):
+                chunks.append((f"{documento.id}:{i}", texto, dict(metadados, chunk=i)))
+
+        for lote in self._lotes(chunks):
+            ids, textos, metadados = zip(*lote)
+            vetores = self.embed(list(textos))
+            self.indice.upsert(list(ids), vetores, list(textos), list(metadados))
+
+        agora = datetime.now(timezone.utc)
+        contagem = {}
+        for _, _, meta in chunks:
+            contagem[meta["documento_id"]] = contagem.get(meta["documento_id"], 0) + 1
+        for documento in docs:
+            db.merge(DocumentoIndexado(
+                documento_id=documento.id,
+                sha256_hash=documento.sha256_hash,
+                texto_sha256=documento.texto_sha256,
+                modelo=self.modelo,
+                chunks=contagem.get(str(documento.id), 0),
+                indexado_em=agora
+            ))
+        db.commit()
+        return {"documentos": len(docs), "chunks": len(chunks)}
+
+    def backfill(self, db: Session, docs_por_rodada: int = 50, progresso: Optional[Callable[[dict], None]] = None) -> dict:
+        """Indexa todo o acervo pendente, reportando progresso a cada rodada"""
+        total = documentos_pendentes(db, self.modelo).count()
+        estado = {"total": total, "processados": 0, "chunks": 0, "eta_segundos": None}
+        inicio = time.monotonic()
+
+        while True:
+            rodada = documentos_pendentes(db, self.modelo).order_by(Documento.id).limit(docs_por_rodada).all()
+            if not rodada:
+                break
+            resultado = self.indexar(db, rodada)
+            estado["processados"] += resultado["documentos"]
+            estado["chunks"] += resultado["chunks"]
+
+            decorrido = time.monotonic() - inicio
+            restante = max(total - estado["processados"], 0)
+            estado["eta_segundos"] = round(decorrido / estado["processados"] * restante, 1)
+            if progresso:
+                progresso(dict(estado))
+
+        logger.info(f"Backfill concluído: {estado['processados']} documentos, {estado['chunks']} chunks")
+        return estado
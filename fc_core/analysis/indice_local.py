@@ -0,0 +1,407 @@
+"""
+Índice vetorial local (IVF) sobre vetores float32 em arquivo memory-mapped.
+
+Layout do diretório (uma linha por chunk, todos os arquivos alinhados pela linha):
+    vetores.f32    matriz (n, dim) normalizada, só cresce (append)
+    textos.bin     textos dos chunks (utf-8); textos.idx guarda (início, tamanho) int64
+    linhas.jsonl   id e metadados; linhas.idx guarda (início, tamanho) int64
+    ids.i64        hash do id do chunk      \
+    docs.i64       hash do documento         | colunas int64 para upsert,
+    processos.i64  hash de processo_id       | remoção e filtros vetorizados
+    clientes.i64   hash de cliente          /
+    listas.i32     lista invertida (centroide) de cada linha; -1 antes do treino
+    commit.i64     n confirmado após cada upsert (o último vale)
+    removidos.i64  linhas apagadas (tombstones), só cresce
+    meta.json      dimensão; centroides.npy + ivf.json do IVF
+
+Cada upsert grava os dados e só então acrescenta o novo n a commit.i64. Um
+escritor interrompido deixa sobras além do n confirmado; o próximo upsert
+trunca todos os arquivos de volta ao n antes de escrever, então nenhuma
+linha desalinha. Leitores só enxergam linhas confirmadas.
+
+Em memória ficam apenas 1 byte (vivo) e 4 bytes (lista) por linha; ids,
+metadados e colunas de filtro são lidos dos arquivos mapeados. A busca lê
+os centroides e as linhas das listas sondadas; o sistema operacional
+carrega sob demanda só as páginas tocadas. Escritas (upsert, remover,
+treinar) seguram um flock exclusivo em escrita.lock, então workers em
+processos diferentes se revezam; leitores (API) não travam e detectam dados
+novos por commit.i64.
+"""
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MIN_TREINO = 20_000          # Abaixo disso a busca exata já é rápida
+RETREINO_FATOR = 4           # Retreina quando o índice cresce 4x desde o último treino
+AMOSTRA_TREINO = 50_000
+NPROBE_PADRAO = 16
+LIMITE_BUSCA_EXATA = 50_000  # Filtros que restringem a menos linhas usam busca exata
+BLOCO = 65_536
+
+# coluna -> arquivo (int64 por linha)
+COLUNAS = {"id": "ids.i64", "documento": "docs.i64", "processo_id": "processos.i64", "cliente": "clientes.i64"}
+# arquivo -> bytes por linha (vetores.f32 depende da dimensão)
+LARGURAS = {"textos.idx": 16, "linhas.idx": 16, "listas.i32": 4, **{arq: 8 for arq in COLUNAS.values()}}
+VARIAVEIS = {"textos.bin": "textos.idx", "linhas.jsonl": "linhas.idx"}
+
+
+def _hash(valor) -> int:
+    """int64 estável do valor; 0 representa None"""
+    if valor is None:
+        return 0
+    h = int.from_bytes(hashlib.blake2b(str(valor).encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+    return h or 1
+
+
+def _normalizar(m) -> np.ndarray:
+    m = np.asarray(m, dtype=np.float32)
+    normas = np.linalg.norm(m, axis=-1, keepdims=True)
+    normas[normas == 0] = 1.0
+    return m / normas
+
+
+def _mais_proximos(matriz: np.ndarray, centroides: np.ndarray) -> np.ndarray:
+    atribuicao = np.empty(len(matriz), dtype=np.int32)
+    for inicio in range(0, len(matriz), 8192):
+        bloco = np.asarray(matriz[inicio:inicio + 8192])
+        atribuicao[inicio:inicio + len(bloco)] = np.argmax(bloco @ centroides.T, axis=1)
+    return atribuicao
+
+
+def kmeans_esferico(amostra: np.ndarray, k: int, iteracoes: int = 10, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centroides = amostra[rng.choice(len(amostra), size=k, replace=False)].copy()
+    for _ in range(iteracoes):
+        atribuicao = _mais_proximos(amostra, centroides)
+        soma = np.zeros_like(centroides)
+        np.add.at(soma, atribuicao, amostra)
+        vazios = np.bincount(atribuicao, minlength=k) == 0
+        soma[vazios] = centroides[vazios]
+        centroides = _normalizar(soma)
+    return centroides
+
+
+class IndiceVetorialLocal:
+    def __init__(self, diretorio: str, embed: Optional[Callable[[List[str]], List[List[float]]]] = None, nprobe: int = NPROBE_PADRAO):
+        self.dir = Path(diretorio)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.embed = embed
+        self.nprobe = nprobe
+        self._lock = threading.RLock()
+        self._escrevendo = False
+
+        self.dim: Optional[int] = None
+        self.n = 0
+        self._colunas: Dict[str, np.ndarray] = {c: np.zeros(0, dtype=np.int64) for c in COLUNAS}
+        self._vivos = np.zeros(0, dtype=bool)
+        self._listas = np.zeros(0, dtype=np.int32)
+        self._centroides: Optional[np.ndarray] = None
+        self._treinado_com = 0
+        self._invertidas: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._vetores: Optional[np.memmap] = None
+
+        self._n_removidos = 0
+        self._mtime_centroides = None
+        self._sincronizar()
+
+    # ------------------------------------------------------------------ arquivos
+
+    def _arq(self, nome: str) -> Path:
+        return self.dir / nome
+
+    def _tamanho(self, nome: str) -> int:
+        arq = self._arq(nome)
+        return arq.stat().st_size if arq.exists() else 0
+
+    def _append(self, nome: str, dados: bytes):
+        with open(self._arq(nome), "ab") as f:
+            f.write(dados)
+            f.flush()
+            os.fsync(f.fileno())
+
+    @contextmanager
+    def _escrita(self):
+        """Exclusão entre threads (RLock) e entre processos (flock); reentrante"""
+        with self._lock:
+            if self._escrevendo:  # upsert -> treinar
+                yield
+                return
+            with open(self._arq("escrita.lock"), "a") as trava:
+                fcntl.flock(trava, fcntl.LOCK_EX)
+                self._escrevendo = True
+                try:
+                    yield
+                finally:
+                    self._escrevendo = False
+                    fcntl.flock(trava, fcntl.LOCK_UN)
+
+    def _n_confirmado(self) -> int:
+        confirmados = self._tamanho("commit.i64") // 8
+        if not confirmados:
+            return 0
+        return int(np.fromfile(self._arq("commit.i64"), dtype=np.int64, count=1, offset=(confirmados - 1) * 8)[0])
+
+    def _par(self, nome_idx: str, row: int) -> Tuple[int, int]:
+        inicio, tamanho = np.fromfile(self._arq(nome_idx), dtype=np.int64, count=2, offset=row * 16)
+        return int(inicio), int(tamanho)
+
+    def _gravar_meta(self, dim: int):
+        self._arq("meta.json.tmp").write_text(json.dumps({"dim": dim}))
+        os.replace(self._arq("meta.json.tmp"), self._arq("meta.json"))
+
+    def _truncar(self):
+        """Descarta o que um escritor interrompido gravou além do n confirmado"""
+        larguras = dict(LARGURAS, **({"vetores.f32": self.dim * 4} if self.dim else {}))
+        limites = {nome: self.n * largura for nome, largura in larguras.items()}
+        for nome, nome_idx in VARIAVEIS.items():
+            limites[nome] = sum(self._par(nome_idx, self.n - 1)) if self.n else 0
+        limites["commit.i64"] = self._tamanho("commit.i64") // 8 * 8
+        for nome, limite in limites.items():
+            if self._tamanho(nome) > limite:
+                logger.warning(f"Índice: descartando {self._tamanho(nome) - limite} bytes não confirmados de {nome}")
+                os.truncate(self._arq(nome), limite)
+
+    @staticmethod
+    def _valores_colunas(ids: List[str], metadados: List[dict]) -> Dict[str, np.ndarray]:
+        return {
+            "id": np.array([_hash(i) for i in ids], dtype=np.int64),
+            "documento": np.array([_hash(i.split(":")[0]) for i in ids], dtype=np.int64),
+            "processo_id": np.array([_hash(m.get("processo_id")) for m in metadados], dtype=np.int64),
+            "cliente": np.array([_hash(m.get("cliente")) for m in metadados], dtype=np.int64),
+        }
+
+    def _sincronizar(self):
+        """Carrega o que o escritor confirmou desde a última leitura"""
+        with self._lock:
+            n = self._n_confirmado()
+            if n > self.n:
+                if self.dim is None:
+                    self.dim = json.loads(self._arq("meta.json").read_text())["dim"]
+                inicio, self.n = self.n, n
+                for coluna, arquivo in COLUNAS.items():
+                    self._colunas[coluna] = np.memmap(self._arq(arquivo), dtype=np.int64, mode="r", shape=(n,))
+                self._vetores = np.memmap(self._arq("vetores.f32"), dtype=np.float32, mode="r", shape=(n, self.dim))
+
+                # upsert: só a versão mais recente de cada id fica viva
+                ids = self._colunas["id"]
+                novos = np.asarray(ids[inicio:n])
+                vivos_novos = np.zeros(len(novos), dtype=bool)
+                _, ultimos = np.unique(novos[::-1], return_index=True)
+                vivos_novos[len(novos) - 1 - ultimos] = True
+                substituidos = np.isin(ids[:inicio], novos) if inicio else np.zeros(0, dtype=bool)
+                self._vivos = np.concatenate([self._vivos & ~substituidos, vivos_novos])
+
+            total = self._tamanho("removidos.i64") // 8
+            if total > self._n_removidos:
+                rows = np.fromfile(self._arq("removidos.i64"), dtype=np.int64, count=total - self._n_removidos, offset=self._n_removidos * 8)
+                self._vivos[rows[rows < self.n]] = False
+                self._n_removidos = total
+
+            if self._arq("centroides.npy").exists():
+                mtime = self._arq("centroides.npy").stat().st_mtime
+                if mtime != self._mtime_centroides:
+                    self._mtime_centroides = mtime
+                    self._centroides = np.load(self._arq("centroides.npy"))
+                    self._treinado_com = json.loads(self._arq("ivf.json").read_text())["treinado_com"]
+                    self._listas = np.zeros(0, dtype=np.int32)  # Reatribuídas no treino: relê tudo
+
+            if len(self._listas) < self.n:
+                cauda = np.fromfile(
+                    self._arq("listas.i32"), dtype=np.int32,
+                    count=self.n - len(self._listas), offset=len(self._listas) * 4
+                )
+                self._listas = np.concatenate([self._listas, cauda])
+                self._invertidas = None
+
+    def _registro(self, row: int) -> dict:
+        inicio, tamanho = self._par("linhas.idx", row)
+        with open(self._arq("linhas.jsonl"), "rb") as f:
+            f.seek(inicio)
+            return json.loads(f.read(tamanho))
+
+    def id_da_linha(self, row: int) -> str:
+        return self._registro(row)["id"]
+
+    def linha_do_id(self, id_chunk: str) -> Optional[int]:
+        """Linha viva do chunk (None se não existe ou foi removido)"""
+        with self._lock:
+            self._sincronizar()
+            rows = np.flatnonzero((self._colunas["id"] == _hash(id_chunk)) & self._vivos)
+        return int(rows[-1]) if len(rows) else None
+
+    # ------------------------------------------------------------------ escrita
+
+    def upsert(self, ids: List[str], vetores: List[List[float]], textos: List[str], metadados: List[dict]):
+        if not ids:
+            return
+        matriz = _normalizar(vetores)
+        with self._escrita():
+            self._sincronizar()
+            dim = self.dim or matriz.shape[1]
+            if matriz.shape[1] != dim:
+                raise ValueError(f"Dimensão {matriz.shape[1]} diferente do índice ({dim})")
+            if self.dim is None:
+                self._gravar_meta(dim)
+                self.dim = dim
+            self._truncar()
+
+            # Dados primeiro; o novo n em commit.i64 confirma as linhas para os leitores
+            self._append("vetores.f32", matriz.tobytes())
+            self._append_variavel("textos.bin", "textos.idx", [(t or "").encode("utf-8") for t in textos])
+            self._append_variavel("linhas.jsonl", "linhas.idx", [
+                (json.dumps({"id": i, "metadados": m}, ensure_ascii=False) + "\n").encode("utf-8")
+                for i, m in zip(ids, metadados)
+            ])
+            for coluna, valores in self._valores_colunas(ids, metadados).items():
+                self._append(COLUNAS[coluna], valores.tobytes())
+
+            if self._centroides is not None:
+                listas = _mais_proximos(matriz, self._centroides)
+            else:
+                listas = np.full(len(ids), -1, dtype=np.int32)
+            self._append("listas.i32", listas.tobytes())
+
+            self._append("commit.i64", np.array([self.n + len(ids)], dtype=np.int64).tobytes())
+            self._sincronizar()
+
+            if self.n >= MIN_TREINO and self.n >= self._treinado_com * RETREINO_FATOR:
+                self.treinar()
+
+    def _append_variavel(self, nome: str, nome_idx: str, blobs: List[bytes]):
+        posicao = self._tamanho(nome)
+        indice = []
+        for blob in blobs:
+            indice.append((posicao, len(blob)))
+            posicao += len(blob)
+        self._append(nome, b"".join(blobs))
+        self._append(nome_idx, np.array(indice, dtype=np.int64).tobytes())
+
+    def remover(self, ids_prefixo: str):
+        """Tombstone dos chunks de um documento ("<documento_id>:") ou de um id exato"""
+        with self._escrita():
+            self._sincronizar()
+            if ids_prefixo.endswith(":"):
+                alvo = self._colunas["documento"] == _hash(ids_prefixo[:-1])
+            else:
+                alvo = self._colunas["id"] == _hash(ids_prefixo)
+            rows = np.flatnonzero(alvo & self._vivos)
+            if len(rows):
+                self._append("removidos.i64", rows.astype(np.int64).tobytes())
+                self._sincronizar()
+
+    # ------------------------------------------------------------------ IVF
+
+    def treinar(self):
+        """(Re)treina os centroides numa amostra e reatribui todas as linhas"""
+        with self._escrita():
+            self._sincronizar()
+            k = max(16, int(np.sqrt(self.n)))
+            rng = np.random.default_rng(0)
+            idx = np.sort(rng.choice(self.n, size=min(self.n, max(AMOSTRA_TREINO, k * 4)), replace=False))
+            centroides = kmeans_esferico(np.asarray(self._vetores[idx]), k)
+            listas = _mais_proximos(self._vetores, centroides)
+
+            listas.tofile(self._arq("listas.i32.tmp"))
+            os.replace(self._arq("listas.i32.tmp"), self._arq("listas.i32"))
+            self._arq("ivf.json").write_text(json.dumps({"treinado_com": self.n, "k": k}))
+            np.save(self._arq("centroides.tmp.npy"), centroides)
+            os.replace(self._arq("centroides.tmp.npy"), self._arq("centroides.npy"))
+
+            self._listas = listas
+            self._centroides = centroides
+            self._treinado_com = self.n
+            self._mtime_centroides = self._arq("centroides.npy").stat().st_mtime
+            self._invertidas = None
+            logger.info(f"IVF treinado: {self.n} vetores, {k} listas")
+
+    def _listas_invertidas(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._invertidas is None:
+            ordem = np.argsort(self._listas, kind="stable")
+            limites = np.searchsorted(self._listas[ordem], np.arange(len(self._centroides) + 1))
+            self._invertidas = (ordem, limites)
+        return self._invertidas
+
+    # ------------------------------------------------------------------ busca
+
+    def _filtro(self, filtros: Dict[str, Optional[str]]) -> Optional[np.ndarray]:
+        mascara = None
+        for coluna, valor in filtros.items():
+            if valor is None:
+                continue
+            m = self._colunas[coluna] == _hash(valor)
+            mascara = m if mascara is None else mascara & m
+        return mascara
+
+    @staticmethod
+    def _pontuar(vetores: np.memmap, rows: np.ndarray, q: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        if len(rows) == 0:
+            return []
+        rows = np.sort(rows)  # Acesso sequencial ao arquivo
+        scores = np.empty(len(rows), dtype=np.float32)
+        for inicio in range(0, len(rows), BLOCO):
+            fatia = rows[inicio:inicio + BLOCO]
+            scores[inicio:inicio + len(fatia)] = vetores[fatia] @ q
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(rows[i]), float(scores[i])) for i in top]
+
+    def buscar_vetor(
+        self,
+        vetor: List[float],
+        k: int = 5,
+        processo_id: Optional[str] = None,
+        cliente: Optional[str] = None,
+        nprobe: Optional[int] = None,
+        exato: bool = False
+    ) -> List[Tuple[int, float]]:
+        """Retorna [(linha, score)] por similaridade de cosseno"""
+        with self._lock:
+            self._sincronizar()
+            if not self.n:
+                return []
+            vetores, vivos, listas, centroides = self._vetores, self._vivos, self._listas, self._centroides
+            filtro = self._filtro({"processo_id": processo_id, "cliente": cliente})
+            invertidas = self._listas_invertidas() if centroides is not None and not exato else None
+
+        q = _normalizar(vetor)
+        if filtro is not None:
+            vivos = vivos & filtro
+            if np.count_nonzero(vivos) <= LIMITE_BUSCA_EXATA:
+                invertidas = None
+
+        if invertidas is None:
+            return self._pontuar(vetores, np.flatnonzero(vivos), q, k)
+
+        ordem, limites = invertidas
+        sondar = np.argsort(-(centroides @ q))[: nprobe or self.nprobe]
+        candidatos = np.concatenate(
+            [ordem[limites[c]:limites[c + 1]] for c in sondar] + [np.flatnonzero(listas < 0)]
+        )
+        return self._pontuar(vetores, candidatos[vivos[candidatos]], q, k)
+
+    def _texto(self, row: int) -> str:
+        inicio, tamanho = self._par("textos.idx", row)
+        with open(self._arq("textos.bin"), "rb") as f:
+            f.seek(inicio)
+            return f.read(tamanho).decode("utf-8")
+
+    def buscar_similares(self, query: str, n_results: int = 5, processo_id: Optional[str] = None, cliente: Optional[str] = None) -> List[dict]:
+        """Interface compatível com VectorStore.buscar_similares"""
+        if self.embed is None:
+            raise RuntimeError("Índice sem função de embedding configurada")
+        vetor = self.embed([query])[0]
+        return [
+            dict(self._registro(row), score=score, texto=self._texto(row))
+            for row, score in self.buscar_vetor(vetor, n_results, processo_id=processo_id, cliente=cliente)
+        ]
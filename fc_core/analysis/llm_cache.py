@@ -0,0 +1,101 @@
+"""
+Cache em disco de respostas do LLM.
+
+Chave: sha256(modelo + versão do template de prompt + sha256 do texto), de modo
+que trocar o modelo ou editar um prompt (subindo a versão) invalida apenas as
+entradas afetadas. Cada resposta é um JSON em <dir>/<aa>/<chave>.json; leituras
+atualizam o mtime e a limpeza remove as menos usadas até caber no limite.
+"""
+from pathlib import Path
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+
+from fc_core.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+NOME_ENTRADA = re.compile(r"^[0-9a-f]{64}\.json$")
+
+
+def chave_llm(modelo: str, versao_prompt: str, texto: str) -> str:
+    texto_hash = hashlib.sha256(texto.encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{modelo}\0{versao_prompt}\0{texto_hash}".encode("utf-8")).hexdigest()
+
+
+class CacheLLM:
+    def __init__(self, diretorio: Optional[str] = None, limite_mb: Optional[int] = None):
+        self.dir = Path(diretorio or settings.llm_cache_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.limite = (settings.llm_cache_max_mb if limite_mb is None else limite_mb) * 1024 * 1024
+        self._lock = threading.Lock()
+        self._bytes = None  # Calculado sob demanda; mantido aproximado entre limpezas
+
+    def _caminho(self, chave: str) -> Path:
+        return self.dir / chave[:2] / f"{chave}.json"
+
+    def get(self, chave: str) -> Optional[Any]:
+        caminho = self._caminho(chave)
+        try:
+            valor = json.loads(caminho.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+        os.utime(caminho)  # LRU pelo mtime
+        return valor
+
+    def set(self, chave: str, valor: Any):
+        caminho = self._caminho(chave)
+        caminho.parent.mkdir(exist_ok=True)
+        dados = json.dumps(valor, ensure_ascii=False).encode("utf-8")
+        tmp = caminho.parent / f".{uuid.uuid4().hex}.tmp"
+        tmp.write_bytes(dados)
+        os.replace(tmp, caminho)
+
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = self._em_uso()
+            self._bytes += len(dados)
+            excedeu = self._bytes > self.limite
+        if excedeu:
+            self.limpar()
+
+    def _entradas(self):
+        for caminho in self.dir.glob("*/*.json"):
+            if NOME_ENTRADA.match(caminho.name):
+                yield caminho
+
+    def _em_uso(self) -> int:
+        return sum(c.stat().st_size for c in self._entradas())
+
+    def limpar(self, limite_mb: Optional[int] = None) -> Dict[str, int]:
+        """Remove as entradas menos usadas até ocupar no máximo 90% do limite"""
+        limite = self.limite if limite_mb is None else limite_mb * 1024 * 1024
+        with self._lock:
+            entradas = []
+            for caminho in self._entradas():
+                try:
+                    stat = caminho.stat()
+                except FileNotFoundError:
+                    continue
+                entradas.append((stat.st_mtime, stat.st_size, caminho))
+
+            total = sum(tamanho for _, tamanho, _ in entradas)
+            alvo = limite * 0.9
+            removidos = 0
+            for _, tamanho, caminho in sorted(entradas):
+                if total <= alvo:
+                    break
+                caminho.unlink(missing_ok=True)
+                total -= tamanho
+                removidos += 1
+            self._bytes = total
+
+        if removidos:
+            logger.info(f"Cache do LLM: {removidos} entradas removidas, {total // 1024} KB em uso")
+        return {"removidos": removidos, "bytes_em_uso": total}
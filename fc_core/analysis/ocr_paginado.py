@@ -0,0 +1,151 @@
+"""
+OCR incremental por página.
+
+PDFs são divididos em páginas: as que têm camada de texto não passam por
+OCR, as demais são divididas em lotes processados em paralelo (cada lote
+abre o PDF uma vez). O texto de cada página fica em ``paginas_ocr`` indexado
+por (sha256 do conteúdo, página, versão do motor), então reenvios do mesmo
+arquivo e novas rodadas de NER/análise só pagam pelas páginas que ainda não
+foram processadas. Páginas em que o OCR falhou não entram no cache: o
+resultado volta com success=False e a próxima chamada tenta só elas.
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import logging
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from fc_core.analysis.indexacao import hash_texto
+from fc_core.analysis.processamento import camada_de_texto, ocr_arquivo, ocr_paginas
+from fc_core.core.cache import invalidar, tag_documentos
+from fc_core.core.config import get_settings
+from fc_core.core.models import Documento, PaginaOCR
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PAGINA_UNICA = -1  # Arquivos que não são PDF ficam em cache como uma "página" só
+
+Mapear = Callable[[Callable, Iterable[tuple]], List]
+
+
+def _mapear_serial(fn: Callable, argumentos: Iterable[tuple]) -> List:
+    return [fn(*args) for args in argumentos]
+
+
+def _lotes(paginas: List[int], n: int) -> List[List[int]]:
+    """Divide as páginas em até n lotes contíguos"""
+    tamanho = -(-len(paginas) // max(1, n))
+    return [paginas[i:i + tamanho] for i in range(0, len(paginas), tamanho)]
+
+
+def _eh_pdf(caminho: str) -> bool:
+    with open(caminho, "rb") as f:
+        return f.read(5) == b"%PDF-"
+
+
+def paginas_em_cache(db: Session, sha256_hash: str) -> Dict[int, str]:
+    rows = db.query(PaginaOCR.pagina, PaginaOCR.texto).filter(
+        PaginaOCR.sha256_hash == sha256_hash,
+        PaginaOCR.engine_versao == settings.ocr_engine_versao
+    ).all()
+    return {pagina: texto or "" for pagina, texto in rows}
+
+
+def _salvar_paginas(db: Session, sha256_hash: str, paginas: Dict[int, str], origem: str):
+    for pagina, texto in paginas.items():
+        db.merge(PaginaOCR(
+            sha256_hash=sha256_hash,
+            pagina=pagina,
+            engine_versao=settings.ocr_engine_versao,
+            origem=origem,
+            texto=texto
+        ))
+
+
+def ocr_paginado(
+    db: Session,
+    caminho: str,
+    sha256_hash: str,
+    mapear: Optional[Mapear] = None
+) -> Dict[str, Any]:
+    """
+    Extrai o texto do documento reaproveitando páginas em cache.
+    `mapear` distribui as chamadas de OCR (ex: PoolLimitado.mapear); sem ele, serial.
+    """
+    mapear = mapear or _mapear_serial
+    cache = paginas_em_cache(db, sha256_hash)
+
+    try:
+        usa_paginas = _eh_pdf(caminho)
+        if usa_paginas:
+            import pypdf  # noqa: F401
+    except ImportError:
+        logger.warning("pypdf não instalado; OCR do documento inteiro")
+        usa_paginas = False
+
+    if not usa_paginas:
+        em_cache = int(PAGINA_UNICA in cache)
+        if not em_cache:
+            resultado = mapear(ocr_arquivo, [(caminho,)])[0]
+            if not resultado["success"]:
+                return resultado
+            _salvar_paginas(db, sha256_hash, {PAGINA_UNICA: resultado["texto"]}, "ocr")
+            cache[PAGINA_UNICA] = resultado["texto"]
+            db.commit()
+        texto = cache[PAGINA_UNICA]
+        persistir_texto(db, sha256_hash, texto, sobrescrever=False)
+        return {"success": True, "texto": texto, "paginas": 1, "paginas_ocr": 1 - em_cache, "paginas_cache": em_cache}
+
+    total, camada = mapear(camada_de_texto, [(caminho,)])[0]
+    em_cache = sum(1 for pagina in range(total) if pagina in cache)
+
+    novas_camada = {p: t for p, t in camada.items() if p not in cache}
+    pendentes = [p for p in range(total) if p not in cache and p not in camada]
+
+    if pendentes:
+        logger.info(f"OCR de {len(pendentes)}/{total} páginas de {sha256_hash[:12]}")
+    lotes = _lotes(pendentes, settings.ocr_workers)
+    textos = [t for textos_lote in mapear(ocr_paginas, [(caminho, lote) for lote in lotes]) for t in textos_lote]
+    textos_ocr = {p: t for p, t in zip(pendentes, textos) if t is not None}
+    falhas = [p for p, t in zip(pendentes, textos) if t is None]
+
+    if novas_camada or textos_ocr:
+        _salvar_paginas(db, sha256_hash, novas_camada, "texto")
+        _salvar_paginas(db, sha256_hash, textos_ocr, "ocr")
+        db.commit()
+    cache.update(novas_camada)
+    cache.update(textos_ocr)
+
+    if falhas:
+        logger.warning(f"OCR falhou em {len(falhas)}/{total} páginas de {sha256_hash[:12]}")
+        return {
+            "success": False,
+            "error": f"OCR falhou nas páginas {[p + 1 for p in falhas]}",
+            "paginas": total,
+            "paginas_falhas": falhas,
+            "paginas_ocr": len(textos_ocr),
+            "paginas_cache": em_cache
+        }
+
+    texto = "\n\n".join(cache.get(p, "") for p in range(total))
+    persistir_texto(db, sha256_hash, texto, sobrescrever=bool(novas_camada or textos_ocr))
+
+    return {
+        "success": True,
+        "texto": texto,
+        "paginas": total,
+        "paginas_ocr": len(textos_ocr),
+        "paginas_cache": em_cache
+    }
+
+
+def persistir_texto(db: Session, sha256_hash: str, texto: str, sobrescrever: bool = True):
+    """Grava o texto em todos os Documentos com esse conteúdo"""
+    stmt = update(Documento).where(Documento.sha256_hash == sha256_hash)
+    if not sobrescrever:
+        stmt = stmt.where(Documento.texto_extraido.is_(None))
+    db.execute(stmt.values(texto_extraido=texto, texto_sha256=hash_texto(texto)))
+    db.commit()
+    processos = db.scalars(select(Documento.processo_id).where(Documento.sha256_hash == sha256_hash).distinct())
+    invalidar(*(tag_documentos(p) for p in processos))
@@ -0,0 +1,38 @@
+"""Cliente HTTP mínimo para a API local do Ollama (embeddings em lote e geração)."""
+from typing import List, Optional
+import logging
+
+import requests
+
+from fc_core.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class OllamaHTTP:
+    def __init__(self, base_url: Optional[str] = None, timeout: Optional[int] = None):
+        self.base_url = (base_url or settings.ollama_base_url).rstrip("/")
+        self.timeout = timeout or settings.ollama_timeout_seconds
+        self.session = requests.Session()
+
+    def _post(self, rota: str, payload: dict) -> dict:
+        resp = self.session.post(f"{self.base_url}{rota}", json=payload, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    def embed(self, textos: List[str], modelo: Optional[str] = None) -> List[List[float]]:
+        """Embeddings de vários textos numa única chamada"""
+        if not textos:
+            return []
+        dados = self._post("/api/embed", {"model": modelo or settings.embedding_model, "input": textos})
+        return dados["embeddings"]
+
+    def gerar(self, prompt: str, modelo: Optional[str] = None, json_mode: bool = False, opcoes: Optional[dict] = None) -> str:
+        """Geração sem streaming; com json_mode o Ollama restringe a saída a JSON válido"""
+        payload = {"model": modelo or settings.llm_model, "prompt": prompt, "stream": False}
+        if json_mode:
+            payload["format"] = "json"
+        if opcoes:
+            payload["options"] = opcoes
+        return self._post("/api/generate", payload)["response"]
@@ -0,0 +1,70 @@
+"""
+Funções de processamento de documentos executadas fora do event loop.
+
+Rodam dentro de workers do ProcessPoolExecutor (OCR/NER, CPU-bound), do
+ThreadPoolExecutor (chamadas ao LLM, I/O-bound) ou de tasks Celery, por
+isso são funções de módulo (serializáveis) e cada processo instancia seus
+próprios serviços na primeira chamada (ver fc_core.core.services).
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import tempfile
+
+from fc_core.core.services import servicos
+
+MIN_CARACTERES_CAMADA = 50  # Abaixo disso a página é tratada como imagem
+
+
+def ocr_arquivo(caminho: str) -> Dict[str, Any]:
+    """OCR do documento inteiro, sem pós-processamento"""
+    return servicos.get("ocr").processar_documento(caminho)
+
+
+def extrair_entidades(texto: str):
+    return servicos.get("ner").extrair_entidades_juridicas(texto)
+
+
+def camada_de_texto(caminho: str) -> Tuple[int, Dict[int, str]]:
+    """
+    Lê a camada de texto do PDF.
+    Retorna (total de páginas, {página: texto}) apenas para páginas com texto útil.
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(caminho)
+    textos = {}
+    for i, page in enumerate(reader.pages):
+        try:
+            texto = page.extract_text() or ""
+        except Exception:
+            texto = ""
+        if len(texto.strip()) >= MIN_CARACTERES_CAMADA:
+            textos[i] = texto
+    return len(reader.pages), textos
+
+
+def ocr_paginas(caminho: str, paginas: List[int]) -> List[Optional[str]]:
+    """
+    OCR de um lote de páginas, cada uma extraída para um PDF temporário.
+    O PDF é aberto uma vez por lote; páginas em que o OCR falhou voltam None.
+    """
+    from pypdf import PdfReader, PdfWriter
+
+    reader = PdfReader(caminho)
+    textos = []
+    for pagina in paginas:
+        writer = PdfWriter()
+        writer.add_page(reader.pages[pagina])
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            writer.write(tmp)
+        try:
+            resultado = servicos.get("ocr").processar_documento(tmp.name)
+            textos.append((resultado.get("texto") or "") if resultado.get("success") else None)
+        finally:
+            Path(tmp.name).unlink(missing_ok=True)
+    return textos
+
+
+def analisar_texto(texto: str, modo: str = "combinado") -> Dict[str, Any]:
+    """Análise jurídica e resumo via LLM (cacheados; ver fc_core.analysis.analise_llm)"""
+    return servicos.get("analisador").analisar(texto, modo)
@@ -0,0 +1,53 @@
+from pathlib import Path
+from typing import Optional
+import hashlib
+from fc_core.core.celery_app import celery_app
+from fc_core.core.database import SessionLocal
+from fc_core.analysis.processamento import extrair_entidades, analisar_texto
+from fc_core.analysis.ocr_paginado import ocr_paginado
+from fc_core.analysis.indexacao import IndexadorDocumentos
+from fc_core.core.services import servicos
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _sha256_arquivo(caminho: str) -> str:
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+@celery_app.task(bind=True)
+def processar_documento_task(self, caminho: str, analisar: bool = False, sha256_hash: Optional[str] = None):
+    """OCR (e opcionalmente análise por IA) de documentos longos, fora da API"""
+    db = SessionLocal()
+    try:
+        self.update_state(state="PROGRESS", meta={"etapa": "ocr"})
+        resultado = ocr_paginado(db, caminho, sha256_hash or _sha256_arquivo(caminho))
+        if resultado["success"]:
+            resultado["entidades"] = extrair_entidades(resultado["texto"])
+        if analisar and resultado["success"]:
+            self.update_state(state="PROGRESS", meta={"etapa": "analise"})
+            resultado.update(analisar_texto(resultado["texto"]))
+        return resultado
+    finally:
+        db.close()
+        Path(caminho).unlink(missing_ok=True)
+
+@celery_app.task(bind=True, soft_time_limit=3300, time_limit=3600)
+def indexar_acervo_task(self):
+    """Indexa no vector store todos os documentos com texto ainda não indexados"""
+    db = SessionLocal()
+    try:
+        indexador = IndexadorDocumentos(servicos.get("vector_store"), servicos.get("embedder").embed)
+        return indexador.backfill(
+            db, progresso=lambda estado: self.update_state(state="PROGRESS", meta=estado)
+        )
+    finally:
+        db.close()
+
+@celery_app.task
+def remover_documento_indice_task(documento_id: str):
+    """Tira do vector store os chunks de um documento excluído (o worker é o escritor do índice)"""
+    servicos.get("vector_store").remover(f"{documento_id}:")
@@ -1,9 +1,16 @@
-from fastapi import FastAPI
+import logging
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import SQLAlchemyError
 from fc_core.core.config import get_settings
+from fc_core.core import database, stats
+from fc_core.core.executors import PoolSaturado
+from fc_core.core.services import servicos
 from fc_core.api.routes import auth, processos, documentos
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title=settings.app_name,
@@ -23,6 +30,14 @@ app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(processos.router, prefix="/api/processos", tags=["processos"])
 app.include_router(documentos.router, prefix="/api/documentos", tags=["documentos"])
 
+@app.exception_handler(PoolSaturado)
+def pool_saturado_handler(request: Request, exc: PoolSaturado):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"Serviço {exc.nome} ocupado, tente novamente"},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 @app.get("/")
 def root():
     return {"message": "FusionCore-Suite API v2.0", "status": "running"}
@@ -31,13 +46,56 @@ def root():
 def health():
     return {"status": "healthy"}
 
+@app.get("/health/db")
+def health_db():
+    """Pool de conexões deste processo (em uso, overflow, tempo de checkout)"""
+    return database.metricas_pool()
+
 from fc_core.api.routes import integracoes
 app.include_router(integracoes.router, prefix="/api/integracoes", tags=["integracoes"])
 
 from fc_core.api.routes import ocr_ia
 app.include_router(ocr_ia.router, prefix="/api/ocr-ia", tags=["ocr-ia"])
 
+@app.on_event("startup")
+def carregar_servicos():
+    servicos.preload(settings.preload_services.split(","))
+
+@app.on_event("startup")
+def preparar_banco():
+    # As leituras async ficam com DB_ASYNC_CONEXOES; a engine síncrona com o resto do teto
+    if database.LEITURA_ASYNC:
+        database.inicializar(teto=max(1, settings.db_max_conexoes - settings.db_async_conexoes))
+        database.inicializar_async()
+
+@app.on_event("startup")
+def carregar_stats():
+    # Banco já populado e processo_stats vazia: os deltas partiriam de zero
+    db = database.SessionLocal()
+    try:
+        stats.inicializar(db)
+    except SQLAlchemyError as e:
+        logger.error(f"Falha ao inicializar stats (rode reconciliar_stats_task): {e}")
+    finally:
+        db.close()
+
+@app.on_event("shutdown")
+def encerrar_pools():
+    ocr_ia.ocr_pool.shutdown()
+    ocr_ia.llm_pool.shutdown()
+
+@app.on_event("shutdown")
+async def encerrar_banco():
+    await database.descartar_async()
+
 
 # Pipeline / Orchestrator Router
 from fc_core.api.routes import pipeline
-app.include_router(pipeline.router, prefix="/api/pipeline", tags=["pipeline"])
\ No newline at end of file
+app.include_router(pipeline.router, prefix="/api/pipeline", tags=["pipeline"])
+
+# Eventos (SSE + webhooks)
+from fc_core.api.routes import eventos
+app.include_router(eventos.router, prefix="/api/eventos", tags=["eventos"])
+
+from fc_core.api.routes import prazos
+app.include_router(prazos.router, prefix="/api/prazos", tags=["prazos"])
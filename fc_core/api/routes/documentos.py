@@ -1,17 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from fc_core.core.database import get_db
-from fc_core.core.models import Documento, Processo
+from fc_core.analysis.tasks import remover_documento_indice_task
+from fc_core.core import cache
+from fc_core.core.database import LEITURA_ASYNC, get_db, get_db_async
+from fc_core.core.models import Documento, DocumentoIndexado, Processo
+from fc_core.core.storage import (
+    receber_upload, caminho_blob, promover, adicionar_referencia, remover_referencia, apagar_se_orfao
+)
 from uuid import UUID
-import hashlib
-import aiofiles
-from pathlib import Path
 
 router = APIRouter()
 
-UPLOAD_DIR = Path("outputs/documents")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
 @router.post("/{processo_id}/upload")
 async def upload_documento(
     processo_id: UUID,
@@ -22,8 +24,7 @@ async def upload_documento(
     if not processo:
         raise HTTPException(status_code=404, detail="Processo não encontrado")
     
-    content = await file.read()
-    sha256_hash = hashlib.sha256(content).hexdigest()
+    temporario, sha256_hash, tamanho = await receber_upload(file)
     
     existing = db.query(Documento).filter(
         Documento.processo_id == processo_id,
@@ -31,11 +32,14 @@ async def upload_documento(
     ).first()
     
     if existing:
+        temporario.unlink(missing_ok=True)
         return {"message": "Documento já existe", "id": str(existing.id)}
     
-    file_path = UPLOAD_DIR / f"{sha256_hash}_{file.filename}"
-    async with aiofiles.open(file_path, "wb") as f:
-        await f.write(content)
+    # Conteúdo já anexado a outro processo é reaproveitado (mesmo blob); a
+    # referência vem antes do arquivo para não correr com uma exclusão do blob
+    file_path = caminho_blob(sha256_hash)
+    adicionar_referencia(db, sha256_hash, tamanho, file_path)
+    promover(temporario, sha256_hash)
     
     documento = Documento(
         processo_id=processo_id,
@@ -44,16 +48,50 @@ async def upload_documento(
         mime_type=file.content_type,
         storage_backend="filesystem",
         storage_path=str(file_path),
-        tamanho_bytes=len(content)
+        tamanho_bytes=tamanho
     )
     
     db.add(documento)
     db.commit()
     db.refresh(documento)
+    cache.invalidar(cache.tag_documentos(processo_id))
     
     return {"message": "Upload concluído", "id": str(documento.id)}
 
-@router.get("/{processo_id}/documentos")
-def list_documentos(processo_id: UUID, db: Session = Depends(get_db)):
-    documentos = db.query(Documento).filter(Documento.processo_id == processo_id).all()
-    return documentos
+async def list_documentos(processo_id: UUID, db: AsyncSession = Depends(get_db_async)):
+    async def calcular():
+        return jsonable_encoder((await db.scalars(select(Documento).where(Documento.processo_id == processo_id))).all())
+    return await cache.lembrar_async(
+        "documentos:lista", {"processo_id": str(processo_id)}, [cache.tag_documentos(processo_id)], calcular
+    )
+
+def list_documentos_sync(processo_id: UUID, db: Session = Depends(get_db)):
+    def calcular():
+        return jsonable_encoder(db.query(Documento).filter(Documento.processo_id == processo_id).all())
+    return cache.lembrar(
+        "documentos:lista", {"processo_id": str(processo_id)}, [cache.tag_documentos(processo_id)], calcular
+    )
+
+# Leitura quente (com cache): async ou síncrona conforme API_LEITURA_ASYNC
+router.add_api_route("/{processo_id}/documentos", list_documentos if LEITURA_ASYNC else list_documentos_sync,
+                     methods=["GET"])
+
+@router.delete("/{documento_id}", status_code=204)
+def delete_documento(documento_id: UUID, db: Session = Depends(get_db)):
+    documento = db.query(Documento).filter(Documento.id == documento_id).first()
+    if not documento:
+        raise HTTPException(status_code=404, detail="Documento não encontrado")
+    
+    sha256_hash = documento.sha256_hash
+    processo_id = documento.processo_id
+    indexado = db.query(DocumentoIndexado).filter(DocumentoIndexado.documento_id == documento_id).delete()
+    db.delete(documento)
+    sem_referencias = remover_referencia(db, sha256_hash)
+    db.commit()
+    cache.invalidar(cache.tag_documentos(processo_id))
+    if indexado:
+        remover_documento_indice_task.delay(str(documento_id))
+    
+    if sem_referencias:
+        apagar_se_orfao(db, sha256_hash)
+    return None
@@ -0,0 +1,102 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from uuid import UUID
+import json
+import secrets
+
+from fc_core.automation import eventos
+from fc_core.core.database import get_db
+from fc_core.core.models import EventoProcesso, Webhook
+
+router = APIRouter()
+
+class WebhookRequest(BaseModel):
+    url: str
+    tipos: Optional[List[str]] = None  # Nulo = todos os tipos
+    segredo: Optional[str] = None  # Gerado se omitido
+
+def _sse(stream_id: str, evento: dict) -> str:
+    return f"id: {stream_id}\nevent: {evento['tipo']}\ndata: {json.dumps(evento, ensure_ascii=False, default=str)}\n\n"
+
+@router.get("/stream")
+async def stream_eventos(
+    processo_id: Optional[str] = None,
+    tipos: Optional[str] = Query(None, description="Lista separada por vírgula"),
+    desde: Optional[str] = Query(None, description="Id do stream; padrão: só eventos novos"),
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Server-Sent Events com as mudanças de processo e conclusões de scrape/lote.
+    O EventSource reconecta enviando Last-Event-ID e retoma de onde parou.
+    Async: cada cliente conectado espera no XREAD sem ocupar o threadpool.
+    """
+    filtro_tipos = {t.strip() for t in tipos.split(",") if t.strip()} if tipos else None
+    inicio = last_event_id or desde or "$"
+
+    async def gerar():
+        ultimo_id = inicio
+        yield "retry: 3000\n\n"
+        while True:
+            entradas = await eventos.ler_async(ultimo_id)
+            if not entradas:
+                yield ": ping\n\n"  # Mantém proxies sem cortar a conexão ociosa
+                continue
+            for stream_id, evento in entradas:
+                ultimo_id = stream_id
+                if eventos.filtrar(evento, processo_id, filtro_tipos):
+                    yield _sse(stream_id, evento)
+
+    return StreamingResponse(
+        gerar(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/processos/{processo_id}")
+def listar_eventos_processo(
+    processo_id: UUID,
+    desde_id: int = Query(0, ge=0),
+    limite: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Histórico do feed (outbox) para recuperar o que já saiu do stream"""
+    linhas = db.query(EventoProcesso).filter(
+        EventoProcesso.processo_id == processo_id,
+        EventoProcesso.id > desde_id
+    ).order_by(EventoProcesso.id).limit(limite).all()
+    return {
+        "eventos": [
+            {"evento_id": e.id, "tipo": e.tipo, "fonte": e.fonte, "dados": e.dados, "created_at": e.created_at}
+            for e in linhas
+        ],
+        "proximo_id": linhas[-1].id if linhas else desde_id
+    }
+
+@router.post("/webhooks", status_code=201)
+def criar_webhook(request: WebhookRequest, db: Session = Depends(get_db)):
+    """Cadastra um webhook; o segredo do HMAC só é exibido nesta resposta"""
+    try:
+        eventos.validar_url_webhook(request.url)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    webhook = Webhook(url=request.url, tipos=request.tipos, segredo=request.segredo or secrets.token_hex(32))
+    db.add(webhook)
+    db.commit()
+    return {"id": str(webhook.id), "url": webhook.url, "tipos": webhook.tipos, "segredo": webhook.segredo}
+
+@router.get("/webhooks")
+def listar_webhooks(db: Session = Depends(get_db)):
+    return [
+        {"id": str(w.id), "url": w.url, "tipos": w.tipos, "ativo": w.ativo}
+        for w in db.query(Webhook).order_by(Webhook.created_at)
+    ]
+
+@router.delete("/webhooks/{webhook_id}", status_code=204)
+def remover_webhook(webhook_id: UUID, db: Session = Depends(get_db)):
+    webhook = db.get(Webhook, webhook_id)
+    if not webhook:
+        raise HTTPException(status_code=404, detail="Webhook não encontrado")
+    db.delete(webhook)
+    db.commit()
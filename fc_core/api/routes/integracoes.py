@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from pydantic import BaseModel
 from typing import Optional
-from fc_core.automation.tasks import scrape_processo_task, scrape_batch_task
+from fc_core.automation.tasks import submeter_scrape, scrape_batch_task
 from fc_core.automation.scrapers.scraper_factory import ScraperFactory
+from fc_core.automation import lotes
 
 router = APIRouter()
 
@@ -17,6 +18,7 @@ class BatchScrapeRequest(BaseModel):
     numeros_processos: list[str]
     username: Optional[str] = None
     password: Optional[str] = None
+    solicitante: Optional[str] = None  # Usado para dividir a fila de lotes de forma justa
 
 @router.get("/sistemas")
 def listar_sistemas():
@@ -36,11 +38,12 @@ def scrape_processo(request: ScrapeRequest, background_tasks: BackgroundTasks):
             "password": request.password
         }
     
-    task = scrape_processo_task.delay(request.sistema, request.numero_processo, credentials)
+    task_id, duplicado = submeter_scrape(request.sistema, request.numero_processo, credentials)
     
     return {
-        "message": "Scraping iniciado",
-        "task_id": task.id,
+        "message": "Scraping já em andamento" if duplicado else "Scraping iniciado",
+        "task_id": task_id,
+        "duplicado": duplicado,
         "sistema": request.sistema,
         "processo": request.numero_processo
     }
@@ -55,23 +58,39 @@ def scrape_batch(request: BatchScrapeRequest):
             "password": request.password
         }
     
-    task = scrape_batch_task.delay(request.sistema, request.numeros_processos, credentials)
+    numeros = lotes.numeros_unicos(request.numeros_processos)
+    lote_id = lotes.criar_lote(request.sistema, len(numeros))
+    task = scrape_batch_task.delay(request.sistema, numeros, credentials, lote_id, request.solicitante)
     
     return {
         "message": "Scraping em lote iniciado",
+        "lote_id": lote_id,
         "task_id": task.id,
         "sistema": request.sistema,
-        "total_processos": len(request.numeros_processos)
+        "total_processos": len(numeros),
+        "status_url": f"/api/integracoes/scrape/batch/{lote_id}"
     }
 
+@router.get("/scrape/batch/{lote_id}")
+def consultar_lote(lote_id: str):
+    """Progresso agregado do lote (concluídos, falhas, ETA)"""
+    status = lotes.status_lote(lote_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Lote não encontrado")
+    return status
+
 @router.get("/task/{task_id}")
 def consultar_task(task_id: str):
     """Consulta status de uma task"""
     from celery.result import AsyncResult
     task = AsyncResult(task_id)
+    result = task.result if task.ready() else None
+    # O backend guarda só o resumo; os dados completos estão no processo
+    if isinstance(result, dict) and result.get("processo_id"):
+        result = dict(result, processo_url=f"/api/processos/{result['processo_id']}")
     
     return {
         "task_id": task_id,
         "status": task.state,
-        "result": task.result if task.ready() else None
+        "result": result
     }
@@ -1,78 +1,101 @@
 from fastapi import APIRouter, UploadFile, File, Depends
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from fc_core.core.database import get_db
-from fc_core.ingestion.ocr.ocr_service import OCRService
-from fc_core.ingestion.ocr.ner_service import NERService
-from fc_core.analysis.llm_service import OllamaService
-from fc_core.analysis.vector_store import VectorStore
+from fc_core.analysis.processamento import extrair_entidades, analisar_texto
+from fc_core.analysis.ocr_paginado import ocr_paginado
+from fc_core.analysis.tasks import processar_documento_task, indexar_acervo_task
+from fc_core.core.config import get_settings
+from fc_core.core.executors import PoolLimitado
+from fc_core.core.services import servicos
+from fc_core.core.storage import receber_upload
 from pathlib import Path
-import aiofiles
+import os
 from uuid import uuid4
+from typing import Literal, Optional
 
 router = APIRouter()
+settings = get_settings()
 
-ocr_service = OCRService()
-ner_service = NERService()
-llm_service = OllamaService()
-vector_store = VectorStore()
+# OCR/NER é CPU-bound (processos); LLM é I/O-bound (threads)
+ocr_pool = PoolLimitado("ocr", processos=True, max_workers=settings.ocr_workers, max_fila=settings.ocr_max_fila, retry_after=30)
+llm_pool = PoolLimitado("llm", processos=False, max_workers=settings.llm_workers, max_fila=settings.llm_max_fila, retry_after=10)
 
 TEMP_DIR = Path("outputs/temp")
 TEMP_DIR.mkdir(parents=True, exist_ok=True)
 
+def _ocr(db: Session, caminho: str, sha256_hash: str, com_entidades: bool):
+    """OCR por página distribuído no pool (roda numa thread, dentro de uma vaga)"""
+    resultado = ocr_paginado(db, caminho, sha256_hash, mapear=ocr_pool.mapear)
+    if com_entidades and resultado["success"]:
+        resultado["entidades"] = ocr_pool.mapear(extrair_entidades, [(resultado["texto"],)])[0]
+    return resultado
+
 @router.post("/ocr")
-async def processar_ocr(file: UploadFile = File(...)):
+async def processar_ocr(file: UploadFile = File(...), db: Session = Depends(get_db)):
     """Processa OCR em documento"""
-    temp_path = TEMP_DIR / f"{uuid4()}_{file.filename}"
+    temp_path, sha256_hash, _ = await receber_upload(file)
     
     try:
-        async with aiofiles.open(temp_path, "wb") as f:
-            content = await file.read()
-            await f.write(content)
-        
-        resultado = ocr_service.processar_documento(str(temp_path))
-        
-        if resultado["success"]:
-            entidades = ner_service.extrair_entidades_juridicas(resultado["texto"])
-            resultado["entidades"] = entidades
-        
-        return resultado
+        async with ocr_pool.vaga():
+            return await run_in_threadpool(_ocr, db, str(temp_path), sha256_hash, True)
     
     finally:
-        if temp_path.exists():
-            temp_path.unlink()
+        temp_path.unlink(missing_ok=True)
 
 @router.post("/analisar")
-async def analisar_documento(file: UploadFile = File(...)):
-    """Analisa documento com IA"""
-    temp_path = TEMP_DIR / f"{uuid4()}_{file.filename}"
+async def analisar_documento(
+    file: UploadFile = File(...),
+    modo: Literal["combinado", "separado"] = "combinado",
+    db: Session = Depends(get_db)
+):
+    """Analisa documento com IA (combinado: análise e resumo numa única chamada)"""
+    temp_path, sha256_hash, _ = await receber_upload(file)
     
     try:
-        async with aiofiles.open(temp_path, "wb") as f:
-            content = await file.read()
-            await f.write(content)
-        
-        resultado_ocr = ocr_service.processar_documento(str(temp_path))
+        async with ocr_pool.vaga():
+            resultado_ocr = await run_in_threadpool(_ocr, db, str(temp_path), sha256_hash, False)
         
         if not resultado_ocr["success"]:
             return resultado_ocr
         
         texto = resultado_ocr["texto"]
-        analise = llm_service.analisar_documento_juridico(texto)
-        resumo = llm_service.resumir_texto(texto)
+        resultado = await llm_pool.executar(analisar_texto, texto, modo)
         
         return {
             "success": True,
             "texto": texto[:500] + "...",
-            "analise": analise,
-            "resumo": resumo
+            "analise": resultado["analise"],
+            "resumo": resultado["resumo"]
         }
     
     finally:
-        if temp_path.exists():
-            temp_path.unlink()
+        temp_path.unlink(missing_ok=True)
+
+@router.post("/jobs", status_code=202)
+async def criar_job(file: UploadFile = File(...), analisar: bool = False):
+    """Enfileira OCR/análise de documentos longos; acompanhe em /api/integracoes/task/{task_id}"""
+    temp_path, sha256_hash, _ = await receber_upload(file)
+    destino = TEMP_DIR / f"{uuid4()}_{Path(file.filename or 'documento').name}"
+    os.replace(temp_path, destino)
+    
+    task = processar_documento_task.delay(str(destino), analisar, sha256_hash)
+    return {"task_id": task.id, "status": "PENDING"}
 
 @router.post("/buscar-similares")
-def buscar_similares(query: str, n_results: int = 5):
-    """Busca documentos similares"""
-    resultados = vector_store.buscar_similares(query, n_results)
+def buscar_similares(query: str, n_results: int = 5, processo_id: Optional[str] = None, cliente: Optional[str] = None):
+    """Busca documentos similares, opcionalmente restrita a um processo/cliente"""
+    filtros = {k: v for k, v in {"processo_id": processo_id, "cliente": cliente}.items() if v is not None}
+    resultados = servicos.get("vector_store").buscar_similares(query, n_results, **filtros)
     return {"resultados": resultados}
+
+@router.post("/indexacao/backfill", status_code=202)
+def indexar_acervo():
+    """Indexa o acervo pendente; progresso em /api/integracoes/task/{task_id}"""
+    task = indexar_acervo_task.delay()
+    return {"task_id": task.id, "status": "PENDING"}
+
+@router.get("/servicos")
+def status_servicos():
+    """Serviços de IA já carregados neste processo"""
+    return servicos.status()
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import Optional
+from fc_core.core.database import get_db
+from fc_core.core.models import PrazoComunicacao
+from fc_core.core import prazos
+
+router = APIRouter()
+
+@router.get("/proximos")
+def prazos_proximos(
+    dias: int = Query(7, ge=0, le=365),
+    cliente: Optional[str] = None,
+    limite: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    """Prazos pendentes que vencem de hoje até os próximos `dias` (índice em cumprido_em, vencimento)"""
+    linhas = prazos.proximos(db, dias, cliente=cliente).limit(limite).all()
+    return {
+        "dias": dias,
+        "total": len(linhas),
+        "prazos": [
+            {
+                "id": prazo.id,
+                "processo_id": str(prazo.processo_id) if prazo.processo_id else None,
+                "pasta": pasta,
+                "cliente": cliente_processo,
+                "numero_processo": prazo.numero_processo,
+                "tipo": prazo.tipo,
+                "origem": prazo.origem,
+                "data_disponibilizacao": prazo.data_disponibilizacao,
+                "dias_uteis": prazo.dias,
+                "vencimento": prazo.vencimento,
+                "prazo_informado": prazo.prazo_informado,
+            }
+            for prazo, pasta, cliente_processo in linhas
+        ]
+    }
+
+@router.post("/{prazo_id}/cumprir")
+def cumprir_prazo(prazo_id: str, db: Session = Depends(get_db)):
+    """Marca o prazo como cumprido (sai da lista de próximos)"""
+    prazo = db.get(PrazoComunicacao, prazo_id)
+    if not prazo:
+        raise HTTPException(status_code=404, detail="Prazo não encontrado")
+    prazo.cumprido_em = func.now()
+    db.commit()
+    return {"id": prazo_id, "cumprido": True}
@@ -1,72 +1,110 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from sqlalchemy import or_, func, select
 from typing import Optional
-from fc_core.core.database import get_db
+from fc_core.core import cache
+from fc_core.core.database import LEITURA_ASYNC, get_db, get_db_async
 from fc_core.core.models import Processo
-from fc_core.api.schemas import ProcessoCreate, ProcessoResponse, ProcessoList
+from fc_core.core.stats import ler_resumo
+from fc_core.api.schemas import ProcessoCreate, ProcessoResponse, ProcessoList, RelatorioRequest, RelatorioJob
 from uuid import UUID
-from fastapi.responses import FileResponse
-from fc_core.reporting.pdf_exporter import gerar_relatorio_processos
-from fc_core.reporting.excel_exporter import gerar_relatorio_excel
-from pathlib import Path
-from datetime import datetime
+from fastapi.responses import FileResponse, JSONResponse
+from fc_core.reporting.artefatos import (
+    FORMATOS, artefato_em_cache, localizar, normalizar_filtros
+)
+from fc_core.reporting.tasks import gerar_relatorio_task
 
 router = APIRouter()
-REPORTS_DIR = Path("outputs/reports")
-REPORTS_DIR.mkdir(parents=True, exist_ok=True)
 
-@router.get("/", response_model=ProcessoList)
-def list_processos(
+def filtros_processo(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     search: Optional[str] = None,
     situacao: Optional[str] = None,
     natureza: Optional[str] = None,
-    risco: Optional[str] = None,
-    db: Session = Depends(get_db)
-):
-    query = db.query(Processo).filter(Processo.deleted_at.is_(None))
+    risco: Optional[str] = None
+) -> dict:
+    return {"page": page, "page_size": page_size, "search": search,
+            "situacao": situacao, "natureza": natureza, "risco": risco}
+
+def _consulta_processos(filtros: dict):
+    query = select(Processo).where(Processo.deleted_at.is_(None))
     
-    if search:
-        query = query.filter(
+    if filtros["search"]:
+        query = query.where(
             or_(
-                Processo.pasta.ilike(f"%{search}%"),
-                Processo.numero_principal.ilike(f"%{search}%")
+                Processo.pasta.ilike(f"%{filtros['search']}%"),
+                Processo.numero_principal.ilike(f"%{filtros['search']}%")
             )
         )
     
-    if situacao:
-        query = query.filter(Processo.situacao == situacao)
-    
-    if natureza:
-        query = query.filter(Processo.natureza == natureza)
+    if filtros["situacao"]:
+        query = query.where(Processo.situacao == filtros["situacao"])
     
-    if risco:
-        query = query.filter(Processo.risco_atual == risco)
+    if filtros["natureza"]:
+        query = query.where(Processo.natureza == filtros["natureza"])
     
-    total = query.count()
-    items = query.offset((page - 1) * page_size).limit(page_size).all()
+    if filtros["risco"]:
+        query = query.where(Processo.risco_atual == filtros["risco"])
     
+    total = select(func.count()).select_from(query.subquery())
+    pagina = query.offset((filtros["page"] - 1) * filtros["page_size"]).limit(filtros["page_size"])
+    return total, pagina
+
+def _consulta_processo(processo_id: UUID):
+    return select(Processo).where(Processo.id == processo_id, Processo.deleted_at.is_(None))
+
+def _pagina(filtros: dict, total: int, items) -> dict:
     return {
         "total": total,
-        "items": items,
-        "page": page,
-        "page_size": page_size
+        "items": [_processo_json(p) for p in items],
+        "page": filtros["page"],
+        "page_size": filtros["page_size"]
     }
 
-@router.get("/{processo_id}", response_model=ProcessoResponse)
-def get_processo(processo_id: UUID, db: Session = Depends(get_db)):
-    processo = db.query(Processo).filter(
-        Processo.id == processo_id,
-        Processo.deleted_at.is_(None)
-    ).first()
-    
+def _processo_json(processo: Optional[Processo]) -> Optional[dict]:
+    return ProcessoResponse.model_validate(processo).model_dump(mode="json") if processo else None
+
+def _encontrado(processo: Optional[dict]) -> dict:
     if not processo:
         raise HTTPException(status_code=404, detail="Processo não encontrado")
-    
     return processo
 
+# Leituras quentes: versão async (engine async, sem ocupar o threadpool) e
+# síncrona; API_LEITURA_ASYNC escolhe qual é registrada. As duas passam pelo
+# cache do Redis (fc_core.core.cache), invalidado pelas escritas.
+
+async def list_processos(filtros: dict = Depends(filtros_processo), db: AsyncSession = Depends(get_db_async)):
+    async def calcular():
+        total, pagina = _consulta_processos(filtros)
+        return _pagina(filtros, await db.scalar(total), (await db.scalars(pagina)).all())
+    return await cache.lembrar_async("processos:lista", filtros, cache.tags_lista(filtros), calcular)
+
+def list_processos_sync(filtros: dict = Depends(filtros_processo), db: Session = Depends(get_db)):
+    def calcular():
+        total, pagina = _consulta_processos(filtros)
+        return _pagina(filtros, db.scalar(total), db.scalars(pagina).all())
+    return cache.lembrar("processos:lista", filtros, cache.tags_lista(filtros), calcular)
+
+async def get_processo(processo_id: UUID, db: AsyncSession = Depends(get_db_async)):
+    async def calcular():
+        return _processo_json(await db.scalar(_consulta_processo(processo_id)))
+    return _encontrado(await cache.lembrar_async(
+        "processos:detalhe", {"id": str(processo_id)}, [cache.tag_processo(processo_id)], calcular
+    ))
+
+def get_processo_sync(processo_id: UUID, db: Session = Depends(get_db)):
+    return _encontrado(cache.lembrar(
+        "processos:detalhe", {"id": str(processo_id)}, [cache.tag_processo(processo_id)],
+        lambda: _processo_json(db.scalar(_consulta_processo(processo_id)))
+    ))
+
+router.add_api_route("/", list_processos if LEITURA_ASYNC else list_processos_sync,
+                     methods=["GET"], response_model=ProcessoList)
+router.add_api_route("/{processo_id}", get_processo if LEITURA_ASYNC else get_processo_sync,
+                     methods=["GET"], response_model=ProcessoResponse)
+
 @router.post("/", response_model=ProcessoResponse, status_code=201)
 def create_processo(data: ProcessoCreate, db: Session = Depends(get_db)):
     existing = db.query(Processo).filter(Processo.pasta == data.pasta).first()
@@ -77,6 +115,7 @@ def create_processo(data: ProcessoCreate, db: Session = Depends(get_db)):
     db.add(processo)
     db.commit()
     db.refresh(processo)
+    cache.invalidar_processo(processo.id, cache.valores_filtro(processo))
     return processo
 
 @router.put("/{processo_id}", response_model=ProcessoResponse)
@@ -85,11 +124,13 @@ def update_processo(processo_id: UUID, data: ProcessoCreate, db: Session = Depen
     if not processo:
         raise HTTPException(status_code=404, detail="Processo não encontrado")
     
+    antes = cache.valores_filtro(processo)
     for key, value in data.dict(exclude_unset=True).items():
         setattr(processo, key, value)
     
     db.commit()
     db.refresh(processo)
+    cache.invalidar_processo(processo.id, antes, cache.valores_filtro(processo))
     return processo
 
 @router.delete("/{processo_id}", status_code=204)
@@ -100,36 +141,73 @@ def delete_processo(processo_id: UUID, db: Session = Depends(get_db)):
     
     processo.deleted_at = func.now()
     db.commit()
+    cache.invalidar_processo(processo.id, cache.valores_filtro(processo))
     return None
 
-@router.get("/stats/summary")
-def get_stats(db: Session = Depends(get_db)):
-    total = db.query(Processo).filter(Processo.deleted_at.is_(None)).count()
-    
-    por_situacao = db.query(
-        Processo.situacao, func.count(Processo.id)
-    ).filter(Processo.deleted_at.is_(None)).group_by(Processo.situacao).all()
-    
-    por_risco = db.query(
-        Processo.risco_atual, func.count(Processo.id)
-    ).filter(Processo.deleted_at.is_(None)).group_by(Processo.risco_atual).all()
-    
-    return {
-        "total": total,
-        "por_situacao": dict(por_situacao),
-        "por_risco": dict(por_risco)
-    }
+async def get_stats(db: AsyncSession = Depends(get_db_async)):
+    """Resumo do dashboard lido dos contadores materializados (ver fc_core.core.stats)"""
+    return await db.run_sync(ler_resumo)
+
+def get_stats_sync(db: Session = Depends(get_db)):
+    """Resumo do dashboard lido dos contadores materializados (ver fc_core.core.stats)"""
+    return ler_resumo(db)
+
+router.add_api_route("/stats/summary", get_stats if LEITURA_ASYNC else get_stats_sync, methods=["GET"])
+
+def _download_url(arquivo: str) -> str:
+    return f"/api/processos/export/artefatos/{arquivo}"
+
+def _servir_artefato(caminho, formato: str):
+    _, media_type = FORMATOS[formato]
+    return FileResponse(caminho, media_type=media_type, filename=f"processos{caminho.suffix}")
+
+def _exportar(db: Session, formato: str):
+    """Serve do cache; senão enfileira e responde 202 com o job (a API nunca gera o relatório)"""
+    cached = artefato_em_cache(db, formato)
+    if cached:
+        return _servir_artefato(cached, formato)
+    task = gerar_relatorio_task.delay(formato, {})
+    status_url = f"/api/processos/export/jobs/{task.id}"
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": task.id, "status": "PENDING", "status_url": status_url},
+        headers={"Location": status_url}
+    )
 
 @router.get("/export/pdf")
 def export_pdf(db: Session = Depends(get_db)):
-    processos = db.query(Processo).filter(Processo.deleted_at.is_(None)).all()
-    output_path = REPORTS_DIR / f"processos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-    gerar_relatorio_processos(processos, str(output_path))
-    return FileResponse(output_path, media_type="application/pdf", filename=output_path.name)
+    """Legado: arquivo se já em cache, senão 202 com o job; prefira POST /export/jobs"""
+    return _exportar(db, "pdf")
 
 @router.get("/export/excel")
 def export_excel(db: Session = Depends(get_db)):
-    processos = db.query(Processo).filter(Processo.deleted_at.is_(None)).all()
-    output_path = REPORTS_DIR / f"processos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    gerar_relatorio_excel(processos, str(output_path))
-    return FileResponse(output_path, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", filename=output_path.name)
+    """Legado: arquivo se já em cache, senão 202 com o job; prefira POST /export/jobs"""
+    return _exportar(db, "excel")
+
+@router.post("/export/jobs", response_model=RelatorioJob, status_code=202)
+def criar_job_relatorio(request: RelatorioRequest, db: Session = Depends(get_db)):
+    """Enfileira a geração de um relatório; responde na hora se já estiver em cache"""
+    filtros = request.dict(exclude={"formato"})
+    cached = artefato_em_cache(db, request.formato, filtros)
+    if cached:
+        return {"status": "SUCCESS", "download_url": _download_url(cached.name)}
+
+    task = gerar_relatorio_task.delay(request.formato, normalizar_filtros(filtros))
+    return {"job_id": task.id, "status": "PENDING"}
+
+@router.get("/export/jobs/{job_id}", response_model=RelatorioJob)
+def consultar_job_relatorio(job_id: str):
+    from celery.result import AsyncResult
+    task = AsyncResult(job_id)
+
+    if task.successful():
+        return {"job_id": job_id, "status": task.state, "download_url": _download_url(task.result["arquivo"])}
+    return {"job_id": job_id, "status": task.state}
+
+@router.get("/export/artefatos/{nome}")
+def baixar_artefato(nome: str):
+    caminho = localizar(nome)
+    if not caminho:
+        raise HTTPException(status_code=404, detail="Relatório não encontrado ou expirado")
+    formato = "pdf" if caminho.suffix == ".pdf" else "excel"
+    return _servir_artefato(caminho, formato)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, UUID4
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
 from decimal import Decimal
 
@@ -47,3 +47,16 @@ class ProcessoList(BaseModel):
     items: List[ProcessoResponse]
     page: int
     page_size: int
+
+class RelatorioRequest(BaseModel):
+    formato: Literal["pdf", "excel"]
+    situacao: Optional[str] = None
+    natureza: Optional[str] = None
+    risco: Optional[str] = None
+    cliente: Optional[str] = None
+    categoria: Optional[str] = None
+
+class RelatorioJob(BaseModel):
+    job_id: Optional[str] = None
+    status: str
+    download_url: Optional[str] = None
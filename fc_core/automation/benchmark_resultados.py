@@ -0,0 +1,107 @@
+"""
+Benchmark de memória do result backend para um lote de tasks de scraping.
+
+Uso:
+    python -m fc_core.automation.benchmark_resultados --tasks 10000 --movimentacoes 50
+    python -m fc_core.automation.benchmark_resultados --redis redis://localhost:6379/15
+
+Compara o resultado completo (cabeçalho + movimentações, como era devolvido
+antes) com o resumo que scrape_processo_task devolve hoje, em json e fcpack.
+Com --redis grava as chaves celery-task-meta-* de verdade num banco de teste
+e mede a variação de used_memory (as chaves são apagadas no fim).
+"""
+from datetime import datetime, timezone
+import argparse
+import random
+import time
+import uuid
+
+from kombu.serialization import dumps
+
+from fc_core.automation.tasks import resumo_resultado
+from fc_core.core import codec
+
+codec.registrar()
+
+PALAVRAS = ("juntada", "petição", "conclusos", "despacho", "intimação", "decisão", "prazo", "audiência",
+            "designada", "expedido", "mandado", "certidão", "publicado", "recurso", "contrarrazões")
+
+
+def resultado_sintetico(i: int, movimentacoes: int, rng: random.Random) -> dict:
+    return {
+        "success": True,
+        "processo": {
+            "numero": f"{i:07d}-12.2024.8.26.0100",
+            "origem": "PJe",
+            "classe": "Procedimento Comum Cível",
+            "assunto": "Indenização por Dano Moral",
+            "area": "Cível",
+            "distribuicao": "2024-01-10",
+            "valor_causa": f"{rng.randint(1000, 500000)}.00",
+        },
+        "movimentacoes": [
+            {
+                "data": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(8, 18):02d}:00:00",
+                "descricao": " ".join(rng.choice(PALAVRAS) for _ in range(rng.randint(8, 30))),
+                "origem": "PJe",
+            }
+            for _ in range(movimentacoes)
+        ],
+    }
+
+
+def meta(task_id: str, resultado: dict) -> dict:
+    """Mesmo formato que o backend Redis grava em celery-task-meta-<id>"""
+    return {"status": "SUCCESS", "result": resultado, "traceback": None, "children": [],
+            "date_done": datetime.now(timezone.utc).isoformat(), "task_id": task_id}
+
+
+def executar(n_tasks: int, movimentacoes: int, redis_url: str = None):
+    rng = random.Random(0)
+    ids = [str(uuid.uuid4()) for _ in range(n_tasks)]
+    completos = [resultado_sintetico(i, movimentacoes, rng) for i in range(n_tasks)]
+    resumos = [
+        resumo_resultado("pje", r["processo"]["numero"], r, {"processo_id": str(uuid.uuid4()), "mudancas": 2})
+        for r in completos
+    ]
+
+    print(f"{n_tasks} tasks, {movimentacoes} movimentações cada\n")
+    print(f"{'resultado':<10} {'serializer':<10} {'total (MB)':>11} {'média (B)':>10} {'encode (s)':>11}")
+    medidas = {}
+    for nome, resultados in (("completo", completos), ("resumo", resumos)):
+        for serializer in ("json", codec.NOME):
+            inicio = time.perf_counter()
+            corpos = [dumps(meta(t, r), serializer=serializer)[2] for t, r in zip(ids, resultados)]
+            segundos = time.perf_counter() - inicio
+            total = sum(len(c) for c in corpos)
+            medidas[(nome, serializer)] = corpos
+            print(f"{nome:<10} {serializer:<10} {total / 2**20:>11.2f} {total / n_tasks:>10.0f} {segundos:>11.2f}")
+
+    if redis_url:
+        import redis
+
+        r = redis.Redis.from_url(redis_url)
+        print("\nRedis (used_memory):")
+        for (nome, serializer), corpos in medidas.items():
+            r.flushdb()
+            antes = r.info("memory")["used_memory"]
+            pipe = r.pipeline(transaction=False)
+            for task_id, corpo in zip(ids, corpos):
+                pipe.set(f"celery-task-meta-{task_id}", corpo)
+            pipe.execute()
+            depois = r.info("memory")["used_memory"]
+            print(f"  {nome:<10} {serializer:<10} {(depois - antes) / 2**20:>8.2f} MB")
+        r.flushdb()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--movimentacoes", type=int, default=50)
+    parser.add_argument("--redis", help="URL de um banco Redis descartável (é esvaziado com FLUSHDB)")
+    args = parser.parse_args()
+    executar(args.tasks, args.movimentacoes, args.redis)
+
+
+if __name__ == "__main__":
+    main()
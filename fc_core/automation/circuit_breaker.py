@@ -0,0 +1,86 @@
+"""
+Circuit breaker por tribunal, compartilhado entre workers via Redis.
+
+    fechado     tudo passa; falhas do tribunal são contadas numa janela
+    aberto      após `limiar` falhas na janela: nada passa durante o cooldown
+    meio-aberto terminado o cooldown, uma única sonda passa por vez; sucesso
+                fecha o circuito, falha reabre
+
+Chaves: cb:<tribunal>:falhas (contador com TTL da janela),
+cb:<tribunal>:aberto (TTL = cooldown), cb:<tribunal>:meio (em teste),
+cb:<tribunal>:sonda (lock da sonda).
+"""
+from typing import Optional
+import logging
+
+from fc_core.core.config import get_settings
+from fc_core.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+FECHADO = "fechado"
+ABERTO = "aberto"
+MEIO_ABERTO = "meio_aberto"
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        tribunal: str,
+        limiar: Optional[int] = None,
+        janela: Optional[int] = None,
+        cooldown: Optional[int] = None
+    ):
+        self.tribunal = (tribunal or "desconhecido").lower()
+        self.limiar = limiar or settings.circuit_breaker_limiar
+        self.janela = janela or settings.circuit_breaker_janela_seconds
+        self.cooldown = cooldown or settings.circuit_breaker_cooldown_seconds
+        self._prefixo = f"cb:{self.tribunal}"
+
+    def _k(self, nome: str) -> str:
+        return f"{self._prefixo}:{nome}"
+
+    def estado(self) -> str:
+        r = get_redis()
+        if r.exists(self._k("aberto")):
+            return ABERTO
+        if r.exists(self._k("meio")):
+            return MEIO_ABERTO
+        return FECHADO
+
+    def permitir(self) -> bool:
+        """True se a chamada pode seguir (no meio-aberto, só a sonda da vez)"""
+        estado = self.estado()
+        if estado == ABERTO:
+            return False
+        if estado == MEIO_ABERTO:
+            # Sonda expira sozinha se o worker morrer no meio
+            return bool(get_redis().set(self._k("sonda"), 1, nx=True, ex=settings.scrape_sonda_timeout_seconds))
+        return True
+
+    def tempo_restante(self) -> int:
+        """Segundos até o circuito aceitar uma sonda"""
+        return max(get_redis().ttl(self._k("aberto")), 0)
+
+    def registrar_sucesso(self):
+        get_redis().delete(self._k("falhas"), self._k("meio"), self._k("sonda"))
+
+    def registrar_falha(self):
+        r = get_redis()
+        if r.exists(self._k("meio")):
+            self._abrir()  # Sonda falhou: reabre
+            return
+        falhas = r.incr(self._k("falhas"))
+        if falhas == 1:
+            r.expire(self._k("falhas"), self.janela)
+        if falhas >= self.limiar:
+            self._abrir()
+
+    def _abrir(self):
+        pipe = get_redis().pipeline()
+        pipe.set(self._k("aberto"), 1, ex=self.cooldown)
+        pipe.set(self._k("meio"), 1, ex=self.cooldown * 10)
+        pipe.delete(self._k("falhas"), self._k("sonda"))
+        pipe.execute()
+        logger.warning(f"Circuit breaker aberto para {self.tribunal} por {self.cooldown}s")
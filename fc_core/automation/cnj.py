@@ -0,0 +1,51 @@
+"""
+Numeração única CNJ (Resolução 65/2008): NNNNNNN-DD.AAAA.J.TR.OOOO
+
+J é o segmento do Judiciário e TR o tribunal. Juntos identificam o tribunal,
+usado para agrupar lotes por corte, escolher o scraper e aplicar limites por
+tribunal.
+"""
+from typing import Optional
+import re
+
+CNJ_REGEX = re.compile(r"^(\d{7})-?(\d{2})\.?(\d{4})\.?(\d)\.?(\d{2})\.?(\d{4})$")
+
+UF_POR_TR = {
+    "01": "ac", "02": "al", "03": "ap", "04": "am", "05": "ba", "06": "ce", "07": "df",
+    "08": "es", "09": "go", "10": "ma", "11": "mt", "12": "ms", "13": "mg", "14": "pa",
+    "15": "pb", "16": "pr", "17": "pe", "18": "pi", "19": "rj", "20": "rn", "21": "rs",
+    "22": "ro", "23": "rr", "24": "sc", "25": "se", "26": "sp", "27": "to",
+}
+
+
+def normalizar_cnj(numero: str) -> Optional[str]:
+    """Retorna o número formatado (NNNNNNN-DD.AAAA.J.TR.OOOO) ou None se não for CNJ"""
+    m = CNJ_REGEX.match((numero or "").strip())
+    if not m:
+        return None
+    n, dd, aaaa, j, tr, oooo = m.groups()
+    return f"{n}-{dd}.{aaaa}.{j}.{tr}.{oooo}"
+
+
+def tribunal_do_cnj(numero: str) -> Optional[str]:
+    """Chave do tribunal (ex: "tjsp", "trf4", "trt3") a partir dos segmentos J.TR"""
+    m = CNJ_REGEX.match((numero or "").strip())
+    if not m:
+        return None
+    j, tr = m.group(4), m.group(5)
+    if j == "8":
+        uf = UF_POR_TR.get(tr)
+        return f"tj{uf}" if uf else None
+    if j == "4" and 1 <= int(tr) <= 6:
+        return f"trf{int(tr)}"
+    if j == "5" and 1 <= int(tr) <= 24:
+        return f"trt{int(tr)}"
+    return None
+
+
+def uf_do_cnj(numero: str) -> Optional[str]:
+    """UF da Justiça Estadual (J=8); demais segmentos não têm calendário estadual próprio"""
+    m = CNJ_REGEX.match((numero or "").strip())
+    if not m or m.group(4) != "8":
+        return None
+    return UF_POR_TR.get(m.group(5))
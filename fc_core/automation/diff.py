@@ -0,0 +1,87 @@
+"""
+Normalização, hash e diff estrutural de snapshots de scraping.
+
+Um snapshot é {"processo": {...cabeçalho...}, "movimentacoes": [...]}
+normalizado: campos voláteis e vazios removidos, espaços colapsados e chaves
+ordenadas. Dois scrapings com o mesmo conteúdo produzem o mesmo hash, mesmo
+que a ordem das chaves ou a formatação do HTML mude.
+
+Módulo puro (sem banco); a persistência fica em fc_core.automation.snapshots.
+"""
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+
+SNAPSHOT_INICIAL = "snapshot_inicial"
+MOVIMENTACAO_NOVA = "movimentacao_nova"
+VALOR_ALTERADO = "valor_alterado"
+SITUACAO_ALTERADA = "situacao_alterada"
+CAMPO_ALTERADO = "campo_alterado"
+
+CAMPOS_VOLATEIS = {"extraido_em", "coletado_em", "timestamp", "movimentacoes_count"}
+CAMPOS_VALOR = {"valor_causa", "valor"}
+CAMPOS_SITUACAO = {"situacao", "status", "fase"}
+
+
+def _normalizar(valor: Any) -> Any:
+    if isinstance(valor, dict):
+        itens = ((k, _normalizar(v)) for k, v in sorted(valor.items()) if k not in CAMPOS_VOLATEIS)
+        return {k: v for k, v in itens if v not in (None, "", [], {})}
+    if isinstance(valor, (list, tuple)):
+        return [_normalizar(v) for v in valor]
+    if isinstance(valor, str):
+        return " ".join(valor.split())
+    if isinstance(valor, Decimal):
+        return str(valor)
+    return valor
+
+
+def montar_snapshot(processo: Optional[dict], movimentacoes: Optional[List[dict]] = None) -> Dict[str, Any]:
+    processo = dict(processo or {})
+    if movimentacoes is None:
+        movimentacoes = processo.pop("movimentacoes", None)
+    else:
+        processo.pop("movimentacoes", None)
+    return {
+        "processo": _normalizar(processo),
+        "movimentacoes": _normalizar(movimentacoes or []),
+    }
+
+
+def _canonico(valor: Any) -> bytes:
+    return json.dumps(valor, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def hash_snapshot(snapshot: Dict[str, Any]) -> str:
+    return hashlib.sha256(_canonico(snapshot)).hexdigest()
+
+
+def hash_movimentacao(movimentacao: Dict[str, Any]) -> str:
+    return hashlib.sha256(_canonico(movimentacao)).hexdigest()[:16]
+
+
+def _tipo_campo(campo: str) -> str:
+    if campo in CAMPOS_VALOR:
+        return VALOR_ALTERADO
+    if campo in CAMPOS_SITUACAO:
+        return SITUACAO_ALTERADA
+    return CAMPO_ALTERADO
+
+
+def diff(anterior: Optional[Dict[str, Any]], atual: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Eventos compactos entre dois snapshots normalizados"""
+    if anterior is None:
+        return [{"tipo": SNAPSHOT_INICIAL, "movimentacoes": len(atual.get("movimentacoes", []))}]
+
+    eventos = []
+    antes, depois = anterior.get("processo", {}), atual.get("processo", {})
+    for campo in sorted(set(antes) | set(depois)):
+        if antes.get(campo) != depois.get(campo):
+            eventos.append({"tipo": _tipo_campo(campo), "campo": campo, "de": antes.get(campo), "para": depois.get(campo)})
+
+    vistas = {hash_movimentacao(m) for m in anterior.get("movimentacoes", [])}
+    for movimentacao in atual.get("movimentacoes", []):
+        if hash_movimentacao(movimentacao) not in vistas:
+            eventos.append({"tipo": MOVIMENTACAO_NOVA, "movimentacao": movimentacao})
+    return eventos
@@ -0,0 +1,189 @@
+"""
+Monitoramento do DJEN por termo (parte/OAB) em vez de por processo.
+
+Uma consulta por dia e por termo cobre a carteira inteira: a API de
+comunicações do DJEN é paginada até o fim, cada publicação é deduplicada
+pelo hash do conteúdo e distribuída localmente para o processo com o mesmo
+CNJ (índice em Processo.numero_principal). O custo passa de O(processos)
+para O(termos).
+
+Termos:
+    parte   um por empresa de clientes.json (filiais agrupadas pela raiz do
+            CNPJ; sem CNPJ, pelo nome). A API filtra por nome da parte.
+    oab     inscrições de DJEN_OABS ("12345/RS")
+
+Publicação de processo da carteira vira EventoProcesso ("publicacao_djen")
+e antecipa a próxima verificação do processo no tribunal.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+import hashlib
+import logging
+import re
+
+import requests
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from fc_core.automation.cnj import normalizar_cnj
+from fc_core.core.config import get_settings
+from fc_core.core.filiais import FilialManager
+from fc_core.core.models import EventoProcesso, Processo, PublicacaoDJEN
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+FONTE = "djen"
+PUBLICACAO_DJEN = "publicacao_djen"
+PARTE = "parte"
+OAB = "oab"
+LOTE_CONSULTA = 500  # Hashes/CNJs por IN
+
+
+@dataclass(frozen=True)
+class Termo:
+    tipo: str  # PARTE ou OAB
+    valor: str
+
+    @property
+    def chave(self) -> str:
+        return f"{self.tipo}:{self.valor}"
+
+
+def termos_monitorados(filiais: Optional[FilialManager] = None, oabs: Optional[str] = None) -> List[Termo]:
+    """Termos únicos: uma parte por empresa cliente e uma entrada por OAB"""
+    filiais = filiais or FilialManager()
+    por_empresa: Dict[str, str] = {}
+    for filial in filiais.get_all():
+        nome = " ".join((filial.nome_maiusculo or filial.nome or "").split())
+        if not nome:
+            continue
+        raiz = re.sub(r"\D", "", str(filial.cnpj_conv or "").split(".")[0])[:8]
+        por_empresa.setdefault(raiz or nome, nome)
+
+    termos = [Termo(PARTE, nome) for nome in sorted(set(por_empresa.values()))]
+    for oab in (settings.djen_oabs if oabs is None else oabs).split(","):
+        oab = oab.strip().upper().replace(" ", "")
+        if re.fullmatch(r"\d+/[A-Z]{2}", oab):
+            termos.append(Termo(OAB, oab))
+    return termos
+
+
+def _data(valor) -> Optional[date]:
+    try:
+        return date.fromisoformat(str(valor)[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+def normalizar_publicacao(item: dict) -> dict:
+    """Item da API -> campos de PublicacaoDJEN (+ hash do conteúdo)"""
+    numero = item.get("numeroprocessocommascara") or item.get("numero_processo") or item.get("processo") or ""
+    publicacao = {
+        "numero_processo": normalizar_cnj(numero) or numero or None,
+        "tribunal": item.get("siglaTribunal") or item.get("tribunal"),
+        "data_disponibilizacao": _data(item.get("data_disponibilizacao") or item.get("dataDisponibilizacao")),
+        "tipo_comunicacao": item.get("tipoComunicacao"),
+        "texto": " ".join(str(item.get("texto") or item.get("conteudo") or "").split()),
+        "link": item.get("link"),
+    }
+    base = "|".join(str(publicacao[c] or "") for c in ("tribunal", "numero_processo", "data_disponibilizacao", "texto"))
+    publicacao["hash"] = hashlib.sha256(base.encode("utf-8")).hexdigest()
+    return publicacao
+
+
+class ClienteDJEN:
+    """API pública de comunicações do DJEN (Comunica PJe)"""
+
+    def __init__(self, base_url: Optional[str] = None, itens_por_pagina: Optional[int] = None, timeout: int = 60):
+        self.base_url = base_url or settings.djen_api_url
+        self.itens_por_pagina = itens_por_pagina or settings.djen_itens_por_pagina
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _filtros(self, termo: Termo) -> dict:
+        if termo.tipo == OAB:
+            numero, uf = termo.valor.split("/")
+            return {"numeroOab": numero, "ufOab": uf}
+        return {"nomeParte": termo.valor}
+
+    def buscar(self, termo: Termo, inicio: date, fim: date, max_paginas: Optional[int] = None) -> Iterator[dict]:
+        """Todas as publicações do termo no período, página a página"""
+        max_paginas = max_paginas or settings.djen_max_paginas
+        params = dict(
+            self._filtros(termo),
+            dataDisponibilizacaoInicio=inicio.isoformat(),
+            dataDisponibilizacaoFim=fim.isoformat(),
+            itensPorPagina=self.itens_por_pagina,
+        )
+        lidos = 0
+        for pagina in range(1, max_paginas + 1):
+            resp = self.session.get(self.base_url, params=dict(params, pagina=pagina), timeout=self.timeout)
+            resp.raise_for_status()
+            dados = resp.json()
+            itens = dados.get("items") or []
+            yield from itens
+            lidos += len(itens)
+            if len(itens) < self.itens_por_pagina or lidos >= int(dados.get("count") or 0):
+                return
+        logger.warning(f"DJEN {termo.chave}: limite de {max_paginas} páginas atingido")
+
+
+def _em_lotes(itens: List, tamanho: int = LOTE_CONSULTA) -> Iterator[List]:
+    for i in range(0, len(itens), tamanho):
+        yield itens[i:i + tamanho]
+
+
+def registrar_publicacoes(db: Session, itens: List[dict], termo: Termo, agora: Optional[datetime] = None) -> Tuple[int, int]:
+    """
+    Grava as publicações ainda não vistas e distribui para os processos da
+    carteira. Retorna (novas, vinculadas a processos). Commit fica com quem chama.
+
+    Termos se sobrepõem (OAB do escritório x partes) e rodam em paralelo: uma
+    publicação que outro termo gravou depois da checagem de vistas bate na
+    chave primária e é pulada (savepoint por linha), sem gerar evento.
+    """
+    agora = agora or datetime.now(timezone.utc)
+    unicas = {}
+    for item in itens:
+        publicacao = normalizar_publicacao(item)
+        unicas.setdefault(publicacao["hash"], publicacao)
+
+    vistas = set()
+    for lote in _em_lotes(list(unicas)):
+        vistas.update(h for (h,) in db.query(PublicacaoDJEN.hash).filter(PublicacaoDJEN.hash.in_(lote)))
+    novas = [p for h, p in unicas.items() if h not in vistas]
+    if not novas:
+        return 0, 0
+
+    numeros = sorted({p["numero_processo"] for p in novas if p["numero_processo"]})
+    processos: Dict[str, Processo] = {}
+    for lote in _em_lotes(numeros):
+        for processo in db.query(Processo).filter(Processo.numero_principal.in_(lote), Processo.deleted_at.is_(None)):
+            processos[processo.numero_principal] = processo
+
+    gravadas = vinculadas = 0
+    for publicacao in novas:
+        processo = processos.get(publicacao["numero_processo"])
+        try:
+            # Evento e reagendamento no mesmo savepoint: só existem se a publicação entrou
+            with db.begin_nested():
+                db.add(PublicacaoDJEN(processo_id=processo.id if processo else None, termo=termo.valor, **publicacao))
+                db.flush()
+                if processo is not None:
+                    db.add(EventoProcesso(processo_id=processo.id, fonte=FONTE, tipo=PUBLICACAO_DJEN, dados={
+                        "hash": publicacao["hash"],
+                        "tribunal": publicacao["tribunal"],
+                        "data": publicacao["data_disponibilizacao"].isoformat() if publicacao["data_disponibilizacao"] else None,
+                        "tipo_comunicacao": publicacao["tipo_comunicacao"],
+                        "resumo": publicacao["texto"][:200],
+                        "link": publicacao["link"],
+                    }))
+                    # Houve ato no processo: verificar o tribunal na próxima rodada
+                    processo.proxima_verificacao = agora
+        except IntegrityError:
+            continue
+        gravadas += 1
+        vinculadas += processo is not None
+    return gravadas, vinculadas
@@ -0,0 +1,101 @@
+"""
+Taxonomia de erros de scraping e política de retry.
+
+Só erros transitórios (rede, tribunal fora do ar, desconhecidos) são
+retentados, com backoff exponencial e jitter completo. Falha de login,
+processo inexistente, erro de parse e sistema não suportado falham de
+imediato, sem ocupar novos slots de worker.
+"""
+from typing import Union
+import random
+import re
+
+from fc_core.core.config import get_settings
+
+settings = get_settings()
+
+TRANSITORIO = "transitorio"
+TRIBUNAL_FORA = "tribunal_fora"
+AUTENTICACAO = "autenticacao"
+NAO_ENCONTRADO = "nao_encontrado"
+PARSE = "parse"
+NAO_SUPORTADO = "nao_suportado"
+DESCONHECIDO = "desconhecido"
+
+RETENTAVEIS = {TRANSITORIO, TRIBUNAL_FORA, DESCONHECIDO}
+# Falhas que indicam problema no tribunal (alimentam o circuit breaker)
+FALHAS_DO_TRIBUNAL = {TRANSITORIO, TRIBUNAL_FORA}
+
+
+class ErroScraping(Exception):
+    categoria = DESCONHECIDO
+
+    def __init__(self, mensagem: str, categoria: str = None):
+        super().__init__(mensagem)
+        if categoria:
+            self.categoria = categoria
+
+
+class TribunalIndisponivel(ErroScraping):
+    categoria = TRIBUNAL_FORA
+
+
+class FalhaAutenticacao(ErroScraping):
+    categoria = AUTENTICACAO
+
+
+class SistemaNaoSuportado(ErroScraping):
+    categoria = NAO_SUPORTADO
+
+
+_TIPOS_TRANSITORIOS = {
+    "TimeoutException", "StaleElementReferenceException", "ConnectionError", "ConnectTimeout",
+    "ReadTimeout", "Timeout", "ProtocolError", "ConnectionResetError", "BrokenPipeError",
+    "SessionNotCreatedException", "InvalidSessionIdException",
+}
+_TIPOS_PARSE = {
+    "NoSuchElementException", "KeyError", "IndexError", "AttributeError", "TypeError", "ValueError",
+}
+
+# (categoria, padrão da mensagem) na ordem de verificação; códigos HTTP com \b
+# para não casar com trechos de números de processo
+_MENSAGENS = [
+    (NAO_SUPORTADO, re.compile(r"não suportado|nao suportado|scraper não encontrado")),
+    (AUTENTICACAO, re.compile(r"falha no login|credenciais|senha inválida|unauthorized|\b40[13]\b")),
+    (TRIBUNAL_FORA, re.compile(
+        r"\b50[234]\b|service unavailable|bad gateway|gateway timeout|indispon[íi]vel|manutenção"
+        r"|err_connection_refused|err_name_not_resolved"
+    )),
+    (TRANSITORIO, re.compile(r"timeout|timed out|net::err_|connection reset|connection aborted|temporarily")),
+    (NAO_ENCONTRADO, re.compile(r"n[ãa]o encontrado|not found|\b404\b|nenhum processo")),
+]
+
+
+def classificar(erro: Union[BaseException, str]) -> str:
+    """Categoria do erro a partir do tipo da exceção e/ou da mensagem"""
+    if isinstance(erro, ErroScraping):
+        return erro.categoria
+
+    mensagem = str(erro).lower()
+    for categoria, padrao in _MENSAGENS:
+        if padrao.search(mensagem):
+            return categoria
+
+    if isinstance(erro, BaseException):
+        nomes = {cls.__name__ for cls in type(erro).__mro__}
+        if nomes & _TIPOS_TRANSITORIOS:
+            return TRANSITORIO
+        if nomes & _TIPOS_PARSE:
+            return PARSE
+    return DESCONHECIDO
+
+
+def retentavel(categoria: str) -> bool:
+    return categoria in RETENTAVEIS
+
+
+def espera_retry(tentativa: int, base: int = None, teto: int = None) -> float:
+    """Backoff exponencial com jitter completo: uniforme em [1, min(teto, base * 2^tentativa)]"""
+    base = base or settings.scrape_retry_base_seconds
+    teto = teto or settings.scrape_retry_max_seconds
+    return random.uniform(1, max(1, min(teto, base * 2 ** tentativa)))
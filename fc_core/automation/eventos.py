@@ -0,0 +1,181 @@
+"""
+Barramento de eventos de processo (Redis Streams).
+
+    outbox      EventoProcesso é gravado na mesma transação do processo
+                (fc_core.automation.snapshots); o relay publica as linhas
+                com publicado_em nulo no stream e marca como publicadas.
+                Roda logo após o commit e, como rede de segurança, no beat.
+    transientes conclusão de scrape/lote vai direto para o stream (sem outbox)
+    consumo     SSE lê o stream com XREAD a partir do Last-Event-ID (cliente
+                async: conexões abertas não ocupam threads da API);
+                webhooks leem pelo consumer group GRUPO_WEBHOOKS e entregam
+                em lotes assinados com HMAC-SHA256, só para URLs https de
+                hosts públicos (validar_url_webhook).
+
+Entrega é pelo menos uma vez: se o commit falhar depois do XADD, o evento é
+publicado de novo. Consumidores deduplicam por `evento_id` (eventos do outbox).
+"""
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import socket
+
+from redis.exceptions import RedisError, ResponseError
+from sqlalchemy.orm import Session
+
+from fc_core.core.config import get_settings
+from fc_core.core.models import EventoProcesso
+from fc_core.core.redis_client import get_redis, get_redis_async
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+STREAM = "eventos:processos"
+GRUPO_WEBHOOKS = "webhooks"
+TRAVA_RELAY = "eventos:relay"
+
+SCRAPE_CONCLUIDO = "scrape_concluido"
+SCRAPE_FALHOU = "scrape_falhou"
+LOTE_CONCLUIDO = "lote_concluido"
+
+
+def _campos(tipo: str, dados: dict, processo_id=None, fonte: Optional[str] = None, evento_id=None) -> Dict[str, str]:
+    return {
+        "tipo": tipo,
+        "processo_id": str(processo_id or ""),
+        "fonte": fonte or "",
+        "evento_id": str(evento_id or ""),
+        "dados": json.dumps(dados or {}, ensure_ascii=False, default=str),
+    }
+
+
+def decodificar(stream_id: str, campos: Dict[str, str]) -> dict:
+    """Entrada do stream -> evento (mesmo formato no SSE e nos webhooks)"""
+    return {
+        "id": stream_id,
+        "tipo": campos.get("tipo"),
+        "processo_id": campos.get("processo_id") or None,
+        "fonte": campos.get("fonte") or None,
+        "evento_id": int(campos["evento_id"]) if campos.get("evento_id") else None,
+        "dados": json.loads(campos.get("dados") or "{}"),
+    }
+
+
+def publicar(tipo: str, dados: dict, processo_id=None, fonte: Optional[str] = None):
+    """Evento transiente; falha no Redis não interrompe quem publica"""
+    try:
+        get_redis().xadd(STREAM, _campos(tipo, dados, processo_id, fonte),
+                         maxlen=settings.eventos_stream_maxlen, approximate=True)
+    except RedisError as e:
+        logger.warning(f"Evento {tipo} não publicado: {e}")
+
+
+def publicar_pendentes(db: Session, limite: int = 500) -> int:
+    """
+    Relay do outbox: publica os eventos ainda não enviados ao stream.
+    Um relay por vez; quem não pega a trava deixa para o próximo.
+    """
+    try:
+        r = get_redis()
+        if not r.set(TRAVA_RELAY, 1, nx=True, ex=60):
+            return 0
+    except RedisError as e:
+        logger.warning(f"Relay de eventos indisponível: {e}")
+        return 0
+
+    try:
+        pendentes = db.query(EventoProcesso).filter(
+            EventoProcesso.publicado_em.is_(None)
+        ).order_by(EventoProcesso.id).limit(limite).all()
+        if not pendentes:
+            return 0
+        pipe = r.pipeline(transaction=False)
+        for evento in pendentes:
+            pipe.xadd(STREAM, _campos(evento.tipo, evento.dados, evento.processo_id, evento.fonte, evento.id),
+                      maxlen=settings.eventos_stream_maxlen, approximate=True)
+        pipe.execute()
+        agora = datetime.now(timezone.utc)
+        for evento in pendentes:
+            evento.publicado_em = agora
+        db.commit()
+        return len(pendentes)
+    except RedisError as e:
+        db.rollback()
+        logger.warning(f"Relay de eventos interrompido: {e}")
+        return 0
+    finally:
+        try:
+            r.delete(TRAVA_RELAY)
+        except RedisError:
+            pass
+
+
+async def ler_async(ultimo_id: str = "$", bloquear_ms: int = 15000, quantidade: int = 100) -> List[Tuple[str, dict]]:
+    """XREAD a partir de `ultimo_id` ("$" = só os novos); lista vazia no timeout. Sem prender thread (SSE)"""
+    resposta = await get_redis_async().xread({STREAM: ultimo_id}, count=quantidade, block=bloquear_ms)
+    return [(stream_id, decodificar(stream_id, campos)) for _, entradas in resposta or [] for stream_id, campos in entradas]
+
+
+def validar_url_webhook(url: str) -> str:
+    """
+    Destino de webhook: https e host que resolve só para endereços públicos
+    (o POST sai dos workers, de dentro da rede). ValueError se não servir.
+    """
+    partes = urlsplit(url)
+    if partes.scheme != "https" or not partes.hostname:
+        raise ValueError("Webhook precisa de URL https com host")
+    try:
+        enderecos = {info[4][0] for info in socket.getaddrinfo(partes.hostname, partes.port or 443, type=socket.SOCK_STREAM)}
+    except (socket.gaierror, ValueError) as e:
+        raise ValueError(f"Host do webhook não resolve: {partes.hostname}") from e
+    for endereco in enderecos:
+        if not ipaddress.ip_address(endereco.split("%")[0]).is_global:
+            raise ValueError(f"Host do webhook aponta para endereço interno ({endereco})")
+    return url
+
+
+def filtrar(evento: dict, processo_id: Optional[str] = None, tipos: Optional[Iterable[str]] = None) -> bool:
+    if processo_id and evento["processo_id"] != processo_id:
+        return False
+    return not tipos or evento["tipo"] in tipos
+
+
+def ler_para_webhooks(consumidor: str, quantidade: int) -> List[Tuple[str, dict]]:
+    """
+    Lê pelo consumer group: primeiro o que este consumidor leu e não confirmou
+    (rodada anterior interrompida), depois entradas novas.
+    """
+    r = get_redis()
+    try:
+        r.xgroup_create(STREAM, GRUPO_WEBHOOKS, id="$", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+    for inicio in ("0", ">"):
+        resposta = r.xreadgroup(GRUPO_WEBHOOKS, consumidor, {STREAM: inicio}, count=quantidade)
+        entradas = []
+        for _, itens in resposta or []:
+            for stream_id, campos in itens:
+                if campos:
+                    entradas.append((stream_id, decodificar(stream_id, campos)))
+                else:  # Pendente que o MAXLEN já removeu do stream
+                    r.xack(STREAM, GRUPO_WEBHOOKS, stream_id)
+        if entradas:
+            return entradas
+    return []
+
+
+def confirmar(ids: List[str]):
+    if ids:
+        get_redis().xack(STREAM, GRUPO_WEBHOOKS, *ids)
+
+
+def assinar(segredo: str, timestamp: str, corpo: bytes) -> str:
+    """Cabeçalho X-Fusione-Assinatura: HMAC-SHA256 de "<timestamp>.<corpo>" """
+    mensagem = timestamp.encode() + b"." + corpo
+    return "sha256=" + hmac.new(segredo.encode(), mensagem, hashlib.sha256).hexdigest()
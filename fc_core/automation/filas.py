@@ -0,0 +1,91 @@
+"""
+Roteamento de filas e prioridade justa entre solicitantes.
+
+Filas:
+    interativo       /scrape individual (advogado esperando a resposta)
+    lote             chunks de lotes de scraping
+    lote.<tribunal>  chunks de tribunais pesados (SCRAPE_FILAS_DEDICADAS)
+    celery           planejamento de lotes, callbacks, relatórios, manutenção
+
+Workers dedicados (prefetch 1 e acks tardios já vêm do celery_app):
+    celery -A fc_core.core.celery_app worker -Q interativo -c 4 -n interativo@%h
+    celery -A fc_core.core.celery_app worker -Q lote -c 8 -n lote@%h
+    celery -A fc_core.core.celery_app worker -Q lote.tjsp -c 4 -n tjsp@%h
+    celery -A fc_core.core.celery_app worker -Q celery -c 2 -n geral@%h
+
+Dentro das filas de lote, a prioridade de cada chunk (0 = mais alta no
+Redis) cresce com o log do número de chunks que o solicitante já tem na fila.
+Assim, os primeiros chunks de quem enviou pouco passam na frente da cauda de
+um lote de milhares de processos.
+"""
+from typing import List, Optional
+import math
+
+from kombu import Queue
+
+from fc_core.core.config import get_settings
+from fc_core.core.redis_client import get_redis
+
+settings = get_settings()
+
+FILA_PADRAO = "celery"
+FILA_INTERATIVA = "interativo"
+FILA_LOTE = "lote"
+
+PRIORIDADE_INTERATIVA = 0
+PRIORIDADE_LOTE = 3
+PRIORIDADE_MINIMA = 9
+SOLICITANTE_PADRAO = "anonimo"
+
+ROTAS_FIXAS = {
+    "fc_core.automation.tasks.scrape_processo_task": FILA_INTERATIVA,
+}
+
+
+def tribunais_dedicados() -> List[str]:
+    return [t.strip().lower() for t in settings.scrape_filas_dedicadas.split(",") if t.strip()]
+
+
+def fila_do_lote(fonte: str) -> str:
+    fonte = (fonte or "").lower()
+    return f"{FILA_LOTE}.{fonte}" if fonte in tribunais_dedicados() else FILA_LOTE
+
+
+def declarar_filas() -> List[Queue]:
+    nomes = [FILA_PADRAO, FILA_INTERATIVA, FILA_LOTE] + [f"{FILA_LOTE}.{t}" for t in tribunais_dedicados()]
+    return [Queue(nome, routing_key=nome) for nome in nomes]
+
+
+def rotear_task(name, args, kwargs, options, task=None, **kw):
+    """Router do Celery (task_routes)"""
+    if name in ROTAS_FIXAS:
+        return {"queue": ROTAS_FIXAS[name]}
+    if name == "fc_core.automation.tasks.scrape_chunk_task":
+        fonte = kwargs.get("fonte") if kwargs and "fonte" in kwargs else (args[1] if args and len(args) > 1 else None)
+        return {"queue": fila_do_lote(fonte)}
+    return None
+
+
+def _chave(solicitante: Optional[str]) -> str:
+    return f"fila:solicitante:{solicitante or SOLICITANTE_PADRAO}"
+
+
+def reservar_prioridades(solicitante: Optional[str], quantidade: int) -> List[int]:
+    """Registra `quantidade` chunks do solicitante na fila e retorna a prioridade de cada um"""
+    if quantidade <= 0:
+        return []
+    r = get_redis()
+    pipe = r.pipeline()
+    pipe.incrby(_chave(solicitante), quantidade)
+    pipe.expire(_chave(solicitante), 24 * 3600)
+    em_fila = pipe.execute()[0] - quantidade
+    return [
+        min(PRIORIDADE_MINIMA, PRIORIDADE_LOTE + int(math.log2(1 + em_fila + i)))
+        for i in range(quantidade)
+    ]
+
+
+def liberar(solicitante: Optional[str], quantidade: int = 1):
+    r = get_redis()
+    if r.decrby(_chave(solicitante), quantidade) < 0:
+        r.set(_chave(solicitante), 0, ex=24 * 3600)
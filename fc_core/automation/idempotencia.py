@@ -0,0 +1,78 @@
+"""
+Idempotência e checkpoints de tasks de scraping (Redis).
+
+- Chave de idempotência por (sistema, número): o primeiro envio reserva a
+  chave com SET NX e o id da task; envios repetidos enquanto ela está em
+  andamento (ou logo após concluir) recebem o mesmo task id em vez de abrir
+  outra sessão de navegador.
+- Checkpoint por task id: cada fase concluída é gravada. Um retry da mesma
+  task (o Celery preserva o id) retoma da primeira fase pendente.
+"""
+from typing import Any, Optional
+import json
+
+from fc_core.automation.cnj import normalizar_cnj
+from fc_core.core.config import get_settings
+from fc_core.core.redis_client import get_redis
+
+settings = get_settings()
+
+TTL_CHECKPOINT = 24 * 3600
+
+# Só mexe na chave se ela ainda pertence à task (evita apagar a reserva de outra)
+_SE_DONO_EXPIRAR = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_SE_DONO_APAGAR = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def chave_scrape(sistema: str, numero_processo: str) -> str:
+    numero = normalizar_cnj(numero_processo) or numero_processo.strip()
+    return f"idem:scrape:{sistema.lower()}:{numero}"
+
+
+def reservar(chave: str, task_id: str, ttl: Optional[int] = None) -> Optional[str]:
+    """Reserva a chave para task_id; se já existir, retorna o task id dono dela"""
+    r = get_redis()
+    ttl = ttl or settings.scrape_idempotencia_ttl_seconds
+    if r.set(chave, task_id, nx=True, ex=ttl):
+        return None
+    existente = r.get(chave)
+    if existente is None:  # Expirou entre o SET e o GET
+        return None if r.set(chave, task_id, nx=True, ex=ttl) else r.get(chave)
+    return existente
+
+
+def concluir(chave: str, task_id: str):
+    """Mantém a chave por uma janela curta: repetições logo após o fim reaproveitam o resultado"""
+    get_redis().eval(_SE_DONO_EXPIRAR, 1, chave, task_id, settings.scrape_dedup_janela_seconds)
+
+
+def liberar(chave: str, task_id: str):
+    get_redis().eval(_SE_DONO_APAGAR, 1, chave, task_id)
+
+
+class Checkpoint:
+    def __init__(self, task_id: str):
+        self.chave = f"checkpoint:scrape:{task_id}"
+
+    def get(self, fase: str) -> Optional[Any]:
+        valor = get_redis().hget(self.chave, fase)
+        return json.loads(valor) if valor is not None else None
+
+    def salvar(self, fase: str, valor: Any = True):
+        pipe = get_redis().pipeline()
+        pipe.hset(self.chave, fase, json.dumps(valor, ensure_ascii=False, default=str))
+        pipe.expire(self.chave, TTL_CHECKPOINT)
+        pipe.execute()
+
+    def limpar(self):
+        get_redis().delete(self.chave)
@@ -0,0 +1,130 @@
+"""
+Lotes de scraping: planejamento (agrupamento por tribunal e chunking) e
+progresso agregado em Redis.
+
+Um lote de N processos vira um chord: cada chunk roda numa única sessão de
+navegador (BaseScraper.executar_lote) e o callback consolida o resultado.
+Cada processo concluído incrementa contadores do lote, e a API lê esses
+contadores para mostrar progresso e ETA sem consultar os resultados das tasks.
+"""
+from typing import Dict, List, Optional, Tuple
+import json
+import math
+import time
+import uuid
+
+from fc_core.automation.cnj import tribunal_do_cnj
+from fc_core.automation.scrapers.scraper_factory import ScraperFactory
+from fc_core.core.config import get_settings
+from fc_core.core.redis_client import get_redis
+
+settings = get_settings()
+
+MAX_ERROS_GUARDADOS = 500
+
+
+def _chave(lote_id: str) -> str:
+    return f"lote:{lote_id}"
+
+
+def fonte_do_processo(sistema: str, numero: str) -> str:
+    """
+    Tribunal específico quando o CNJ indica uma corte atendida pelo mesmo sistema
+    (ex: "pje" + CNJ do TRT3 -> "trt3", com a URL certa); senão o próprio sistema.
+    """
+    sistema = sistema.lower()
+    if sistema in ScraperFactory.COURT_CONFIG:
+        return sistema
+    tribunal = tribunal_do_cnj(numero)
+    if tribunal in ScraperFactory.COURT_CONFIG and ScraperFactory.COURT_CONFIG[tribunal][0] == sistema:
+        return tribunal
+    return sistema
+
+
+def numeros_unicos(numeros: List[str]) -> List[str]:
+    return list(dict.fromkeys(n.strip() for n in numeros if n and n.strip()))
+
+
+def planejar_lote(sistema: str, numeros: List[str], tamanho_chunk: Optional[int] = None) -> List[Tuple[str, List[str]]]:
+    """Agrupa por fonte e divide cada grupo em chunks de tamanho equilibrado"""
+    tamanho_chunk = tamanho_chunk or settings.scrape_chunk_size
+    grupos: Dict[str, List[str]] = {}
+    for numero in numeros_unicos(numeros):
+        grupos.setdefault(fonte_do_processo(sistema, numero), []).append(numero)
+
+    plano = []
+    for fonte, itens in grupos.items():
+        partes = math.ceil(len(itens) / tamanho_chunk)
+        for i in range(partes):
+            plano.append((fonte, itens[i::partes]))
+    return plano
+
+
+def criar_lote(sistema: str, total: int) -> str:
+    lote_id = uuid.uuid4().hex
+    r = get_redis()
+    r.hset(_chave(lote_id), mapping={
+        "sistema": sistema,
+        "total": total,
+        "sucesso": 0,
+        "falhas": 0,
+        "estado": "PENDENTE",
+        "criado_em": time.time(),
+    })
+    r.expire(_chave(lote_id), settings.scrape_batch_ttl_seconds)
+    return lote_id
+
+
+def iniciar_lote(lote_id: str, chunks: int):
+    get_redis().hset(_chave(lote_id), mapping={"estado": "PROGRESSO", "chunks": chunks})
+
+
+def registrar_progresso(lote_id: str, sucesso: int = 0, falhas: Optional[List[dict]] = None):
+    falhas = falhas or []
+    pipe = get_redis().pipeline()
+    pipe.hincrby(_chave(lote_id), "sucesso", sucesso)
+    if falhas:
+        pipe.hincrby(_chave(lote_id), "falhas", len(falhas))
+        pipe.rpush(f"{_chave(lote_id)}:erros", *(json.dumps(f, ensure_ascii=False) for f in falhas))
+        pipe.ltrim(f"{_chave(lote_id)}:erros", 0, MAX_ERROS_GUARDADOS - 1)
+        pipe.expire(f"{_chave(lote_id)}:erros", settings.scrape_batch_ttl_seconds)
+    pipe.execute()
+
+
+def finalizar_lote(lote_id: str, resumo: dict):
+    get_redis().hset(_chave(lote_id), mapping={
+        "estado": "CONCLUIDO",
+        "finalizado_em": time.time(),
+        "resumo": json.dumps(resumo, ensure_ascii=False),
+    })
+
+
+def status_lote(lote_id: str) -> Optional[dict]:
+    r = get_redis()
+    dados = r.hgetall(_chave(lote_id))
+    if not dados:
+        return None
+
+    total, sucesso, falhas = int(dados["total"]), int(dados["sucesso"]), int(dados["falhas"])
+    processados = sucesso + falhas
+    fim = float(dados.get("finalizado_em") or time.time())
+    decorrido = fim - float(dados["criado_em"])
+    eta = None
+    if 0 < processados < total:
+        eta = round(decorrido / processados * (total - processados), 1)
+
+    return {
+        "lote_id": lote_id,
+        "sistema": dados["sistema"],
+        "estado": dados["estado"],
+        "total": total,
+        "concluidos": sucesso,
+        "falhas": falhas,
+        "pendentes": max(total - processados, 0),
+        "percentual": round(processados / total * 100, 1) if total else 100.0,
+        "decorrido_segundos": round(decorrido, 1),
+        "eta_segundos": eta,
+        "chunks": int(dados.get("chunks", 0)),
+        "erros": [json.loads(e) for e in r.lrange(f"{_chave(lote_id)}:erros", 0, 49)],
+        "resumo": json.loads(dados["resumo"]) if dados.get("resumo") else None,
+    }
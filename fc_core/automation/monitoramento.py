@@ -0,0 +1,165 @@
+"""
+Monitoramento incremental da carteira de processos.
+
+Cada processo tem `proxima_verificacao`, calculada a cada scraping:
+    atividade   movimentação recente -> intervalo curto (quente: 1h;
+                parado há meses: 7 dias)
+    risco       "Provável" verifica com mais frequência, "Remota" com menos
+    tribunal    fator opcional por corte (MONITORAMENTO_FATOR_TRIBUNAL)
+    situação    arquivados/baixados entram no intervalo máximo
+com ±10% de jitter para não sincronizar a carteira inteira.
+
+A task de beat pega os processos vencidos, agrupa por tribunal e dispara um
+lote por corte (fila de lote, solicitante "monitoramento"). Cada corte tem
+um orçamento por hora (MONITORAMENTO_LIMITE_TRIBUNAL_HORA), controlado em
+Redis e compartilhado entre as rodadas.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+import logging
+import random
+import re
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from fc_core.automation.cnj import tribunal_do_cnj
+from fc_core.automation.scrapers.scraper_factory import ScraperFactory
+from fc_core.core.config import get_settings
+from fc_core.core.models import Processo
+from fc_core.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+SOLICITANTE = "monitoramento"
+INTERVALO_MIN = timedelta(hours=1)
+INTERVALO_MAX = timedelta(days=7)
+# Enquanto o lote não conclui, o processo não é reagendado
+RESERVA_EM_ANDAMENTO = timedelta(hours=3)
+
+# (dias desde a última movimentação, intervalo)
+FAIXAS_ATIVIDADE = [
+    (7, timedelta(hours=1)),
+    (30, timedelta(hours=6)),
+    (90, timedelta(days=1)),
+    (180, timedelta(days=3)),
+]
+INTERVALO_SEM_HISTORICO = timedelta(days=1)
+FATOR_RISCO = {"provável": 0.5, "provavel": 0.5, "possível": 1.0, "possivel": 1.0, "remota": 2.0}
+SITUACOES_ENCERRADAS = {"arquivado", "baixado", "encerrado", "extinto"}
+DATA_BR = re.compile(r"(\d{2})/(\d{2})/(\d{4})(?:\s+(\d{2}):(\d{2}))?")
+
+
+def _mapa(config: str) -> Dict[str, float]:
+    """Lê "tjsp:1.5,trt3:2" da configuração"""
+    mapa = {}
+    for item in (config or "").split(","):
+        if ":" in item:
+            chave, valor = item.split(":", 1)
+            mapa[chave.strip().lower()] = float(valor)
+    return mapa
+
+
+def _utc(data: Optional[datetime]) -> Optional[datetime]:
+    if data is not None and data.tzinfo is None:
+        return data.replace(tzinfo=timezone.utc)
+    return data
+
+
+def data_mais_recente(movimentacoes: Optional[Iterable[dict]]) -> Optional[datetime]:
+    """Data da movimentação mais recente (dd/mm/aaaa[ hh:mm] ou ISO)"""
+    maior = None
+    for mov in movimentacoes or []:
+        texto = str(mov.get("data") or "").strip()
+        m = DATA_BR.search(texto)
+        try:
+            if m:
+                dia, mes, ano, hora, minuto = m.groups()
+                data = datetime(int(ano), int(mes), int(dia), int(hora or 0), int(minuto or 0))
+            else:
+                data = datetime.fromisoformat(texto)
+        except ValueError:
+            continue
+        data = _utc(data)
+        if maior is None or data > maior:
+            maior = data
+    return maior
+
+
+def calcular_intervalo(processo: Processo, agora: datetime, jitter: bool = True) -> timedelta:
+    if (processo.situacao or "").strip().lower() in SITUACOES_ENCERRADAS:
+        return INTERVALO_MAX
+
+    ultima = _utc(processo.ultima_movimentacao)
+    if ultima is None:
+        intervalo = INTERVALO_SEM_HISTORICO
+    else:
+        dias = (agora - ultima).days
+        intervalo = next((i for limite, i in FAIXAS_ATIVIDADE if dias < limite), INTERVALO_MAX)
+
+    intervalo *= FATOR_RISCO.get((processo.risco_atual or "").strip().lower(), 1.0)
+    tribunal = tribunal_do_cnj(processo.numero_principal or "")
+    intervalo *= _mapa(settings.monitoramento_fator_tribunal).get(tribunal, 1.0)
+    if jitter:
+        intervalo *= random.uniform(0.9, 1.1)
+    return min(max(intervalo, INTERVALO_MIN), INTERVALO_MAX)
+
+
+def registrar_verificacao(processo: Processo, movimentacoes: Optional[List[dict]] = None, agora: Optional[datetime] = None):
+    """Atualiza atividade e próxima verificação após um scraping bem-sucedido"""
+    agora = agora or datetime.now(timezone.utc)
+    recente = data_mais_recente(movimentacoes)
+    if recente and (processo.ultima_movimentacao is None or recente > _utc(processo.ultima_movimentacao)):
+        processo.ultima_movimentacao = recente
+    processo.ultima_verificacao = agora
+    processo.proxima_verificacao = agora + calcular_intervalo(processo, agora)
+
+
+def processos_vencidos(db: Session, agora: datetime, limite: int):
+    return db.query(Processo).filter(
+        Processo.deleted_at.is_(None),
+        Processo.numero_principal.isnot(None),
+        or_(Processo.proxima_verificacao.is_(None), Processo.proxima_verificacao <= agora)
+    ).order_by(Processo.proxima_verificacao.is_(None).desc(), Processo.proxima_verificacao).limit(limite)
+
+
+def reservar_orcamento(tribunal: str, quantidade: int, agora: datetime) -> int:
+    """Consome até `quantidade` do orçamento horário do tribunal; retorna quanto foi concedido"""
+    limite = int(_mapa(settings.monitoramento_limites_tribunal).get(tribunal, settings.monitoramento_limite_tribunal_hora))
+    chave = f"monitoramento:{tribunal}:{agora:%Y%m%d%H}"
+    r = get_redis()
+    usado = r.incrby(chave, quantidade)
+    r.expire(chave, 2 * 3600)
+    concedido = max(0, min(quantidade, limite - (usado - quantidade)))
+    if concedido < quantidade:
+        r.decrby(chave, quantidade - concedido)
+    return concedido
+
+
+def planejar_rodada(db: Session, agora: Optional[datetime] = None) -> Dict[str, List[str]]:
+    """
+    Seleciona os processos vencidos dentro do orçamento de cada tribunal,
+    marca-os como em andamento e retorna {tribunal: [números]}.
+    """
+    agora = agora or datetime.now(timezone.utc)
+    grupos: Dict[str, List[Processo]] = {}
+    for processo in processos_vencidos(db, agora, settings.monitoramento_max_por_rodada):
+        tribunal = tribunal_do_cnj(processo.numero_principal)
+        if tribunal not in ScraperFactory.COURT_CONFIG:
+            # Sem scraper para a corte: tenta de novo só no intervalo máximo
+            processo.proxima_verificacao = agora + INTERVALO_MAX
+            continue
+        grupos.setdefault(tribunal, []).append(processo)
+
+    rodada = {}
+    for tribunal, processos in grupos.items():
+        concedido = reservar_orcamento(tribunal, len(processos), agora)
+        for processo in processos[:concedido]:
+            processo.proxima_verificacao = agora + RESERVA_EM_ANDAMENTO
+        if concedido:
+            rodada[tribunal] = [p.numero_principal for p in processos[:concedido]]
+        if concedido < len(processos):
+            logger.info(f"Monitoramento {tribunal}: {len(processos) - concedido} processos aguardam orçamento")
+    db.commit()
+    return rodada
@@ -1,5 +1,6 @@
 import logging
 import asyncio
+import uuid
 from typing import List, Dict, Any, Optional, Set
 from enum import Enum
 from pydantic import BaseModel
@@ -9,6 +10,10 @@ from fc_core.core.database import SessionLocal
 from fc_core.core.models import Processo
 from fc_core.core.filiais import FilialManager
 from fc_core.automation.scrapers.scraper_factory import ScraperFactory
+from fc_core.automation.scrapers.schema import CabecalhoProcesso
+from fc_core.automation import eventos, monitoramento, snapshots
+from fc_core.automation.cnj import uf_do_cnj
+from fc_core.core import cache, prazos
 
 # Importa scrapers já migrados
 from fc_core.automation.scrapers.instagram_scraper import InstagramScraper
@@ -213,18 +218,40 @@ class Orchestrator:
                 if filial:
                     client_name = filial.nome
 
-            if not processo:
+            novo = processo is None
+            antes = None if novo else cache.valores_filtro(processo)
+            if novo:
                 module_code = force_module or ModuleCode.CONTENCIOSO.value
                 new_pasta = self._generate_next_pasta(client_code, module_code)
                 
                 processo = Processo(
+                    id=uuid.uuid4(),
                     numero_principal=cnj, 
                     pasta=new_pasta,
                     created_at=func.now()
                 )
                 self.db.add(processo)
+                # Processo gravado antes de snapshots/eventos/prazos que apontam para ele (FK)
+                self.db.flush()
                 logger.info(f"🆕 Criando novo processo {cnj} na pasta {new_pasta}")
             
+            # Fontes cujo retorno normalizado não mudou não geram escrita
+            mudaram = []
+            movimentacoes = []
+            for res in results:
+                if not res.success:
+                    continue
+                movimentacoes.extend((res.data or {}).get("movimentacoes") or [])
+                fonte = getattr(res.source, "value", res.source)
+                if snapshots.registrar_snapshot(self.db, processo.id, fonte, res.data) is not None:
+                    mudaram.append(res)
+            # Mesmo sem mudanças o scraping conta como verificação: reagenda o monitoramento
+            monitoramento.registrar_verificacao(processo, movimentacoes)
+            if not mudaram and not novo:
+                self.db.commit()
+                logger.info(f"Sem mudanças para {cnj}")
+                return
+            
             # Atualiza dados consolidados
             processo.cliente = client_name
             # Default values for now, logic to extract these specifically should be added to scrapers
@@ -234,28 +261,32 @@ class Orchestrator:
             
             for res in results:
                 if res.success and res.data:
-                    if "valor" in res.data:
-                        processo.valor_causa = res.data["valor"]
-                    # Se o scraper retornar esses campos, usa eles
-                    if "categoria" in res.data:
-                        processo.categoria = res.data["categoria"]
-                    if "polo" in res.data:
-                        processo.polo = res.data["polo"]
-                    if "risco" in res.data:
-                        processo.risco_atual = res.data["risco"]
+                    # Se o scraper retornar esses campos, usa eles (já tipados)
+                    campos = CabecalhoProcesso.de_dict(res.data).campos_processo()
+                    for coluna in ("valor_causa", "categoria", "polo", "risco_atual"):
+                        if coluna in campos:
+                            setattr(processo, coluna, campos[coluna])
             
             # Atualiza JSON de metadados
+            # Cópia: mutar o dict carregado não marca a coluna JSON como alterada
             extras = {}
             if processo.numeros_extra and isinstance(processo.numeros_extra, dict):
-                extras = processo.numeros_extra
+                extras = dict(processo.numeros_extra)
 
-            for res in results:
-                if res.success:
-                    extras[res.source] = res.data
+            for res in mudaram:
+                extras[res.source] = res.data
+                if res.data and res.data.get("comunicacoes"):
+                    prazos.registrar_comunicacoes(
+                        self.db, processo.id, cnj, res.data["comunicacoes"], uf_do_cnj(cnj),
+                        getattr(res.source, "value", res.source)
+                    )
             
             processo.numeros_extra = extras
+            depois = cache.valores_filtro(processo)
             
             self.db.commit()
+            cache.invalidar_processo(processo.id, antes, depois)
+            eventos.publicar_pendentes(self.db)
             logger.info(f"💾 Dados consolidados salvos no banco para {cnj}")
         except Exception as e:
             logger.error(f"Erro ao salvar no banco: {e}")
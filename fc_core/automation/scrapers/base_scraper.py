@@ -5,8 +5,10 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from abc import ABC, abstractmethod
+from fc_core.automation.errors import FalhaAutenticacao, classificar
+from fc_core.automation.scrapers.schema import ResultadoScraping
 import logging
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +36,11 @@ class BaseScraper(ABC):
     def teardown_driver(self):
         """Fecha o driver"""
         if self.driver:
-            self.driver.quit()
+            try:
+                self.driver.quit()
+            except Exception as e:
+                logger.warning(f"Erro ao fechar driver: {str(e)}")
+            self.driver = None
             logger.info("Driver fechado")
     
     def wait_for_element(self, by: By, value: str, timeout: Optional[int] = None):
@@ -72,31 +78,84 @@ class BaseScraper(ABC):
         """Implementar extração de movimentações"""
         pass
     
+    def iniciar_sessao(self, credentials: Optional[Dict[str, str]] = None):
+        """Abre o navegador e faz login (quando há credenciais)"""
+        self.setup_driver()
+        if credentials:
+            login_success = self.login(credentials)
+            if not login_success:
+                raise FalhaAutenticacao("Falha no login")
+
+    def normalizar(self, processo: Dict[str, Any], movimentacoes: Optional[list] = None) -> Dict[str, Any]:
+        """Converte o retorno ad hoc do scraper no resultado tipado (ver schema.py)"""
+        return dict(success=True, **ResultadoScraping.de_dados(processo, movimentacoes).para_dict())
+
+    def coletar(self, numero_processo: str) -> Dict[str, Any]:
+        """Busca e extrai um processo na sessão já aberta"""
+        processo = self.buscar_processo(numero_processo)
+        movimentacoes = self.extrair_movimentacoes(numero_processo)
+        return self.normalizar(processo, movimentacoes)
+    
     def executar(self, numero_processo: str, credentials: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """Executa scraping completo"""
         try:
-            self.setup_driver()
-            
-            if credentials:
-                login_success = self.login(credentials)
-                if not login_success:
-                    raise Exception("Falha no login")
-            
-            processo = self.buscar_processo(numero_processo)
-            movimentacoes = self.extrair_movimentacoes(numero_processo)
-            
-            return {
-                "success": True,
-                "processo": processo,
-                "movimentacoes": movimentacoes
-            }
+            self.iniciar_sessao(credentials)
+            return self.coletar(numero_processo)
         
         except Exception as e:
             logger.error(f"Erro no scraping: {str(e)}")
             return {
                 "success": False,
-                "error": str(e)
+                "error": str(e),
+                "categoria": classificar(e)
             }
         
         finally:
             self.teardown_driver()
+
+    def executar_lote(
+        self,
+        numeros_processos: List[str],
+        credentials: Optional[Dict[str, str]] = None,
+        ao_concluir: Optional[Callable[[Dict[str, Any]], None]] = None,
+        deve_parar: Optional[Callable[[], bool]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Scraping de vários processos reutilizando o mesmo navegador e login.
+        Um erro num processo recria a sessão para o próximo; falha ao abrir a
+        sessão (ex: login) encerra o lote marcando os restantes como falha.
+        `deve_parar` é consultado antes de cada processo; os não processados
+        ficam fora da lista retornada.
+        """
+        resultados = []
+        erro_sessao = None
+        categoria_sessao = None
+        try:
+            for numero in numeros_processos:
+                if deve_parar and deve_parar():
+                    break
+                if erro_sessao is None and self.driver is None:
+                    try:
+                        self.iniciar_sessao(credentials)
+                    except Exception as e:
+                        logger.error(f"Erro ao abrir sessão: {str(e)}")
+                        erro_sessao, categoria_sessao = str(e), classificar(e)
+                        self.teardown_driver()
+
+                if erro_sessao is not None:
+                    resultado = {"success": False, "error": erro_sessao, "categoria": categoria_sessao}
+                else:
+                    try:
+                        resultado = self.coletar(numero)
+                    except Exception as e:
+                        logger.error(f"Erro no scraping de {numero}: {str(e)}")
+                        resultado = {"success": False, "error": str(e), "categoria": classificar(e)}
+                        self.teardown_driver()
+
+                resultado["numero"] = numero
+                resultados.append(resultado)
+                if ao_concluir:
+                    ao_concluir(resultado)
+        finally:
+            self.teardown_driver()
+        return resultados
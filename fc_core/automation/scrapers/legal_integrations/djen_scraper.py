@@ -13,6 +13,8 @@ class DJENMonitor(BaseScraper):
     Monitor para o Diário de Justiça Eletrônico Nacional (DJEN).
     URL: https://comunica.pje.jus.br/
     Foco: Captura passiva de publicações por CNPJ/OAB.
+    Para a carteira inteira use fc_core.automation.djen (uma consulta por
+    termo/dia); este scraper atende consultas pontuais por processo.
     """
     
     BASE_URL = "https://comunica.pje.jus.br/"
@@ -67,22 +69,31 @@ class DJENMonitor(BaseScraper):
 
     def buscar_processo(self, numero_processo: str) -> Dict[str, Any]:
         """Interface padrão do BaseScraper"""
+        return self._processo(numero_processo, self.buscar_publicacoes(numero_processo, "processo"))
+        
+    def extrair_movimentacoes(self, numero_processo: str) -> List[Dict[str, Any]]:
+        """Converte publicações em 'movimentações'"""
+        return self._movimentacoes(self.buscar_publicacoes(numero_processo, "processo"))
+
+    def coletar(self, numero_processo: str) -> Dict[str, Any]:
+        """Uma única busca alimenta o processo e as movimentações"""
         pubs = self.buscar_publicacoes(numero_processo, "processo")
+        return self.normalizar(self._processo(numero_processo, pubs), self._movimentacoes(pubs))
+
+    def _processo(self, numero_processo: str, pubs: List[Dict[str, Any]]) -> Dict[str, Any]:
         return {
             "numero": numero_processo,
             "origem": "DJEN",
             "publicacoes": pubs,
             "total_encontrado": len(pubs)
         }
-        
-    def extrair_movimentacoes(self, numero_processo: str) -> List[Dict[str, Any]]:
-        """Converte publicações em 'movimentações'"""
-        pubs = self.buscar_publicacoes(numero_processo, "processo")
+
+    def _movimentacoes(self, pubs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         movs = []
         for pub in pubs:
             movs.append({
                 "data": pub.get("data_disponibilizacao"),
-                "descricao": f"Publicação DJEN ({pub.get('tribunal')}): {pub.get('conteudo')[:50]}...",
+                "descricao": f"Publicação DJEN ({pub.get('tribunal')}): {(pub.get('conteudo') or '')[:50]}...",
                 "origem": "DJEN"
             })
         return movs
@@ -0,0 +1,256 @@
+"""
+Resultado tipado e compacto dos scrapers.
+
+Todo BaseScraper passa o retorno de buscar_processo/extrair_movimentacoes
+por ``ResultadoScraping.de_dados`` (em ``coletar``): chaves conhecidas viram
+campos tipados (valor em Decimal, datas em date/datetime), apelidos são
+unificados (valor/valor_causa, risco/risco_atual, conteudo/texto) e o que
+sobra fica em ``extras``. ``para_dict`` devolve o formato serializável que
+trafega no Celery e alimenta snapshots, prazos e o banco.
+"""
+from dataclasses import dataclass, field, fields, is_dataclass
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Union
+import re
+
+DATA_BR = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})(?:\s+(?:às\s+)?(\d{1,2}):(\d{2})(?::(\d{2}))?)?")
+NAO_NUMERICO = re.compile(r"[^\d,.\-]")
+
+
+def parse_brl(valor: Any) -> Optional[Decimal]:
+    """'R$ 1.234,56' / '1234.56' / 1234.5 -> Decimal; None se não houver número"""
+    if valor is None or isinstance(valor, bool):
+        return None
+    if isinstance(valor, Decimal):
+        return valor
+    if isinstance(valor, (int, float)):
+        return Decimal(str(valor))
+    texto = NAO_NUMERICO.sub("", str(valor))
+    if not re.search(r"\d", texto):
+        return None
+    if "," in texto:
+        texto = texto.replace(".", "").replace(",", ".")  # Formato brasileiro
+    elif texto.count(".") > 1 or re.search(r"\.\d{3}$", texto):
+        texto = texto.replace(".", "")  # Só separador de milhar
+    try:
+        return Decimal(texto).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        return None
+
+
+def parse_data(valor: Any) -> Optional[Union[date, datetime]]:
+    """'15/01/2024', '15/01/2024 14:30' ou ISO -> date (ou datetime, se houver hora)"""
+    if valor is None or isinstance(valor, (date, datetime)):
+        return valor
+    texto = str(valor).strip()
+    m = DATA_BR.search(texto)
+    try:
+        if m:
+            dia, mes, ano, hora, minuto, segundo = m.groups()
+            if hora is None:
+                return date(int(ano), int(mes), int(dia))
+            return datetime(int(ano), int(mes), int(dia), int(hora), int(minuto), int(segundo or 0))
+        if len(texto) == 10:
+            return date.fromisoformat(texto)
+        return datetime.fromisoformat(texto)
+    except ValueError:
+        return None
+
+
+def _texto(valor: Any) -> Optional[str]:
+    if valor is None:
+        return None
+    texto = " ".join(str(valor).split())
+    return texto or None
+
+
+def _primeiro(dados: dict, *chaves: str) -> Any:
+    return next((dados[c] for c in chaves if dados.get(c) not in (None, "")), None)
+
+
+def _serializavel(valor: Any) -> Any:
+    if isinstance(valor, Decimal):
+        return str(valor)
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    return valor
+
+
+def _para_dict(objeto) -> Dict[str, Any]:
+    """Campos não vazios, com Decimal/data já em texto"""
+    saida = {}
+    for f in fields(objeto):
+        valor = getattr(objeto, f.name)
+        if valor in (None, "", [], {}):
+            continue
+        if f.name == "extras":
+            saida.update(valor)
+        elif isinstance(valor, list):
+            saida[f.name] = [_para_dict(item) if is_dataclass(item) else item for item in valor]
+        else:
+            saida[f.name] = _serializavel(valor)
+    return saida
+
+
+@dataclass(slots=True)
+class Parte:
+    nome: str
+    polo: Optional[str] = None
+    documento: Optional[str] = None
+    advogados: List[str] = field(default_factory=list)
+
+    @classmethod
+    def de_dict(cls, dados: dict) -> "Parte":
+        return cls(
+            nome=_texto(_primeiro(dados, "nome", "parte")) or "",
+            polo=_texto(_primeiro(dados, "polo", "tipo")),
+            documento=_texto(_primeiro(dados, "documento", "cpf_cnpj", "cnpj")),
+            advogados=[a for a in (_texto(a) for a in dados.get("advogados") or []) if a],
+        )
+
+
+@dataclass(slots=True)
+class Movimentacao:
+    data: Optional[Union[date, datetime]]
+    descricao: str
+    origem: Optional[str] = None
+    extras: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def de_dict(cls, dados: dict) -> "Movimentacao":
+        return cls(
+            data=parse_data(dados.get("data")),
+            descricao=_texto(_primeiro(dados, "descricao", "texto")) or "",
+            origem=_texto(dados.get("origem")),
+            extras={k: v for k, v in dados.items() if k not in {"data", "descricao", "texto", "origem"}},
+        )
+
+
+@dataclass(slots=True)
+class Comunicacao:
+    """Citação/intimação (Domicílio Judicial); fonte dos prazos"""
+    tipo: Optional[str]
+    data_disponibilizacao: Optional[date]
+    status: Optional[str] = None
+    prazo_final: Optional[date] = None
+    prazo_dias: Optional[int] = None
+    extras: Dict[str, Any] = field(default_factory=dict)
+
+    CAMPOS = {"tipo", "data_disponibilizacao", "status", "prazo_final", "prazo_dias"}
+
+    @classmethod
+    def de_dict(cls, dados: dict) -> "Comunicacao":
+        prazo_dias = dados.get("prazo_dias")
+        return cls(
+            tipo=_texto(dados.get("tipo")),
+            data_disponibilizacao=_data(dados.get("data_disponibilizacao")),
+            status=_texto(dados.get("status")),
+            prazo_final=_data(dados.get("prazo_final")),
+            prazo_dias=int(prazo_dias) if prazo_dias not in (None, "") else None,
+            extras={k: v for k, v in dados.items() if k not in cls.CAMPOS},
+        )
+
+
+@dataclass(slots=True)
+class Publicacao:
+    """Publicação de diário (DJEN)"""
+    data_disponibilizacao: Optional[date]
+    tribunal: Optional[str]
+    conteudo: Optional[str]
+    processo: Optional[str] = None
+    link: Optional[str] = None
+
+    @classmethod
+    def de_dict(cls, dados: dict) -> "Publicacao":
+        return cls(
+            data_disponibilizacao=_data(_primeiro(dados, "data_disponibilizacao", "data")),
+            tribunal=_texto(_primeiro(dados, "tribunal", "siglaTribunal")),
+            conteudo=_texto(_primeiro(dados, "conteudo", "texto")),
+            processo=_texto(_primeiro(dados, "processo", "numero_processo")),
+            link=_texto(dados.get("link")),
+        )
+
+
+def _data(valor: Any) -> Optional[date]:
+    data = parse_data(valor)
+    return data.date() if isinstance(data, datetime) else data
+
+
+@dataclass(slots=True)
+class CabecalhoProcesso:
+    numero: Optional[str] = None
+    origem: Optional[str] = None
+    classe: Optional[str] = None
+    assunto: Optional[str] = None
+    area: Optional[str] = None
+    orgao: Optional[str] = None
+    situacao: Optional[str] = None
+    distribuicao: Optional[date] = None
+    valor_causa: Optional[Decimal] = None
+    cliente: Optional[str] = None
+    categoria: Optional[str] = None
+    polo: Optional[str] = None
+    risco: Optional[str] = None
+    erro: Optional[str] = None
+    partes: List[Parte] = field(default_factory=list)
+    comunicacoes: List[Comunicacao] = field(default_factory=list)
+    publicacoes: List[Publicacao] = field(default_factory=list)
+    extras: Dict[str, Any] = field(default_factory=dict)
+
+    # campo -> chaves aceitas no dict do scraper (a primeira preenchida vence)
+    APELIDOS = {
+        "numero": ("numero", "numero_processo", "identificador"),
+        "valor_causa": ("valor_causa", "valor"),
+        "risco": ("risco", "risco_atual"),
+        "distribuicao": ("distribuicao", "data_distribuicao"),
+    }
+    # campo do cabeçalho -> coluna de Processo
+    COLUNAS = {"situacao": "situacao", "valor_causa": "valor_causa", "cliente": "cliente",
+               "categoria": "categoria", "polo": "polo", "risco": "risco_atual"}
+
+    @classmethod
+    def de_dict(cls, dados: Optional[dict]) -> "CabecalhoProcesso":
+        dados = dict(dados or {})
+        usados = {"movimentacoes", "movimentacoes_count"}
+        valores = {}
+        for f in fields(cls):
+            if f.name in ("partes", "comunicacoes", "publicacoes", "extras"):
+                continue
+            chaves = cls.APELIDOS.get(f.name, (f.name,))
+            usados.update(chaves)
+            valores[f.name] = _primeiro(dados, *chaves)
+
+        cabecalho = cls(**{nome: _texto(valor) for nome, valor in valores.items()})
+        cabecalho.distribuicao = _data(valores["distribuicao"])
+        cabecalho.valor_causa = parse_brl(valores["valor_causa"])
+        cabecalho.partes = [Parte.de_dict(p) for p in dados.get("partes") or [] if isinstance(p, dict)]
+        cabecalho.comunicacoes = [Comunicacao.de_dict(c) for c in dados.get("comunicacoes") or [] if isinstance(c, dict)]
+        cabecalho.publicacoes = [Publicacao.de_dict(p) for p in dados.get("publicacoes") or [] if isinstance(p, dict)]
+        usados.update(("partes", "comunicacoes", "publicacoes"))
+        cabecalho.extras = {k: v for k, v in dados.items() if k not in usados}
+        return cabecalho
+
+    def campos_processo(self) -> Dict[str, Any]:
+        """Valores tipados para as colunas de Processo (só os preenchidos)"""
+        return {coluna: getattr(self, campo) for campo, coluna in self.COLUNAS.items() if getattr(self, campo) is not None}
+
+
+@dataclass(slots=True)
+class ResultadoScraping:
+    processo: CabecalhoProcesso
+    movimentacoes: List[Movimentacao] = field(default_factory=list)
+
+    @classmethod
+    def de_dados(cls, processo: Optional[dict], movimentacoes: Optional[List[dict]] = None) -> "ResultadoScraping":
+        return cls(
+            processo=CabecalhoProcesso.de_dict(processo),
+            movimentacoes=[Movimentacao.de_dict(m) for m in movimentacoes or [] if isinstance(m, dict)],
+        )
+
+    def para_dict(self) -> Dict[str, Any]:
+        """Formato do retorno de BaseScraper.coletar (sem "success")"""
+        return {
+            "processo": _para_dict(self.processo),
+            "movimentacoes": [_para_dict(m) for m in self.movimentacoes],
+        }
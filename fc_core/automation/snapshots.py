@@ -0,0 +1,47 @@
+"""
+Snapshot por (processo, fonte) e feed de eventos de mudança.
+
+A maioria dos scrapings diários volta igual ao anterior: com o hash do
+snapshot normalizado inalterado, nada é gravado além do reagendamento do
+monitoramento. Quando muda, o snapshot é substituído e os eventos do diff
+entram em EventoProcesso na mesma transação do processo.
+"""
+from typing import Dict, List, Optional
+import logging
+
+from sqlalchemy.orm import Session
+
+from fc_core.automation import diff
+from fc_core.core.models import EventoProcesso, SnapshotProcesso
+
+logger = logging.getLogger(__name__)
+
+
+def registrar_snapshot(
+    db: Session,
+    processo_id,
+    fonte: str,
+    dados: Optional[dict],
+    movimentacoes: Optional[List[dict]] = None
+) -> Optional[List[Dict]]:
+    """
+    Compara o retorno da fonte com o último snapshot. Retorna None se nada
+    mudou; senão, a lista de eventos (já adicionados à sessão, sem commit).
+    """
+    atual = diff.montar_snapshot(dados, movimentacoes)
+    hash_atual = diff.hash_snapshot(atual)
+    snapshot = db.get(SnapshotProcesso, (processo_id, fonte))
+    if snapshot is not None and snapshot.hash == hash_atual:
+        return None
+
+    eventos = diff.diff(snapshot.dados if snapshot is not None else None, atual)
+    if snapshot is None:
+        db.add(SnapshotProcesso(processo_id=processo_id, fonte=fonte, hash=hash_atual, dados=atual))
+    else:
+        snapshot.hash = hash_atual
+        snapshot.dados = atual
+    for evento in eventos:
+        dados_evento = {k: v for k, v in evento.items() if k != "tipo"}
+        db.add(EventoProcesso(processo_id=processo_id, fonte=fonte, tipo=evento["tipo"], dados=dados_evento))
+    logger.info(f"Processo {processo_id} ({fonte}): {len(eventos)} mudanças")
+    return eventos
@@ -1,54 +1,478 @@
+from celery import chord, group
+from celery.exceptions import Retry
 from fc_core.core.celery_app import celery_app
 from fc_core.automation.scrapers.scraper_factory import ScraperFactory
+from fc_core.automation.scrapers.schema import CabecalhoProcesso
+from fc_core.automation import djen, eventos, filas, idempotencia, lotes, monitoramento, snapshots
+from fc_core.automation.cnj import normalizar_cnj, uf_do_cnj
+from fc_core.automation.circuit_breaker import ABERTO, CircuitBreaker
+from fc_core.automation.errors import (
+    DESCONHECIDO, FALHAS_DO_TRIBUNAL, NAO_SUPORTADO, TRIBUNAL_FORA,
+    ErroScraping, SistemaNaoSuportado, TribunalIndisponivel,
+    classificar, espera_retry, retentavel
+)
+from fc_core.core import cache, prazos
+from fc_core.core.config import get_settings
 from fc_core.core.database import SessionLocal
-from fc_core.core.models import Processo
+from fc_core.core.models import Processo, Webhook
+from fc_core.core.redis_client import get_redis
+from fc_core.core.stats import reconciliar
+from sqlalchemy import or_
+from datetime import date, timedelta
+from typing import Optional
+from uuid import UUID, uuid4
+import json
 import logging
+import time
+
+import requests
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+def _salvar_processo(db, numero_processo: str, fonte: str, dados: dict, movimentacoes: list = None) -> dict:
+    """
+    Cria ou atualiza o processo (pela pasta ou pelo número CNJ) com os campos
+    tipados do cabeçalho e reagenda o monitoramento. Se o snapshot da fonte
+    não mudou, só o reagendamento é gravado. Retorna a referência no banco.
+    """
+    campos = CabecalhoProcesso.de_dict(dados).campos_processo()
+    processo = db.query(Processo).filter(
+        or_(Processo.pasta == numero_processo, Processo.numero_principal == numero_processo)
+    ).first()
+    antes = None
+    if processo is None:
+        campos.setdefault("numero_principal", normalizar_cnj(numero_processo))
+        processo = Processo(id=uuid4(), pasta=numero_processo, **campos)
+        db.add(processo)
+        # Sem relationship() o flush não ordena os INSERTs: o processo vai antes de snapshot/eventos (FK)
+        db.flush()
+        mudancas = snapshots.registrar_snapshot(db, processo.id, fonte, dados, movimentacoes)
+    else:
+        antes = cache.valores_filtro(processo)
+        mudancas = snapshots.registrar_snapshot(db, processo.id, fonte, dados, movimentacoes)
+        if mudancas is not None:
+            for key, value in campos.items():
+                setattr(processo, key, value)
+    if mudancas is not None and dados.get("comunicacoes"):
+        numero = processo.numero_principal or numero_processo
+        prazos.registrar_comunicacoes(db, processo.id, numero, dados["comunicacoes"], uf_do_cnj(numero), fonte)
+    
+    monitoramento.registrar_verificacao(processo, movimentacoes)
+    depois = cache.valores_filtro(processo)
+    db.commit()
+    if mudancas:
+        cache.invalidar_processo(processo.id, antes, depois)
+        eventos.publicar_pendentes(db)
+    logger.info(f"Processo {numero_processo} salvo no banco")
+    return {"processo_id": str(processo.id), "mudancas": len(mudancas or [])}
 
-@celery_app.task(bind=True, max_retries=3)
+def resumo_resultado(sistema: str, numero_processo: str, resultado: dict, referencia: Optional[dict] = None) -> dict:
+    """
+    O que fica no result backend: status e referência do processo no banco,
+    sem cabeçalho nem movimentações (consulte /api/processos/{processo_id})
+    """
+    resumo = {"success": resultado["success"], "sistema": sistema, "numero_processo": numero_processo}
+    if resultado["success"]:
+        resumo["movimentacoes"] = len(resultado.get("movimentacoes") or [])
+        resumo.update(referencia or {})
+    else:
+        resumo.update(error=resultado.get("error"), categoria=resultado.get("categoria"))
+    return resumo
+
+@celery_app.task(bind=True, max_retries=5)
 def scrape_processo_task(self, sistema: str, numero_processo: str, credentials: dict = None):
-    """Task assíncrona para scraping de processo"""
+    """
+    Task assíncrona para scraping de processo.
+    Fases com checkpoint (coleta -> persistência): um retry retoma da fase
+    pendente, sem abrir o navegador de novo se a coleta já terminou.
+    Só erros transitórios são retentados (backoff exponencial com jitter);
+    o circuit breaker do tribunal segura as chamadas enquanto ele está fora.
+    """
+    chave = idempotencia.chave_scrape(sistema, numero_processo)
+    checkpoint = idempotencia.Checkpoint(self.request.id)
+    fonte = lotes.fonte_do_processo(sistema, numero_processo)
+    disjuntor = CircuitBreaker(fonte)
     try:
-        logger.info(f"Iniciando scraping {sistema} - {numero_processo}")
-        
-        scraper = ScraperFactory.create(sistema, headless=True)
-        if not scraper:
-            raise ValueError(f"Sistema {sistema} não suportado")
-        
-        resultado = scraper.executar(numero_processo, credentials)
+        resultado = checkpoint.get("coleta")
+        if resultado is None:
+            logger.info(f"Iniciando scraping {sistema} - {numero_processo}")
+            
+            scraper = ScraperFactory.create(sistema, headless=True)
+            if not scraper:
+                raise SistemaNaoSuportado(f"Sistema {sistema} não suportado")
+            if not disjuntor.permitir():
+                raise TribunalIndisponivel(f"Circuit breaker aberto para {disjuntor.tribunal}")
+            
+            resultado = scraper.executar(numero_processo, credentials)
+            _registrar_no_disjuntor(disjuntor, resultado)
+            if resultado["success"]:
+                checkpoint.salvar("coleta", resultado)
+            elif retentavel(resultado.get("categoria", DESCONHECIDO)):
+                raise ErroScraping(resultado["error"], resultado.get("categoria"))
+        else:
+            logger.info(f"Retomando {sistema} - {numero_processo} após a coleta (tentativa {self.request.retries})")
         
-        if resultado["success"]:
+        referencia = checkpoint.get("persistido")
+        if resultado["success"] and not referencia:
             # Salva no banco
             db = SessionLocal()
             try:
-                processo = db.query(Processo).filter(Processo.pasta == numero_processo).first()
-                if processo:
-                    # Atualiza
-                    for key, value in resultado["processo"].items():
-                        if hasattr(processo, key):
-                            setattr(processo, key, value)
-                else:
-                    # Cria novo
-                    processo = Processo(pasta=numero_processo, **resultado["processo"])
-                    db.add(processo)
-                
-                db.commit()
-                logger.info(f"Processo {numero_processo} salvo no banco")
+                referencia = _salvar_processo(db, numero_processo, fonte, resultado["processo"], resultado.get("movimentacoes"))
             finally:
                 db.close()
+            checkpoint.salvar("persistido", referencia)
         
-        return resultado
+        checkpoint.limpar()
+        if resultado["success"]:
+            idempotencia.concluir(chave, self.request.id)
+        else:
+            idempotencia.liberar(chave, self.request.id)
+        _publicar_conclusao(self.request.id, sistema, numero_processo, resultado)
+        return resumo_resultado(sistema, numero_processo, resultado, referencia)
     
     except Exception as e:
-        logger.error(f"Erro no scraping: {str(e)}")
-        raise self.retry(exc=e, countdown=60)
+        categoria = classificar(e)
+        logger.error(f"Erro no scraping ({categoria}): {str(e)}")
+        if not retentavel(categoria) or self.request.retries >= self.max_retries:
+            checkpoint.limpar()
+            idempotencia.liberar(chave, self.request.id)
+            _publicar_conclusao(self.request.id, sistema, numero_processo, {"success": False, "error": str(e), "categoria": categoria})
+            if not retentavel(categoria):
+                raise
+        countdown = espera_retry(self.request.retries)
+        if categoria == TRIBUNAL_FORA:
+            countdown += disjuntor.tempo_restante()
+        raise self.retry(exc=e, countdown=countdown)
+
+def _publicar_conclusao(task_id: str, sistema: str, numero_processo: str, resultado: dict):
+    """Avisa assinantes (SSE/webhooks) que a task terminou, sem precisar consultar /task/{id}"""
+    dados = {"task_id": task_id, "sistema": sistema, "numero_processo": numero_processo}
+    if resultado["success"]:
+        eventos.publicar(eventos.SCRAPE_CONCLUIDO, dados)
+    else:
+        eventos.publicar(eventos.SCRAPE_FALHOU, dict(dados, erro=resultado.get("error"), categoria=resultado.get("categoria")))
+
+def _registrar_no_disjuntor(disjuntor: CircuitBreaker, resultado: dict):
+    """Qualquer resposta do tribunal (inclusive "não encontrado") conta como sucesso"""
+    if resultado["success"] or resultado.get("categoria") not in FALHAS_DO_TRIBUNAL:
+        disjuntor.registrar_sucesso()
+    else:
+        disjuntor.registrar_falha()
+
+def submeter_scrape(sistema: str, numero_processo: str, credentials: dict = None) -> tuple:
+    """
+    Enfileira o scraping na fila interativa, a menos que o mesmo (sistema, número)
+    já esteja em andamento. Retorna (task_id, duplicado).
+    """
+    task_id = str(uuid4())
+    chave = idempotencia.chave_scrape(sistema, numero_processo)
+    existente = idempotencia.reservar(chave, task_id)
+    if existente:
+        return existente, True
+    try:
+        scrape_processo_task.apply_async(
+            (sistema, numero_processo, credentials),
+            task_id=task_id,
+            priority=filas.PRIORIDADE_INTERATIVA
+        )
+    except Exception:
+        # Task não publicada: a reserva apontaria para um id que nunca vai rodar
+        idempotencia.liberar(chave, task_id)
+        raise
+    return task_id, False
+
+@celery_app.task(bind=True, max_retries=8, soft_time_limit=3300, time_limit=3600)
+def scrape_chunk_task(
+    self,
+    lote_id: str,
+    fonte: str,
+    numeros_processos: list,
+    credentials: dict = None,
+    solicitante: str = None,
+    parcial: dict = None
+):
+    """
+    Chunk de um lote: todos os processos numa única sessão de navegador.
+    Falhas transitórias e processos não alcançados (circuit breaker aberto no
+    meio do chunk) voltam num retry do próprio chunk; na última tentativa
+    viram falhas do lote. Um erro inesperado também não derruba o chord: os
+    processos ainda não registrados viram falhas e o resumo volta normalmente,
+    para que finalizar_lote_task sempre rode.
+    """
+    disjuntor = CircuitBreaker(fonte)
+    ultima = self.request.retries >= self.max_retries
+    resumo = parcial or {"fonte": fonte, "total": len(numeros_processos), "sucesso": 0, "falhas": []}
+    registrados = set()
+    try:
+        permitido = disjuntor.permitir()
+        if not permitido and not ultima:
+            raise self.retry(countdown=disjuntor.tempo_restante() + espera_retry(self.request.retries))
+
+        pendentes = _executar_chunk(
+            lote_id, fonte, numeros_processos, credentials, disjuntor, permitido, ultima, resumo, registrados
+        )
+        if pendentes:
+            logger.info(f"Lote {lote_id}/{fonte}: {len(pendentes)} processos reagendados")
+            raise self.retry(
+                args=(lote_id, fonte, pendentes, credentials, solicitante),
+                kwargs={"parcial": resumo},
+                countdown=disjuntor.tempo_restante() + espera_retry(self.request.retries)
+            )
+    except Retry:
+        raise
+    except Exception as e:
+        logger.exception(f"Lote {lote_id}/{fonte}: chunk interrompido")
+        falhas = [
+            {"numero": numero, "fonte": fonte, "erro": f"Chunk interrompido: {e}", "categoria": classificar(e)}
+            for numero in numeros_processos if numero not in registrados
+        ]
+        resumo["falhas"].extend(falhas)
+        lotes.registrar_progresso(lote_id, falhas=falhas)
+    filas.liberar(solicitante)
+    return resumo
+
+def _executar_chunk(
+    lote_id: str,
+    fonte: str,
+    numeros_processos: list,
+    credentials: dict,
+    disjuntor: CircuitBreaker,
+    permitido: bool,
+    ultima_tentativa: bool,
+    resumo: dict,
+    registrados: set
+):
+    """Acumula em `resumo` (e `registrados`) e retorna os números a retentar"""
+    pendentes = []
+
+    def registrar(numero: str, erro: str = None, categoria: str = None):
+        registrados.add(numero)
+        if erro is None:
+            resumo["sucesso"] += 1
+            lotes.registrar_progresso(lote_id, sucesso=1)
+        else:
+            falha = {"numero": numero, "fonte": fonte, "erro": erro, "categoria": categoria}
+            resumo["falhas"].append(falha)
+            lotes.registrar_progresso(lote_id, falhas=[falha])
+
+    scraper = ScraperFactory.create(fonte, headless=True)
+    if not scraper:
+        for numero in numeros_processos:
+            registrar(numero, f"Sistema {fonte} não suportado", NAO_SUPORTADO)
+        return []
+
+    if not permitido:  # Última tentativa com o tribunal ainda fora
+        for numero in numeros_processos:
+            registrar(numero, f"Tribunal {fonte} indisponível", TRIBUNAL_FORA)
+        return []
+    deve_parar = None if ultima_tentativa else (lambda: disjuntor.estado() == ABERTO)
+
+    db = SessionLocal()
+    try:
+        def ao_concluir(resultado: dict):
+            numero = resultado["numero"]
+            _registrar_no_disjuntor(disjuntor, resultado)
+            if not resultado["success"]:
+                categoria = resultado.get("categoria", DESCONHECIDO)
+                if retentavel(categoria) and not ultima_tentativa:
+                    pendentes.append(numero)
+                    return
+                return registrar(numero, resultado.get("error", "Erro desconhecido"), categoria)
+            try:
+                _salvar_processo(db, numero, fonte, resultado["processo"], resultado.get("movimentacoes"))
+                registrar(numero)
+            except Exception as e:
+                db.rollback()
+                registrar(numero, f"Erro ao salvar: {str(e)}", classificar(e))
+
+        processados = scraper.executar_lote(numeros_processos, credentials, ao_concluir, deve_parar)
+        pendentes.extend(numeros_processos[len(processados):])
+    finally:
+        db.close()
+
+    return pendentes
 
 @celery_app.task
-def scrape_batch_task(sistema: str, numeros_processos: list, credentials: dict = None):
-    """Task para scraping em lote"""
-    resultados = []
-    for numero in numeros_processos:
-        resultado = scrape_processo_task.delay(sistema, numero, credentials)
-        resultados.append(resultado.id)
-    return resultados
+def finalizar_lote_task(resultados: list, lote_id: str):
+    """Callback do chord: consolida os resumos dos chunks"""
+    resumo = {"total": 0, "sucesso": 0, "falhas": 0, "por_fonte": {}}
+    for parcial in resultados:
+        fonte = resumo["por_fonte"].setdefault(parcial["fonte"], {"total": 0, "sucesso": 0, "falhas": 0})
+        for destino in (resumo, fonte):
+            destino["total"] += parcial["total"]
+            destino["sucesso"] += parcial["sucesso"]
+            destino["falhas"] += len(parcial["falhas"])
+    lotes.finalizar_lote(lote_id, resumo)
+    eventos.publicar(eventos.LOTE_CONCLUIDO, dict(resumo, lote_id=lote_id))
+    logger.info(f"Lote {lote_id} concluído: {resumo['sucesso']}/{resumo['total']}")
+    return resumo
+
+@celery_app.task(bind=True)
+def scrape_batch_task(
+    self,
+    sistema: str,
+    numeros_processos: list,
+    credentials: dict = None,
+    lote_id: str = None,
+    solicitante: str = None
+):
+    """
+    Scraping em lote: agrupa por tribunal, divide em chunks (uma sessão de
+    navegador por chunk) e dispara um chord; acompanhe em /scrape/batch/{lote_id}
+    """
+    plano = lotes.planejar_lote(sistema, numeros_processos)
+    lote_id = lote_id or lotes.criar_lote(sistema, sum(len(numeros) for _, numeros in plano))
+    if not plano:
+        lotes.finalizar_lote(lote_id, {"total": 0, "sucesso": 0, "falhas": 0, "por_fonte": {}})
+        return {"lote_id": lote_id, "chunks": 0}
+
+    lotes.iniciar_lote(lote_id, len(plano))
+    prioridades = filas.reservar_prioridades(solicitante, len(plano))
+    cabecalho = group(
+        scrape_chunk_task.s(lote_id, fonte, numeros, credentials, solicitante).set(priority=prioridade)
+        for (fonte, numeros), prioridade in zip(plano, prioridades)
+    )
+    resultado = chord(cabecalho)(finalizar_lote_task.s(lote_id))
+    logger.info(f"Lote {lote_id}: {len(numeros_processos)} processos em {len(plano)} chunks")
+    return {"lote_id": lote_id, "chunks": len(plano), "callback_id": resultado.id}
+
+@celery_app.task(ignore_result=True)
+def agendar_monitoramento_task():
+    """Dispara, por tribunal e dentro do orçamento, os processos com verificação vencida"""
+    db = SessionLocal()
+    try:
+        rodada = monitoramento.planejar_rodada(db)
+    finally:
+        db.close()
+    for tribunal, numeros in rodada.items():
+        lote_id = lotes.criar_lote(tribunal, len(numeros))
+        scrape_batch_task.delay(tribunal, numeros, None, lote_id, monitoramento.SOLICITANTE)
+    if rodada:
+        logger.info(f"Monitoramento: {sum(len(n) for n in rodada.values())} processos em {len(rodada)} tribunais")
+    return {tribunal: len(numeros) for tribunal, numeros in rodada.items()}
+
+@celery_app.task(ignore_result=True)
+def reconciliar_stats_task():
+    """Recalcula os contadores materializados do dashboard"""
+    db = SessionLocal()
+    try:
+        return reconciliar(db)
+    finally:
+        db.close()
+
+@celery_app.task(ignore_result=True)
+def publicar_eventos_task():
+    """Relay do outbox para o stream (rede de segurança do envio pós-commit)"""
+    db = SessionLocal()
+    try:
+        return eventos.publicar_pendentes(db)
+    finally:
+        db.close()
+
+@celery_app.task(ignore_result=True)
+def distribuir_webhooks_task():
+    """Lê o stream pelo consumer group e agenda uma entrega por webhook e lote"""
+    trava = "eventos:distribuidor"
+    r = get_redis()
+    if not r.set(trava, 1, nx=True, ex=300):
+        return 0
+    try:
+        db = SessionLocal()
+        try:
+            webhooks = [(str(w.id), w.tipos) for w in db.query(Webhook).filter(Webhook.ativo.is_(True))]
+        finally:
+            db.close()
+        total = 0
+        for _ in range(50):  # Limita a rodada; o resto fica para o próximo beat
+            entradas = eventos.ler_para_webhooks("distribuidor", settings.webhook_lote_max)
+            if not entradas:
+                break
+            lote = [evento for _, evento in entradas]
+            for webhook_id, tipos in webhooks:
+                selecionados = [evento for evento in lote if eventos.filtrar(evento, tipos=tipos)]
+                if selecionados:
+                    entregar_webhook_task.delay(webhook_id, selecionados)
+            eventos.confirmar([stream_id for stream_id, _ in entradas])
+            total += len(entradas)
+        return total
+    finally:
+        r.delete(trava)
+
+@celery_app.task(bind=True, max_retries=settings.webhook_max_tentativas, ignore_result=True)
+def entregar_webhook_task(self, webhook_id: str, lote: list):
+    """
+    POST de um lote de eventos, assinado com HMAC. O id da task vai em
+    X-Fusione-Entrega e se mantém nos retries (o receptor pode deduplicar).
+    """
+    db = SessionLocal()
+    try:
+        webhook = db.get(Webhook, UUID(webhook_id))
+    finally:
+        db.close()
+    if webhook is None or not webhook.ativo:
+        return {"entregue": False, "motivo": "webhook inativo"}
+    try:
+        eventos.validar_url_webhook(webhook.url)  # De novo na entrega: o DNS pode ter mudado
+    except ValueError as e:
+        logger.warning(f"Webhook {webhook_id} não entregue: {e}")
+        return {"entregue": False, "motivo": str(e)}
+
+    corpo = json.dumps({"eventos": lote}, ensure_ascii=False, default=str).encode("utf-8")
+    timestamp = str(int(time.time()))
+    headers = {
+        "Content-Type": "application/json",
+        "X-Fusione-Entrega": self.request.id,
+        "X-Fusione-Timestamp": timestamp,
+        "X-Fusione-Assinatura": eventos.assinar(webhook.segredo, timestamp, corpo),
+    }
+    try:
+        resposta = requests.post(
+            webhook.url, data=corpo, headers=headers, timeout=settings.webhook_timeout_seconds, allow_redirects=False
+        )
+    except requests.RequestException as e:
+        raise self.retry(exc=e, countdown=espera_retry(self.request.retries))
+
+    if resposta.status_code < 300:
+        return {"entregue": True, "eventos": len(lote)}
+    if resposta.status_code in (408, 429) or resposta.status_code >= 500:
+        erro = requests.HTTPError(f"Webhook {webhook_id}: HTTP {resposta.status_code}")
+        raise self.retry(exc=erro, countdown=espera_retry(self.request.retries))
+    # Demais 4xx: o receptor recusou o conteúdo, repetir não resolve
+    logger.error(f"Webhook {webhook_id} recusou a entrega: HTTP {resposta.status_code}")
+    return {"entregue": False, "status": resposta.status_code}
+
+@celery_app.task(ignore_result=True)
+def monitorar_djen_task():
+    """Consulta diária do DJEN: uma task por termo monitorado (parte/OAB), não por processo"""
+    termos = djen.termos_monitorados()
+    for termo in termos:
+        buscar_termo_djen_task.delay(termo.tipo, termo.valor)
+    logger.info(f"DJEN: {len(termos)} termos agendados")
+    return len(termos)
+
+@celery_app.task(bind=True, max_retries=5, ignore_result=True)
+def buscar_termo_djen_task(self, tipo: str, valor: str):
+    """Publicações do termo desde a última execução, deduplicadas e distribuídas aos processos"""
+    termo = djen.Termo(tipo, valor)
+    chave = f"djen:ultima:{termo.chave}"
+    hoje = date.today()
+    ultima = get_redis().get(chave)
+    inicio = date.fromisoformat(ultima) if ultima else hoje - timedelta(days=settings.djen_dias_retroativos)
+    try:
+        itens = list(djen.ClienteDJEN().buscar(termo, inicio, hoje))
+    except requests.RequestException as e:
+        raise self.retry(exc=e, countdown=espera_retry(self.request.retries))
+
+    db = SessionLocal()
+    try:
+        novas, vinculadas = djen.registrar_publicacoes(db, itens, termo)
+        db.commit()
+        if vinculadas:
+            eventos.publicar_pendentes(db)
+    finally:
+        db.close()
+    # A próxima execução repete o dia de hoje (publicações tardias); o hash deduplica
+    get_redis().set(chave, hoje.isoformat())
+    logger.info(f"DJEN {termo.chave}: {len(itens)} publicações, {novas} novas, {vinculadas} na carteira")
+    return {"termo": termo.chave, "publicacoes": len(itens), "novas": novas, "vinculadas": vinculadas}
@@ -0,0 +1,173 @@
+"""
+Cache read-through (Redis) das leituras quentes da API, com invalidação por tag.
+
+Cada entrada guarda as tags de que depende. A chave inclui a versão atual de
+cada tag (``cache:tag:<tag>``), então invalidar é um INCR: quem lê depois já
+calcula outra chave, e as entradas antigas somem pelo TTL. Como a versão é
+lida antes da consulta ao banco, uma leitura concorrente com uma escrita no
+máximo grava sob a versão velha, que ninguém mais procura. Por isso a
+invalidação vem sempre depois do commit.
+
+Tags:
+    processo:<id>            detalhe do processo
+    documentos:<id>          documentos do processo
+    lista:<dimensão>:<valor> listagens filtradas por situacao/natureza/risco
+    lista:todos              listagens sem filtro de dimensão (inclusive busca)
+
+Uma escrita em processo invalida o detalhe, ``lista:todos`` e as tags de
+dimensão dos valores antigos e novos; listagens de outros filtros continuam
+válidas. Misses concorrentes da mesma chave esperam quem pegou a trava
+(SET NX) calcular, em vez de irem todos ao banco. Falha do Redis nunca
+derruba a leitura: o valor é calculado direto.
+"""
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import uuid
+
+from redis.exceptions import RedisError
+
+from fc_core.core import codec
+from fc_core.core.config import get_settings
+from fc_core.core.redis_client import get_redis, get_redis_async
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PREFIXO = "cache"
+INTERVALO_ESPERA = 0.05  # Segundos entre checagens de quem perdeu a trava
+# filtro da listagem -> atributo de Processo (dimensões com tag própria)
+DIMENSOES = {"situacao": "situacao", "natureza": "natureza", "risco": "risco_atual"}
+TODOS = "lista:todos"
+
+_SE_DONO_APAGAR = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def tag_processo(processo_id) -> str:
+    return f"processo:{processo_id}"
+
+
+def tag_documentos(processo_id) -> str:
+    return f"documentos:{processo_id}"
+
+
+def tags_lista(filtros: Dict[str, Any]) -> List[str]:
+    """Tags de uma listagem: uma por dimensão filtrada, ou lista:todos"""
+    tags = [f"lista:{dim}:{filtros[dim]}" for dim in DIMENSOES if filtros.get(dim)]
+    return tags or [TODOS]
+
+
+def valores_filtro(processo) -> Dict[str, Any]:
+    """Valores das dimensões de listagem de um processo (guardar antes de alterar)"""
+    return {dim: getattr(processo, attr) for dim, attr in DIMENSOES.items()}
+
+
+def _chave_tag(tag: str) -> str:
+    return f"{PREFIXO}:tag:{tag}"
+
+
+def _chave(nome: str, params: Dict[str, Any], versoes: Iterable) -> str:
+    base = json.dumps([params, [v or 0 for v in versoes]], sort_keys=True, default=str)
+    return f"{PREFIXO}:{nome}:{hashlib.sha1(base.encode()).hexdigest()}"
+
+
+def lembrar(nome: str, params: Dict[str, Any], tags: List[str], calcular: Callable[[], Any]) -> Any:
+    """Valor em cache para (nome, params) ou calcular() (resultado serializável em JSON)"""
+    if settings.cache_ttl_seconds <= 0:
+        return calcular()
+    r = get_redis()
+    try:
+        chave = _chave(nome, params, r.mget([_chave_tag(t) for t in tags]))
+        valor = r.get(chave)
+        if valor is not None:
+            return codec.loads(valor)
+        token = uuid.uuid4().hex
+        if not r.set(f"{chave}:trava", token, nx=True, px=settings.cache_trava_ms):
+            limite = time.monotonic() + settings.cache_trava_ms / 1000
+            while time.monotonic() < limite:
+                time.sleep(INTERVALO_ESPERA)
+                valor = r.get(chave)
+                if valor is not None:
+                    return codec.loads(valor)
+            return calcular()
+    except RedisError as e:
+        logger.warning(f"Cache indisponível ({nome}): {e}")
+        return calcular()
+
+    try:
+        valor = calcular()
+        r.set(chave, codec.dumps(valor), ex=settings.cache_ttl_seconds)
+        return valor
+    finally:
+        try:
+            r.eval(_SE_DONO_APAGAR, 1, f"{chave}:trava", token)
+        except RedisError:
+            pass
+
+
+async def lembrar_async(nome: str, params: Dict[str, Any], tags: List[str], calcular: Callable[[], Awaitable[Any]]) -> Any:
+    """lembrar() para rotas async (cliente redis.asyncio, espera sem bloquear o loop)"""
+    if settings.cache_ttl_seconds <= 0:
+        return await calcular()
+    r = get_redis_async()
+    try:
+        chave = _chave(nome, params, await r.mget([_chave_tag(t) for t in tags]))
+        valor = await r.get(chave)
+        if valor is not None:
+            return codec.loads(valor)
+        token = uuid.uuid4().hex
+        if not await r.set(f"{chave}:trava", token, nx=True, px=settings.cache_trava_ms):
+            limite = time.monotonic() + settings.cache_trava_ms / 1000
+            while time.monotonic() < limite:
+                await asyncio.sleep(INTERVALO_ESPERA)
+                valor = await r.get(chave)
+                if valor is not None:
+                    return codec.loads(valor)
+            return await calcular()
+    except RedisError as e:
+        logger.warning(f"Cache indisponível ({nome}): {e}")
+        return await calcular()
+
+    try:
+        valor = await calcular()
+        await r.set(chave, codec.dumps(valor), ex=settings.cache_ttl_seconds)
+        return valor
+    finally:
+        try:
+            await r.eval(_SE_DONO_APAGAR, 1, f"{chave}:trava", token)
+        except RedisError:
+            pass
+
+
+def invalidar(*tags: str):
+    """Nova versão das tags; chamar depois do commit"""
+    tags = [t for t in dict.fromkeys(tags) if t]
+    if not tags or settings.cache_ttl_seconds <= 0:
+        return
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for tag in tags:
+            pipe.incr(_chave_tag(tag))
+        pipe.execute()
+    except RedisError as e:
+        # Sem a invalidação a leitura fica velha até o TTL
+        logger.error(f"Falha ao invalidar cache {tags}: {e}")
+
+
+def invalidar_processo(processo_id, *valores: Optional[Dict[str, Any]]):
+    """
+    Invalida detalhe e listagens afetadas por uma escrita no processo.
+    ``valores``: valores_filtro() de antes e/ou depois da escrita.
+    """
+    tags = [tag_processo(processo_id), TODOS]
+    for v in valores:
+        tags += [f"lista:{dim}:{v[dim]}" for dim in DIMENSOES if v and v.get(dim)]
+    invalidar(*tags)
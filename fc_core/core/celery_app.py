@@ -1,21 +1,106 @@
+import logging
+
 from celery import Celery
+from celery.schedules import crontab
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
 from fc_core.core.config import get_settings
+from fc_core.automation.filas import declarar_filas, FILA_PADRAO
+from fc_core.core import codec, database
+
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
+codec.registrar()
 
 celery_app = Celery(
     "fusionecore",
     broker=settings.redis_url,
-    backend=settings.redis_url
+    backend=settings.redis_url,
+    include=["fc_core.automation.tasks", "fc_core.reporting.tasks", "fc_core.analysis.tasks"]
 )
 
 celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    # msgpack + zlib acima do limite (fc_core.core.codec); formatos antigos seguem aceitos
+    task_serializer=codec.NOME,
+    accept_content=[codec.NOME, codec.NOME_JSON, "json"],
+    result_serializer=codec.NOME,
+    result_accept_content=[codec.NOME, codec.NOME_JSON, "json"],
+    # O backend guarda só resumos; dados completos ficam no banco
+    result_expires=settings.celery_result_expires_seconds,
     timezone="America/Sao_Paulo",
     enable_utc=True,
     task_track_started=True,
     task_time_limit=600,  # 10 minutos
     task_soft_time_limit=540,  # 9 minutos
+    # Filas: interativo / lote / lote.<tribunal> / celery (ver fc_core.automation.filas)
+    task_queues=declarar_filas(),
+    task_default_queue=FILA_PADRAO,
+    task_routes=("fc_core.automation.filas.rotear_task",),
+    task_default_priority=5,
+    # Tasks de navegador são longas: cada worker reserva só o que está executando
+    # e confirma ao final, então um worker morto devolve a task para a fila
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    broker_transport_options={
+        "queue_order_strategy": "priority",
+        "priority_steps": list(range(10)),
+        "visibility_timeout": 2 * 3600,  # Maior que a task mais longa (chunk: 1h)
+    },
+    beat_schedule={
+        "reconciliar-stats": {
+            "task": "fc_core.automation.tasks.reconciliar_stats_task",
+            "schedule": settings.stats_reconcile_interval_seconds,
+        },
+        "limpar-relatorios": {
+            "task": "fc_core.reporting.tasks.limpar_relatorios_task",
+            "schedule": 3600.0,
+        },
+        "agendar-monitoramento": {
+            "task": "fc_core.automation.tasks.agendar_monitoramento_task",
+            "schedule": settings.monitoramento_intervalo_seconds,
+        },
+        "publicar-eventos": {
+            "task": "fc_core.automation.tasks.publicar_eventos_task",
+            "schedule": settings.eventos_relay_intervalo_seconds,
+        },
+        "distribuir-webhooks": {
+            "task": "fc_core.automation.tasks.distribuir_webhooks_task",
+            "schedule": settings.eventos_relay_intervalo_seconds,
+        },
+        "monitorar-djen": {
+            "task": "fc_core.automation.tasks.monitorar_djen_task",
+            "schedule": crontab(hour=settings.djen_hora_execucao, minute=0),
+        },
+        "indexar-acervo": {
+            "task": "fc_core.analysis.tasks.indexar_acervo_task",
+            "schedule": 3600.0,
+        },
+    },
 )
+
+
+# Pool do banco por processo (fc_core.core.database): no prefork cada filho
+# recria a engine dividindo o teto pela concorrência; nos pools de threads
+# (threads/gevent/eventlet) o próprio worker abre até -c conexões
+_concorrencia = None
+
+
+@worker_init.connect
+def _dimensionar_banco(sender=None, **kwargs):
+    global _concorrencia
+    _concorrencia = sender.concurrency
+    pool_cls = sender.pool_cls if isinstance(sender.pool_cls, str) else sender.pool_cls.__module__
+    if "prefork" not in pool_cls and "processes" not in pool_cls:
+        database.inicializar(processos=settings.db_processos or 1, threads=_concorrencia)
+
+
+@worker_process_init.connect
+def _engine_do_processo(**kwargs):
+    database.inicializar(processos=settings.db_processos or _concorrencia, threads=1)
+
+
+@worker_process_shutdown.connect
+def _encerrar_engine(**kwargs):
+    logger.info(f"Pool do banco ao encerrar: {database.metricas_pool()}")
+    database.descartar()
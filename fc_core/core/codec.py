@@ -0,0 +1,105 @@
+"""
+Codecs das mensagens Celery e do result backend.
+
+    fcpack  padrão: msgpack (binário, sem reescrever números/strings como
+            texto) com zlib acima de CELERY_COMPRESSAO_MIN_BYTES; o primeiro
+            byte diz o formato, então payloads pequenos não pagam compressão
+    fcjson  orjson quando instalado, json da biblioteca padrão senão
+
+Sem msgpack instalado, fcpack embala JSON com o mesmo cabeçalho. Em todos os
+formatos Decimal vira texto (sem perder precisão), datas viram ISO 8601.
+"""
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+from uuid import UUID
+import json
+import zlib
+
+from kombu.serialization import register
+
+from fc_core.core.config import get_settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+settings = get_settings()
+
+NOME = "fcpack"
+CONTENT_TYPE = "application/x-fcpack"
+NOME_JSON = "fcjson"
+CONTENT_TYPE_JSON = "application/x-fcjson"
+
+# Primeiro byte do fcpack
+MSGPACK, MSGPACK_ZLIB, JSON, JSON_ZLIB = b"\x00", b"\x01", b"\x02", b"\x03"
+COMPRIMIDO = {MSGPACK: MSGPACK_ZLIB, JSON: JSON_ZLIB}
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, UUID):
+        return str(obj)
+    if is_dataclass(obj):
+        return asdict(obj)
+    raise TypeError(f"Tipo não serializável: {type(obj).__name__}")
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(dados) -> Any:
+    if orjson is not None:
+        return orjson.loads(dados)
+    return json.loads(dados)
+
+
+def empacotar(obj: Any, compressao_min_bytes: int = None) -> bytes:
+    limite = settings.celery_compressao_min_bytes if compressao_min_bytes is None else compressao_min_bytes
+    if msgpack is not None:
+        formato, corpo = MSGPACK, msgpack.packb(obj, default=_default, use_bin_type=True)
+    else:
+        formato, corpo = JSON, dumps(obj)
+    if limite and len(corpo) >= limite:
+        comprimido = zlib.compress(corpo, 6)
+        if len(comprimido) < len(corpo):
+            return COMPRIMIDO[formato] + comprimido
+    return formato + corpo
+
+
+def desempacotar(dados) -> Any:
+    dados = bytes(dados)
+    formato, corpo = dados[:1], dados[1:]
+    if formato in (MSGPACK_ZLIB, JSON_ZLIB):
+        corpo = zlib.decompress(corpo)
+    if formato in (MSGPACK, MSGPACK_ZLIB):
+        if msgpack is None:
+            raise ValueError("Payload msgpack recebido sem o pacote msgpack instalado")
+        return msgpack.unpackb(corpo, raw=False, strict_map_key=False)
+    if formato in (JSON, JSON_ZLIB):
+        return loads(corpo)
+    raise ValueError(f"Formato fcpack desconhecido: {formato!r}")
+
+
+def registrar():
+    """Registra os serializers no kombu (chamado pelo celery_app)"""
+    register(NOME, empacotar, desempacotar, content_type=CONTENT_TYPE, content_encoding="binary")
+    register(NOME_JSON, dumps, loads, content_type=CONTENT_TYPE_JSON, content_encoding="binary")
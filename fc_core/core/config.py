@@ -10,6 +10,18 @@ class Settings(BaseSettings):
     database_url: str
     redis_url: str
     
+    db_max_conexoes: int = 60  # Teto do serviço no banco, dividido entre os processos
+    db_processos: int = 0  # Processos dividindo o teto; 0 = WEB_CONCURRENCY (API) ou -c (worker)
+    db_pool_size: int = 0  # Por processo; 0 = derivado do teto e da concorrência
+    db_max_overflow: int = -1  # Por processo; -1 = derivado
+    db_pool_timeout_seconds: int = 10
+    db_pool_recycle_seconds: int = 1800  # Abaixo do wait_timeout do MySQL gerenciado
+    db_async_conexoes: int = 20  # Parte do teto da API reservada à engine async
+    api_leitura_async: bool = False  # Rotas de leitura quentes pela engine async; sem o driver usa as síncronas
+    
+    cache_ttl_seconds: int = 300  # Leituras quentes no Redis (fc_core.core.cache); 0 desliga
+    cache_trava_ms: int = 5000  # Quanto um miss espera outro processo calcular a mesma chave
+    
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
@@ -17,6 +29,71 @@ class Settings(BaseSettings):
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     
+    stats_reconcile_interval_seconds: int = 3600
+    report_pdf_workers: int = 0  # >1 renderiza faixas de páginas em paralelo
+    reports_dir: str = "outputs/reports"
+    report_retention_hours: int = 24
+    report_cache_max_mb: int = 1024
+    
+    storage_dir: str = "outputs/documents"
+    
+    ocr_workers: int = 2
+    ocr_max_fila: int = 8
+    llm_workers: int = 4
+    llm_max_fila: int = 16
+    ocr_engine_versao: str = "1"  # Alterar invalida o cache de páginas
+    preload_services: str = ""  # ex: "ocr,ner" carrega no startup da API
+    
+    ollama_base_url: str = "http://127.0.0.1:11434"
+    ollama_timeout_seconds: int = 120
+    embedding_model: str = "nomic-embed-text"
+    llm_model: str = "llama3.1:8b"
+    llm_cache_dir: str = "outputs/llm_cache"
+    llm_cache_max_mb: int = 256
+    llm_chunk_caracteres: int = 12000  # Textos maiores passam por map-reduce
+    llm_map_workers: int = 4  # Chamadas paralelas por etapa de map (compartilhadas no processo)
+    embedding_batch_size: int = 64
+    chunk_tamanho: int = 1500
+    chunk_sobreposicao: int = 200
+    scrape_chunk_size: int = 25  # Processos por sessão de navegador nos lotes
+    scrape_batch_ttl_seconds: int = 7 * 24 * 3600
+    scrape_idempotencia_ttl_seconds: int = 2 * 3600  # Reserva enquanto a task pode estar em andamento
+    scrape_dedup_janela_seconds: int = 300  # Após concluir, repetições reaproveitam o resultado
+    scrape_retry_base_seconds: int = 30
+    scrape_retry_max_seconds: int = 1800
+    scrape_sonda_timeout_seconds: int = 600
+    circuit_breaker_limiar: int = 5  # Falhas do tribunal na janela para abrir o circuito
+    circuit_breaker_janela_seconds: int = 120
+    circuit_breaker_cooldown_seconds: int = 300
+    scrape_filas_dedicadas: str = "tjsp,tjmg"  # Tribunais com fila (e workers) próprios
+    
+    monitoramento_intervalo_seconds: int = 300  # Frequência da rodada de agendamento (beat)
+    monitoramento_max_por_rodada: int = 2000
+    monitoramento_limite_tribunal_hora: int = 300  # Scrapes de monitoramento por tribunal/hora
+    monitoramento_limites_tribunal: str = ""  # Exceções, ex: "tjsp:600,trt3:120"
+    monitoramento_fator_tribunal: str = ""  # Multiplicador do intervalo, ex: "tjsp:1.5"
+    
+    celery_compressao_min_bytes: int = 4096  # Payloads fcpack maiores que isso vão com zlib
+    celery_result_expires_seconds: int = 6 * 3600  # Resultados no Redis (o banco guarda os dados)
+    
+    eventos_stream_maxlen: int = 100000  # Entradas mantidas no stream (aproximado)
+    eventos_relay_intervalo_seconds: int = 5  # Beat que publica o outbox pendente
+    webhook_lote_max: int = 100  # Eventos por entrega
+    webhook_timeout_seconds: int = 10
+    webhook_max_tentativas: int = 8
+    
+    djen_api_url: str = "https://comunicaapi.pje.jus.br/api/v1/comunicacao"
+    djen_oabs: str = ""  # Inscrições monitoradas, ex: "12345/RS,6789/SP"
+    djen_itens_por_pagina: int = 100
+    djen_max_paginas: int = 50  # Por termo e execução
+    djen_dias_retroativos: int = 3  # Janela da primeira execução de um termo
+    djen_hora_execucao: int = 7  # Hora local da consulta diária
+    
+    prazos_suspensoes: str = ""  # Suspensões extras, ex: "2025-03-05,sp:2025-02-10..2025-02-12"
+    
+    vector_backend: str = "local"  # local (IVF em memmap) ou legado (fc_core.analysis.vector_store)
+    vector_index_dir: str = "outputs/vector_index"
+    
     model_config = SettingsConfigDict(
         env_file=".env",
         case_sensitive=False,
@@ -1,23 +1,249 @@
+"""
+Engine e sessões do banco, uma engine por processo.
+
+O pool é dimensionado pelo teto de conexões do serviço (DB_MAX_CONEXOES)
+dividido entre os processos que o compartilham:
+    API     processos = WEB_CONCURRENCY, threads = threadpool do Starlette
+    worker  processos = concorrência do Celery (-c), uma task por processo;
+            cada filho do prefork recria a engine em worker_process_init
+            (ver fc_core.core.celery_app)
+
+Conexões herdadas num fork nunca são usadas pelo filho: o pool é descartado
+com dispose(close=False), que abandona os sockets sem fechá-los (o pai segue
+usando os seus). DB_POOL_SIZE / DB_MAX_OVERFLOW fixam os valores à mão.
+
+Na API as rotas de leitura quentes usam uma engine async (aiomysql, asyncpg
+ou aiosqlite, escolhido pelo esquema de DATABASE_URL) com a sua parte do
+teto (DB_ASYNC_CONEXOES); o resto continua na engine síncrona. Só com
+API_LEITURA_ASYNC=true e o driver instalado; senão ficam as rotas síncronas.
+"""
+from threading import Lock
+from typing import Optional, Tuple
+import importlib
+import logging
+import os
+import time
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from fc_core.core.config import get_settings
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-    pool_size=20,
-    max_overflow=10
-)
+THREADS_API = 40  # Limite padrão do threadpool do Starlette (anyio) para rotas síncronas
+# Driver síncrono -> driver async equivalente
+DRIVERS_ASYNC = {"mysql": "aiomysql", "mariadb": "aiomysql", "postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+class PoolMedido(QueuePool):
+    """QueuePool que mede o tempo de checkout (espera por vaga + conexão nova + pre-ping)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._trava_metricas = Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+
+    def connect(self):
+        inicio = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeout:
+            with self._trava_metricas:
+                self.timeouts += 1
+            raise
+        finally:
+            espera = time.perf_counter() - inicio
+            with self._trava_metricas:
+                self.checkouts += 1
+                self.espera_total += espera
+                self.espera_max = max(self.espera_max, espera)
+
+    def metricas(self) -> dict:
+        with self._trava_metricas:
+            checkouts, timeouts, total, maximo = self.checkouts, self.timeouts, self.espera_total, self.espera_max
+        return {
+            "tamanho": self.size(),
+            "max_overflow": self._max_overflow,
+            "em_uso": self.checkedout(),
+            "ociosas": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "espera_media_ms": round(total / checkouts * 1000, 2) if checkouts else 0.0,
+            "espera_max_ms": round(maximo * 1000, 2),
+        }
+
+
+class PoolMedidoAsync(PoolMedido, AsyncAdaptedQueuePool):
+    """PoolMedido da engine async (fila compatível com asyncio)"""
+
+
+def dimensionar_pool(processos: int, threads: int, teto: Optional[int] = None) -> Tuple[int, int]:
+    """
+    (pool_size, max_overflow) para um processo: o pool cobre as threads que
+    usam o banco e o overflow absorve sessões aninhadas, sem que a soma dos
+    processos passe do teto.
+    """
+    teto = settings.db_max_conexoes if teto is None else teto
+    por_processo = max(1, teto // max(1, processos))
+    pool_size = max(1, min(threads, por_processo))
+    max_overflow = max(0, min(por_processo, 2 * threads) - pool_size)
+    if settings.db_pool_size:
+        pool_size = settings.db_pool_size
+    if settings.db_max_overflow >= 0:
+        max_overflow = settings.db_max_overflow
+    return pool_size, max_overflow
+
+
+def _sqlite_em_memoria(url: str) -> bool:
+    u = make_url(url)
+    return u.get_backend_name() == "sqlite" and u.database in (None, "", ":memory:")
+
+
+def url_async(url: str) -> str:
+    """mysql+pymysql://... -> mysql+aiomysql://... (idem postgresql/sqlite)"""
+    u = make_url(url)
+    backend = u.get_backend_name()
+    if backend not in DRIVERS_ASYNC:
+        raise ValueError(f"Sem driver async conhecido para {backend}")
+    return u.set(drivername=f"{backend}+{DRIVERS_ASYNC[backend]}").render_as_string(hide_password=False)
+
+
+def driver_async_disponivel(url: Optional[str] = None) -> bool:
+    backend = make_url(url or settings.database_url).get_backend_name()
+    try:
+        importlib.import_module(DRIVERS_ASYNC[backend])
+    except (KeyError, ImportError) as e:
+        logger.warning(f"Driver async indisponível para {backend} ({e}); leituras pela engine síncrona")
+        return False
+    return True
+
+
+def criar_engine(url: Optional[str] = None, processos: int = 1, threads: int = 1, teto: Optional[int] = None) -> Engine:
+    url = url or settings.database_url
+    if _sqlite_em_memoria(url):
+        return create_engine(url)
+    pool_size, max_overflow = dimensionar_pool(processos, threads, teto)
+    return create_engine(
+        url,
+        poolclass=PoolMedido,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+    )
+
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def criar_engine_async(url: Optional[str] = None, processos: int = 1, teto: Optional[int] = None) -> AsyncEngine:
+    """
+    Engine async com a parte do teto reservada a ela. Sem threads, a
+    concorrência é o próprio pool: o excedente espera na fila do pool.
+    """
+    url = url_async(url or settings.database_url)
+    teto = settings.db_async_conexoes if teto is None else teto
+    pool_size = max(1, teto // max(1, processos))
+    return create_async_engine(
+        url,
+        poolclass=PoolMedidoAsync,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=0,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+    )
+
+
+# Rotas de leitura quentes pela engine async (decidido na importação das rotas)
+LEITURA_ASYNC = settings.api_leitura_async and driver_async_disponivel()
+
+engine: Optional[Engine] = None
+engine_async: Optional[AsyncEngine] = None
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
+
+def _processos_api(processos: Optional[int]) -> int:
+    return processos or settings.db_processos or int(os.getenv("WEB_CONCURRENCY", "1"))
+
+
+def inicializar(processos: Optional[int] = None, threads: int = THREADS_API, teto: Optional[int] = None) -> Engine:
+    """(Re)cria a engine deste processo e aponta SessionLocal para ela"""
+    global engine
+    processos = _processos_api(processos)
+    anterior, engine = engine, criar_engine(processos=processos, threads=threads, teto=teto)
+    SessionLocal.configure(bind=engine)
+    if anterior is not None:
+        anterior.dispose()
+    pool = engine.pool
+    if isinstance(pool, PoolMedido):
+        logger.info(f"Pool do banco (pid {os.getpid()}): {pool.size()} + {pool._max_overflow} overflow, {processos} processo(s) x {threads} thread(s)")
+    return engine
+
+
+def inicializar_async(processos: Optional[int] = None) -> AsyncEngine:
+    """Cria a engine async deste processo (API) e aponta AsyncSessionLocal para ela"""
+    global engine_async
+    if engine_async is not None:
+        engine_async.sync_engine.dispose(close=False)
+    engine_async = criar_engine_async(processos=_processos_api(processos))
+    AsyncSessionLocal.configure(bind=engine_async)
+    logger.info(f"Pool async do banco (pid {os.getpid()}): {engine_async.pool.size()} conexões")
+    return engine_async
+
+
+def descartar(fechar: bool = True):
+    """Descarta os pools; com fechar=False só abandona as conexões (uso após fork)"""
+    if engine is not None:
+        engine.dispose(close=fechar)
+    if engine_async is not None and not fechar:
+        engine_async.sync_engine.dispose(close=False)
+
+
+async def descartar_async():
+    global engine_async
+    if engine_async is not None:
+        await engine_async.dispose()
+        engine_async = None
+
+
+def _metricas(pool) -> dict:
+    if isinstance(pool, PoolMedido):
+        return pool.metricas()
+    return {"status": pool.status()}
+
+
+def metricas_pool() -> dict:
+    metricas = dict(_metricas(engine.pool), pid=os.getpid())
+    if engine_async is not None:
+        metricas["async"] = _metricas(engine_async.pool)
+    return metricas
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_db_async():
+    if engine_async is None:
+        inicializar_async()
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+inicializar()
+os.register_at_fork(after_in_child=lambda: descartar(fechar=False))
@@ -0,0 +1,70 @@
+"""
+Pools de execução fora do event loop com controle de admissão.
+
+Cada pool aceita no máximo `max_workers + max_fila` tarefas simultâneas;
+acima disso a submissão falha imediatamente com PoolSaturado, que a API
+converte em 503 + Retry-After em vez de acumular requisições sem limite.
+"""
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Callable, Iterable, List, Optional
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class PoolSaturado(Exception):
+    def __init__(self, nome: str, retry_after: int):
+        super().__init__(f"Pool {nome} saturado")
+        self.nome = nome
+        self.retry_after = retry_after
+
+
+class PoolLimitado:
+    def __init__(self, nome: str, processos: bool, max_workers: int, max_fila: int, retry_after: int = 10):
+        self.nome = nome
+        self.processos = processos
+        self.max_workers = max_workers
+        self.retry_after = retry_after
+        self._vagas = threading.BoundedSemaphore(max_workers + max_fila)
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> Executor:
+        # Criado sob demanda: processos da API que não usam o pool não pagam o fork
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    cls = ProcessPoolExecutor if self.processos else ThreadPoolExecutor
+                    self._executor = cls(max_workers=self.max_workers)
+                    logger.info(f"Pool {self.nome} iniciado com {self.max_workers} workers")
+        return self._executor
+
+    @asynccontextmanager
+    async def vaga(self):
+        """Reserva uma vaga de admissão (ex: um documento inteiro)"""
+        if not self._vagas.acquire(blocking=False):
+            raise PoolSaturado(self.nome, self.retry_after)
+        try:
+            yield
+        finally:
+            self._vagas.release()
+
+    async def executar(self, fn: Callable, *args, **kwargs):
+        async with self.vaga():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+
+    def mapear(self, fn: Callable, argumentos: Iterable[tuple]) -> List:
+        """Distribui chamadas entre os workers (bloqueante; usar dentro de uma vaga)"""
+        futuros = [self.executor.submit(fn, *args) for args in argumentos]
+        return [f.result() for f in futuros]
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Text, DECIMAL, JSON, ForeignKey
+from sqlalchemy import Column, String, Boolean, Date, DateTime, Text, DECIMAL, JSON, ForeignKey, Integer, BigInteger, Index
 from sqlalchemy.types import Uuid
 from sqlalchemy.sql import func
 from fc_core.core.database import Base
@@ -20,7 +20,7 @@ class Processo(Base):
     __tablename__ = "processos"
     id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     pasta = Column(String(100), unique=True, nullable=False)
-    numero_principal = Column(String(50))
+    numero_principal = Column(String(50), index=True)  # Fan-out de publicações e monitoramento
     # SQLite não suporta ARRAY nativo, usamos JSON
     numeros_extra = Column(JSON) 
     situacao = Column(String(50))
@@ -35,16 +35,128 @@ class Processo(Base):
     valor_causa = Column(DECIMAL(15, 2))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     deleted_at = Column(DateTime(timezone=True))
+    
+    # Monitoramento (ver fc_core.automation.monitoramento)
+    ultima_movimentacao = Column(DateTime(timezone=True))
+    ultima_verificacao = Column(DateTime(timezone=True))
+    proxima_verificacao = Column(DateTime(timezone=True), index=True)
 
 class Documento(Base):
     __tablename__ = "documentos"
+    __table_args__ = (Index("ix_documentos_processo_hash", "processo_id", "sha256_hash"),)
     id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     processo_id = Column(Uuid(as_uuid=True), ForeignKey('processos.id'))
     nome_arquivo = Column(String(500), nullable=False)
-    sha256_hash = Column(String(64), nullable=False)
+    sha256_hash = Column(String(64), nullable=False, index=True)  # -> blobs.sha256_hash
     mime_type = Column(String(100))
     storage_backend = Column(String(20), default='filesystem')
     storage_path = Column(Text, nullable=False)
     tamanho_bytes = Column(DECIMAL)
     texto_extraido = Column(Text)
+    texto_sha256 = Column(String(64))  # Hash do texto extraído (reindexação quando muda)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class Blob(Base):
+    """Conteúdo armazenado uma única vez e compartilhado entre Documentos"""
+    __tablename__ = "blobs"
+    sha256_hash = Column(String(64), primary_key=True)
+    storage_backend = Column(String(20), default='filesystem')
+    storage_path = Column(Text, nullable=False)
+    tamanho_bytes = Column(BigInteger, nullable=False)
+    refcount = Column(Integer, nullable=False, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class PaginaOCR(Base):
+    """Texto por página de um conteúdo (cache de OCR incremental)"""
+    __tablename__ = "paginas_ocr"
+    sha256_hash = Column(String(64), primary_key=True)
+    pagina = Column(Integer, primary_key=True)
+    engine_versao = Column(String(20), primary_key=True)
+    origem = Column(String(10), nullable=False)  # "texto" (camada do PDF) ou "ocr"
+    texto = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class DocumentoIndexado(Base):
+    """Controle de indexação no vector store (texto indexado + modelo de embedding)"""
+    __tablename__ = "documentos_indexados"
+    documento_id = Column(Uuid(as_uuid=True), ForeignKey('documentos.id'), primary_key=True)
+    sha256_hash = Column(String(64), nullable=False)  # Arquivo
+    texto_sha256 = Column(String(64))  # Texto que foi embeddado
+    modelo = Column(String(100), nullable=False)
+    chunks = Column(Integer, nullable=False, default=0)
+    indexado_em = Column(DateTime(timezone=True), server_default=func.now())
+
+class ProcessoStats(Base):
+    """Contadores materializados do dashboard (mantidos por fc_core.core.stats)"""
+    __tablename__ = "processo_stats"
+    dimensao = Column(String(30), primary_key=True)  # total, situacao, risco, cliente...
+    chave = Column(String(255), primary_key=True)    # "" representa valor nulo
+    quantidade = Column(Integer, nullable=False, default=0)
+    valor_total = Column(DECIMAL(18, 2), nullable=False, default=0)
+
+class SnapshotProcesso(Base):
+    """Último retorno normalizado de cada fonte (ver fc_core.automation.diff)"""
+    __tablename__ = "snapshots_processo"
+    processo_id = Column(Uuid(as_uuid=True), ForeignKey('processos.id'), primary_key=True)
+    fonte = Column(String(50), primary_key=True)
+    hash = Column(String(64), nullable=False)
+    dados = Column(JSON, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class EventoProcesso(Base):
+    """Feed de mudanças detectadas entre snapshots"""
+    __tablename__ = "eventos_processo"
+    __table_args__ = (Index("ix_eventos_processo_processo", "processo_id", "id"),)
+    # BIGINT não é alias de rowid no SQLite (sem autoincremento)
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    processo_id = Column(Uuid(as_uuid=True), ForeignKey('processos.id'), nullable=False)
+    fonte = Column(String(50), nullable=False)
+    tipo = Column(String(30), nullable=False)
+    dados = Column(JSON)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    publicado_em = Column(DateTime(timezone=True), index=True)  # Nulo até o relay enviar ao stream
+
+class Webhook(Base):
+    """Assinatura de entrega dos eventos por HTTP (ver fc_core.automation.eventos)"""
+    __tablename__ = "webhooks"
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    url = Column(Text, nullable=False)
+    segredo = Column(String(64), nullable=False)  # Chave do HMAC-SHA256
+    tipos = Column(JSON)  # Lista de tipos aceitos; nulo = todos
+    ativo = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class PublicacaoDJEN(Base):
+    """Publicação do DJEN, deduplicada por hash (ver fc_core.automation.djen)"""
+    __tablename__ = "publicacoes_djen"
+    hash = Column(String(64), primary_key=True)
+    numero_processo = Column(String(50), index=True)
+    processo_id = Column(Uuid(as_uuid=True), ForeignKey('processos.id'), index=True)  # Nulo se fora da carteira
+    tribunal = Column(String(20))
+    data_disponibilizacao = Column(Date)
+    tipo_comunicacao = Column(String(100))
+    texto = Column(Text)
+    link = Column(Text)
+    termo = Column(String(255))  # Termo monitorado que trouxe a publicação
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class PrazoComunicacao(Base):
+    """Prazo de uma citação/intimação com vencimento em dias úteis (ver fc_core.core.prazos)"""
+    __tablename__ = "prazos_comunicacao"
+    __table_args__ = (Index("ix_prazos_pendentes_vencimento", "cumprido_em", "vencimento"),)
+    id = Column(String(64), primary_key=True)  # Hash de processo + tipo + disponibilização
+    processo_id = Column(Uuid(as_uuid=True), ForeignKey('processos.id'), index=True)
+    numero_processo = Column(String(50))
+    origem = Column(String(50))
+    tipo = Column(String(100))
+    status = Column(String(50))
+    uf = Column(String(2))  # Calendário estadual usado; nulo = só nacional
+    data_disponibilizacao = Column(Date, nullable=False)
+    dias = Column(Integer, nullable=False)
+    vencimento = Column(Date, nullable=False)
+    prazo_informado = Column(Date)  # Quando a fonte já traz o prazo final
+    cumprido_em = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# Registra os listeners que mantêm ProcessoStats atualizado em cada flush
+from fc_core.core import stats  # noqa: E402,F401
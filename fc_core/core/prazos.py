@@ -0,0 +1,231 @@
+"""
+Prazos processuais em dias úteis (CPC arts. 219, 220 e 224), vetorizados.
+
+O vencimento de milhares de comunicações sai de uma única chamada a
+``numpy.busday_offset`` por UF. Cada UF tem o próprio ``busdaycalendar``:
+    nacional    feriados fixos, Carnaval, Sexta-feira Santa e Corpus Christi
+                (móveis, a partir da Páscoa)
+    estadual    data magna da UF (lista mínima em FERIADOS_ESTADUAIS)
+    recesso     20/12 a 20/01, quando os prazos ficam suspensos (art. 220)
+    extras      PRAZOS_SUSPENSOES: datas ou intervalos, gerais ou por UF
+                (ex: indisponibilidade do sistema do tribunal)
+
+Contagem: a ciência em dia não útil vale no primeiro dia útil seguinte; o
+prazo começa no dia útil seguinte à ciência e vence no n-ésimo dia útil,
+ou seja, ``busday_offset(ciencia, n, roll="forward")``. A ciência é a
+própria disponibilização (leitura tácita não é presumida): na dúvida o
+vencimento calculado é o mais cedo possível.
+"""
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import hashlib
+import logging
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from fc_core.core.config import get_settings
+from fc_core.core.models import PrazoComunicacao, Processo
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+NACIONAIS_FIXOS = ["01-01", "04-21", "05-01", "09-07", "10-12", "11-02", "11-15", "12-25"]
+FERIADOS_ESTADUAIS = {
+    "al": ["09-16"], "am": ["09-05"], "ba": ["07-02"], "ce": ["03-25"], "df": ["11-30"],
+    "ma": ["07-28"], "ms": ["10-11"], "pa": ["08-15"], "pb": ["08-05"], "pe": ["03-06"],
+    "pi": ["10-19"], "rj": ["04-23"], "rn": ["10-03"], "rr": ["10-05"], "rs": ["09-20"],
+    "se": ["07-08"], "sp": ["07-09"], "to": ["10-05"],
+}
+# Dias úteis de prazo quando a fonte não informa
+PRAZO_PADRAO = {"citação": 15, "citacao": 15, "intimação": 5, "intimacao": 5}
+PRAZO_PADRAO_DIAS = 15
+
+
+def pascoa(ano: int) -> date:
+    """Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher)"""
+    a, b, c = ano % 19, ano // 100, ano % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes = (h + l - 7 * m + 114) // 31
+    dia = (h + l - 7 * m + 114) % 31 + 1
+    return date(ano, mes, dia)
+
+
+def feriados_nacionais(ano: int) -> List[date]:
+    fixos = list(NACIONAIS_FIXOS)
+    if ano >= 2024:
+        fixos.append("11-20")  # Lei 14.759/2023
+    datas = [date.fromisoformat(f"{ano}-{md}") for md in fixos]
+    p = pascoa(ano)
+    datas += [p - timedelta(days=48), p - timedelta(days=47), p - timedelta(days=2), p + timedelta(days=60)]
+    return datas
+
+
+def recesso(ano: int) -> List[date]:
+    """Dias de recesso dentro do ano: 01/01 a 20/01 e 20/12 a 31/12"""
+    inicio = date(ano, 1, 1)
+    janeiro = [inicio + timedelta(days=i) for i in range(20)]
+    dezembro = [date(ano, 12, d) for d in range(20, 32)]
+    return janeiro + dezembro
+
+
+def _intervalo(texto: str) -> List[date]:
+    if ".." in texto:
+        inicio, fim = (date.fromisoformat(t.strip()) for t in texto.split(".."))
+        return [inicio + timedelta(days=i) for i in range((fim - inicio).days + 1)]
+    return [date.fromisoformat(texto.strip())]
+
+
+def suspensoes_extras(config: Optional[str] = None) -> Dict[Optional[str], List[date]]:
+    """Lê "2025-03-05,sp:2025-02-10..2025-02-12" -> {None: [...], "sp": [...]}"""
+    extras: Dict[Optional[str], List[date]] = {}
+    for item in (settings.prazos_suspensoes if config is None else config).split(","):
+        item = item.strip()
+        if not item:
+            continue
+        uf, _, periodo = item.rpartition(":") if ":" in item else (None, None, item)
+        extras.setdefault(uf.lower() if uf else None, []).extend(_intervalo(periodo))
+    return extras
+
+
+@lru_cache(maxsize=64)
+def calendario(uf: Optional[str], ano_inicial: int, ano_final: int) -> np.busdaycalendar:
+    """Segunda a sexta, sem feriados nacionais/estaduais, recesso e suspensões"""
+    uf = (uf or "").lower() or None
+    extras = suspensoes_extras()
+    dias = list(extras.get(None, [])) + (extras.get(uf, []) if uf else [])
+    for ano in range(ano_inicial, ano_final + 1):
+        dias += feriados_nacionais(ano) + recesso(ano)
+        dias += [date.fromisoformat(f"{ano}-{md}") for md in FERIADOS_ESTADUAIS.get(uf, [])]
+    return np.busdaycalendar(weekmask="1111100", holidays=np.array(sorted(set(dias)), dtype="datetime64[D]"))
+
+
+def calcular_vencimentos(inicios: Sequence, dias: Sequence[int], ufs: Optional[Sequence[Optional[str]]] = None) -> np.ndarray:
+    """
+    Vencimentos (datetime64[D]) para vetores de datas de ciência e prazos em
+    dias úteis; uma chamada de busday_offset por UF distinta.
+    """
+    inicios = np.asarray(inicios, dtype="datetime64[D]")
+    dias = np.asarray(dias, dtype=np.int64)
+    vencimentos = np.empty(inicios.shape, dtype="datetime64[D]")
+    if inicios.size == 0:
+        return vencimentos
+    ufs = np.asarray([(u or "").lower() for u in (ufs if ufs is not None else [None] * inicios.size)], dtype=object)
+
+    anos = inicios.astype("datetime64[Y]").astype(int) + 1970
+    # Folga para prazos longos e recessos no meio do caminho
+    ano_inicial, ano_final = int(anos.min()), int(anos.max()) + 1 + int(dias.max()) // 200
+    for uf in set(ufs):
+        mascara = ufs == uf
+        cal = calendario(uf or None, ano_inicial, ano_final)
+        vencimentos[mascara] = np.busday_offset(inicios[mascara], dias[mascara], roll="forward", busdaycal=cal)
+    return vencimentos
+
+
+def _data(valor) -> Optional[date]:
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    try:
+        return date.fromisoformat(str(valor)[:10])
+    except (TypeError, ValueError):
+        try:
+            return datetime.strptime(str(valor)[:10], "%d/%m/%Y").date()
+        except (TypeError, ValueError):
+            return None
+
+
+def prazo_em_dias(comunicacao: dict) -> int:
+    if comunicacao.get("prazo_dias"):
+        return int(comunicacao["prazo_dias"])
+    tipo = (comunicacao.get("tipo") or "").lower()
+    return next((dias for chave, dias in PRAZO_PADRAO.items() if chave in tipo), PRAZO_PADRAO_DIAS)
+
+
+def chave_prazo(numero_processo: str, tipo: str, disponibilizacao: date) -> str:
+    return hashlib.sha256(f"{numero_processo}|{tipo}|{disponibilizacao.isoformat()}".encode()).hexdigest()
+
+
+def registrar_comunicacoes(
+    db: Session,
+    processo_id,
+    numero_processo: str,
+    comunicacoes: Iterable[dict],
+    uf: Optional[str] = None,
+    origem: Optional[str] = None
+) -> int:
+    """
+    Calcula e grava (upsert pela chave) os prazos das comunicações com data
+    de disponibilização. Commit fica com quem chama. Retorna quantos foram gravados.
+    """
+    linhas: List[Tuple[str, dict, date, int]] = []
+    for comunicacao in comunicacoes or []:
+        disponibilizacao = _data(comunicacao.get("data_disponibilizacao"))
+        if disponibilizacao is None:
+            continue
+        tipo = comunicacao.get("tipo") or ""
+        linhas.append((chave_prazo(numero_processo, tipo, disponibilizacao), comunicacao, disponibilizacao, prazo_em_dias(comunicacao)))
+    if not linhas:
+        return 0
+
+    vencimentos = calcular_vencimentos([l[2] for l in linhas], [l[3] for l in linhas], [uf] * len(linhas))
+    existentes = {p.id: p for p in db.query(PrazoComunicacao).filter(PrazoComunicacao.id.in_([l[0] for l in linhas]))}
+    for (chave, comunicacao, disponibilizacao, dias), vencimento in zip(linhas, vencimentos.tolist()):
+        prazo = existentes.get(chave)
+        if prazo is None:
+            prazo = PrazoComunicacao(id=chave, processo_id=processo_id, numero_processo=numero_processo, tipo=comunicacao.get("tipo"))
+            db.add(prazo)
+            existentes[chave] = prazo
+        prazo.origem = origem
+        prazo.status = comunicacao.get("status")
+        prazo.uf = uf
+        prazo.data_disponibilizacao = disponibilizacao
+        prazo.dias = dias
+        prazo.vencimento = vencimento
+        prazo.prazo_informado = _data(comunicacao.get("prazo_final"))
+    return len(linhas)
+
+
+def recalcular(db: Session, lote: int = 50000) -> int:
+    """Recalcula todos os vencimentos pendentes (ex: após nova suspensão em PRAZOS_SUSPENSOES)"""
+    calendario.cache_clear()
+    total = 0
+    ultimo = ""
+    while True:
+        linhas = db.query(PrazoComunicacao.id, PrazoComunicacao.data_disponibilizacao, PrazoComunicacao.dias, PrazoComunicacao.uf).filter(
+            PrazoComunicacao.cumprido_em.is_(None), PrazoComunicacao.id > ultimo
+        ).order_by(PrazoComunicacao.id).limit(lote).all()
+        if not linhas:
+            break
+        vencimentos = calcular_vencimentos([l.data_disponibilizacao for l in linhas], [l.dias for l in linhas], [l.uf for l in linhas])
+        db.bulk_update_mappings(PrazoComunicacao, [
+            {"id": l.id, "vencimento": v} for l, v in zip(linhas, vencimentos.tolist())
+        ])
+        db.commit()
+        total += len(linhas)
+        ultimo = linhas[-1].id
+    logger.info(f"{total} prazos recalculados")
+    return total
+
+
+def proximos(db: Session, dias: int, hoje: Optional[date] = None, cliente: Optional[str] = None):
+    """Prazos pendentes vencendo de hoje até hoje + `dias` (corridos)"""
+    hoje = hoje or datetime.now(timezone.utc).date()
+    query = db.query(PrazoComunicacao, Processo.pasta, Processo.cliente).outerjoin(
+        Processo, Processo.id == PrazoComunicacao.processo_id
+    ).filter(
+        PrazoComunicacao.cumprido_em.is_(None),
+        PrazoComunicacao.vencimento >= hoje,
+        PrazoComunicacao.vencimento <= hoje + timedelta(days=dias)
+    )
+    if cliente:
+        query = query.filter(Processo.cliente == cliente)
+    return query.order_by(PrazoComunicacao.vencimento)
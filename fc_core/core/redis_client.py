@@ -0,0 +1,19 @@
+"""Cliente Redis compartilhado (contadores de lotes, chaves de idempotência, circuit breakers, cache)."""
+from functools import lru_cache
+
+import redis
+import redis.asyncio
+
+from fc_core.core.config import get_settings
+
+
+@lru_cache()
+def get_redis() -> redis.Redis:
+    """Um pool de conexões por processo; seguro entre threads"""
+    return redis.Redis.from_url(get_settings().redis_url, decode_responses=True)
+
+
+@lru_cache()
+def get_redis_async() -> redis.asyncio.Redis:
+    """Cliente asyncio para as rotas async da API (um por processo, no loop do servidor)"""
+    return redis.asyncio.Redis.from_url(get_settings().redis_url, decode_responses=True)
@@ -0,0 +1,105 @@
+"""
+Registro de serviços pesados (OCR, NER, LLM, vector store) com inicialização sob demanda.
+
+Nada é instanciado na importação: cada serviço é criado no primeiro `get`,
+sob um lock próprio, e hooks de aquecimento rodam logo após a criação.
+Processos que nunca atendem OCR/IA não pagam o custo de carregar modelos.
+Use `PRELOAD_SERVICES=ocr,ner` para carregar no startup da API.
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceRegistry:
+    def __init__(self):
+        self._fabricas: Dict[str, Callable[[], Any]] = {}
+        self._aquecimentos: Dict[str, List[Callable[[Any], None]]] = {}
+        self._instancias: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+
+    def registrar(self, nome: str, fabrica: Callable[[], Any], aquecer: Optional[Callable[[Any], None]] = None):
+        self._fabricas[nome] = fabrica
+        self._locks[nome] = threading.Lock()
+        self._aquecimentos[nome] = [aquecer] if aquecer else []
+
+    def ao_carregar(self, nome: str, aquecer: Callable[[Any], None]):
+        """Adiciona um hook de aquecimento (ex: primeira inferência, conexão)"""
+        self._aquecimentos[nome].append(aquecer)
+
+    def get(self, nome: str) -> Any:
+        instancia = self._instancias.get(nome)
+        if instancia is not None:
+            return instancia
+
+        if nome not in self._fabricas:
+            raise KeyError(f"Serviço {nome} não registrado")
+
+        with self._locks[nome]:
+            if nome not in self._instancias:
+                inicio = time.perf_counter()
+                instancia = self._fabricas[nome]()
+                for aquecer in self._aquecimentos[nome]:
+                    aquecer(instancia)
+                self._instancias[nome] = instancia
+                logger.info(f"Serviço {nome} carregado em {time.perf_counter() - inicio:.2f}s")
+        return self._instancias[nome]
+
+    def carregado(self, nome: str) -> bool:
+        return nome in self._instancias
+
+    def preload(self, nomes: Iterable[str]):
+        for nome in nomes:
+            nome = nome.strip()
+            if nome:
+                self.get(nome)
+
+    def status(self) -> Dict[str, bool]:
+        return {nome: self.carregado(nome) for nome in self._fabricas}
+
+
+def _ocr():
+    from fc_core.ingestion.ocr.ocr_service import OCRService
+    return OCRService()
+
+
+def _ner():
+    from fc_core.ingestion.ocr.ner_service import NERService
+    return NERService()
+
+
+def _llm():
+    from fc_core.analysis.llm_service import OllamaService
+    return OllamaService()
+
+
+def _vector_store():
+    from fc_core.core.config import get_settings
+    settings = get_settings()
+    if settings.vector_backend == "local":
+        from fc_core.analysis.indice_local import IndiceVetorialLocal
+        return IndiceVetorialLocal(settings.vector_index_dir, embed=servicos.get("embedder").embed)
+    from fc_core.analysis.vector_store import VectorStore
+    return VectorStore()
+
+
+def _analisador():
+    from fc_core.analysis.analise_llm import AnalisadorLLM
+    return AnalisadorLLM()
+
+
+def _embedder():
+    from fc_core.analysis.ollama_http import OllamaHTTP
+    return OllamaHTTP()
+
+
+servicos = ServiceRegistry()
+servicos.registrar("ocr", _ocr)
+servicos.registrar("ner", _ner)
+servicos.registrar("llm", _llm)
+servicos.registrar("vector_store", _vector_store)
+servicos.registrar("embedder", _embedder)
+servicos.registrar("analisador", _analisador)
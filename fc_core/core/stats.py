@@ -0,0 +1,235 @@
+"""
+Estatísticas materializadas de processos.
+
+Os contadores do dashboard ficam na tabela ``processo_stats`` e são
+atualizados na mesma transação que insere, altera ou exclui (soft delete)
+um ``Processo``. A leitura custa uma única consulta sobre a tabela de
+resumo, independente do tamanho da tabela de processos.
+
+A linha ``versao`` serializa escritas e reconciliação: todo delta a atualiza
+primeiro (e a segura até o commit), e ``reconciliar`` a trava com SELECT ...
+FOR UPDATE antes de contar. Ela só é criada por ``reconciliar``: sem ela os
+contadores vieram de deltas sobre um banco já populado e não valem, então a
+API roda ``inicializar`` no startup e recalcula tudo; ``reconciliar_stats_task``
+faz o mesmo sob demanda e periodicamente.
+"""
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+from sqlalchemy import event, select, update, insert, delete, func, inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from fc_core.core.models import Processo, ProcessoStats
+
+logger = logging.getLogger(__name__)
+
+TOTAL = "total"
+VERSAO = "versao"  # Incrementado a cada alteração; serve de watermark dos dados
+
+# dimensão -> atributo de Processo
+DIMENSOES = {
+    "situacao": "situacao",
+    "risco": "risco_atual",
+    "cliente": "cliente",
+    "categoria": "categoria",
+    "polo": "polo",
+}
+
+CAMPOS = tuple(DIMENSOES.values()) + ("valor_causa", "deleted_at")
+
+Delta = Dict[Tuple[str, str], list]
+
+
+def _to_decimal(valor: Any) -> Decimal:
+    if valor is None:
+        return Decimal(0)
+    try:
+        return Decimal(str(valor))
+    except (InvalidOperation, ValueError):
+        return Decimal(0)
+
+
+def _chave(valor: Any) -> str:
+    return "" if valor is None else str(valor)[:255]
+
+
+def _contribuir(delta: Delta, valores: Dict[str, Any], sinal: int):
+    """Soma (sinal=1) ou subtrai (sinal=-1) a contribuição de um processo"""
+    if valores.get("deleted_at") is not None:
+        return
+    valor = _to_decimal(valores.get("valor_causa")) * sinal
+    for dimensao, chave in [(TOTAL, "")] + [
+        (dim, _chave(valores.get(attr))) for dim, attr in DIMENSOES.items()
+    ]:
+        delta[(dimensao, chave)][0] += sinal
+        delta[(dimensao, chave)][1] += valor
+
+
+def _valores_atuais(obj: Processo) -> Dict[str, Any]:
+    return {campo: getattr(obj, campo) for campo in CAMPOS}
+
+
+def _valores_no_banco(session: Session, processo_id) -> Dict[str, Any]:
+    """Lê o estado persistido (pré-flush) de um processo"""
+    colunas = [getattr(Processo, campo) for campo in CAMPOS]
+    row = session.connection().execute(
+        select(*colunas).where(Processo.id == processo_id)
+    ).first()
+    return dict(zip(CAMPOS, row)) if row else {"deleted_at": True}
+
+
+def _alterou(obj: Processo) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[campo].history.has_changes() for campo in CAMPOS)
+
+
+def _aplicar(session: Session, delta: Delta):
+    conn = session.connection()
+    # versao primeiro: mesma ordem de travas que reconciliar (sem deadlock)
+    for (dimensao, chave), (quantidade, valor) in sorted(delta.items(), key=lambda item: item[0][0] != VERSAO):
+        if quantidade == 0 and valor == 0 and dimensao != VERSAO:
+            continue
+        filtro = (ProcessoStats.dimensao == dimensao) & (ProcessoStats.chave == chave)
+        stmt = update(ProcessoStats).where(filtro).values(
+            quantidade=ProcessoStats.quantidade + quantidade,
+            valor_total=ProcessoStats.valor_total + valor,
+        )
+        if conn.execute(stmt).rowcount or dimensao == VERSAO:  # versao só nasce em reconciliar
+            continue
+        try:
+            # Savepoint: outra transação pode criar a mesma chave em paralelo
+            with conn.begin_nested():
+                conn.execute(insert(ProcessoStats).values(
+                    dimensao=dimensao, chave=chave, quantidade=quantidade, valor_total=valor
+                ))
+        except IntegrityError:
+            conn.execute(stmt)
+
+
+@event.listens_for(Session, "before_flush")
+def _atualizar_stats(session: Session, flush_context, instances):
+    delta: Delta = defaultdict(lambda: [0, Decimal(0)])
+    alterados = 0
+
+    for obj in session.new:
+        if isinstance(obj, Processo):
+            _contribuir(delta, _valores_atuais(obj), 1)
+            alterados += 1
+
+    for obj in session.dirty:
+        if isinstance(obj, Processo) and _alterou(obj):
+            _contribuir(delta, _valores_no_banco(session, obj.id), -1)
+            _contribuir(delta, _valores_atuais(obj), 1)
+            alterados += 1
+
+    for obj in session.deleted:
+        if isinstance(obj, Processo):
+            _contribuir(delta, _valores_no_banco(session, obj.id), -1)
+            alterados += 1
+
+    if not alterados:
+        return
+
+    delta[(VERSAO, "")][0] += 1
+    _aplicar(session, delta)
+
+
+def ler_resumo(db: Session) -> Dict[str, Any]:
+    """Resumo do dashboard lido da tabela materializada"""
+    resumo: Dict[str, Any] = {
+        "total": 0,
+        "valor_total": 0.0,
+        "versao": 0,
+        **{f"por_{dim}": {} for dim in DIMENSOES},
+        **{f"valor_por_{dim}": {} for dim in DIMENSOES},
+    }
+    for row in db.execute(select(ProcessoStats)).scalars():
+        if row.dimensao == TOTAL:
+            resumo["total"] = row.quantidade
+            resumo["valor_total"] = float(row.valor_total or 0)
+        elif row.dimensao == VERSAO:
+            resumo["versao"] = row.quantidade
+        elif row.dimensao in DIMENSOES and row.quantidade:
+            chave = row.chave or None
+            resumo[f"por_{row.dimensao}"][chave] = row.quantidade
+            resumo[f"valor_por_{row.dimensao}"][chave] = float(row.valor_total or 0)
+    return resumo
+
+
+def ler_versao(db: Session) -> int:
+    """Watermark dos dados de processos (muda a cada escrita)"""
+    versao = db.execute(
+        select(ProcessoStats.quantidade).where(
+            ProcessoStats.dimensao == VERSAO, ProcessoStats.chave == ""
+        )
+    ).scalar()
+    return versao or 0
+
+
+def _travar_versao(db: Session) -> int:
+    """Cria a linha versao se faltar e a trava até o commit; retorna o valor atual"""
+    filtro = (ProcessoStats.dimensao == VERSAO) & (ProcessoStats.chave == "")
+    versao = db.execute(select(ProcessoStats.quantidade).where(filtro).with_for_update()).scalar()
+    if versao is not None:
+        return versao
+    try:
+        with db.begin_nested():
+            db.execute(insert(ProcessoStats).values(dimensao=VERSAO, chave="", quantidade=0, valor_total=0))
+    except IntegrityError:
+        pass  # Outra reconciliação criou; o FOR UPDATE abaixo espera por ela
+    return db.execute(select(ProcessoStats.quantidade).where(filtro).with_for_update()).scalar()
+
+
+def reconciliar(db: Session) -> Dict[str, Any]:
+    """
+    Recalcula todos os contadores a partir da tabela de processos.
+    Corrige desvios (ex: alterações feitas fora do ORM). Tudo numa transação
+    com a linha versao travada: escritas concorrentes esperam o fim, e duas
+    reconciliações não gravam a mesma versão.
+    """
+    versao = _travar_versao(db) + 1
+    ativos = Processo.deleted_at.is_(None)
+    valor = func.coalesce(func.sum(Processo.valor_causa), 0)
+
+    linhas = []
+    total, soma = db.query(func.count(Processo.id), valor).filter(ativos).one()
+    linhas.append({"dimensao": TOTAL, "chave": "", "quantidade": total, "valor_total": soma})
+
+    for dimensao, attr in DIMENSOES.items():
+        coluna = getattr(Processo, attr)
+        for chave, quantidade, soma in db.query(
+            coluna, func.count(Processo.id), valor
+        ).filter(ativos).group_by(coluna).all():
+            linhas.append({
+                "dimensao": dimensao, "chave": _chave(chave),
+                "quantidade": quantidade, "valor_total": soma,
+            })
+
+    # Agrega chaves que colidem após normalização (ex: truncamento)
+    agregadas: Dict[Tuple[str, str], dict] = {}
+    for linha in linhas:
+        k = (linha["dimensao"], linha["chave"])
+        if k in agregadas:
+            agregadas[k]["quantidade"] += linha["quantidade"]
+            agregadas[k]["valor_total"] += linha["valor_total"]
+        else:
+            agregadas[k] = linha
+
+    db.execute(delete(ProcessoStats).where(ProcessoStats.dimensao != VERSAO))
+    db.execute(insert(ProcessoStats), list(agregadas.values()))
+    db.execute(update(ProcessoStats).where(ProcessoStats.dimensao == VERSAO).values(quantidade=versao))
+    db.commit()
+    logger.info(f"Stats reconciliadas: {total} processos, {len(agregadas)} chaves")
+    return {"total": total, "chaves": len(agregadas), "versao": versao}
+
+
+def inicializar(db: Session) -> Optional[Dict[str, Any]]:
+    """Reconcilia se a linha versao não existe (nunca reconciliado); senão não faz nada"""
+    existe = db.execute(
+        select(ProcessoStats.dimensao).where(ProcessoStats.dimensao == VERSAO, ProcessoStats.chave == "")
+    ).first()
+    db.rollback()  # Não segura a transação de leitura
+    return None if existe else reconciliar(db)
@@ -0,0 +1,125 @@
+"""
+Armazenamento de arquivos endereçado por conteúdo.
+
+Uploads são lidos em blocos, com o hash calculado durante a escrita num
+arquivo temporário, e depois movidos atomicamente para
+``<storage_dir>/sha256/aa/bb/<hash>``. Cada conteúdo é gravado uma única vez;
+a tabela ``blobs`` mantém o número de Documentos que o referenciam.
+
+A linha de ``blobs`` serializa upload e exclusão do mesmo conteúdo: o upload
+pega a referência (UPDATE/INSERT da linha) antes de promover o arquivo, e a
+exclusão só apaga o arquivo depois de reler o refcount com a linha travada
+(SELECT ... FOR UPDATE). Quem promove sempre substitui o destino, então um
+upload que chega depois de uma exclusão regrava o arquivo.
+"""
+from pathlib import Path
+from typing import Tuple
+import hashlib
+import logging
+import os
+import uuid
+
+import aiofiles
+from fastapi import UploadFile
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from fc_core.core.config import get_settings
+from fc_core.core.models import Blob
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+STORAGE_DIR = Path(settings.storage_dir)
+TMP_DIR = STORAGE_DIR / "tmp"
+TMP_DIR.mkdir(parents=True, exist_ok=True)
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def caminho_blob(sha256_hash: str) -> Path:
+    return STORAGE_DIR / "sha256" / sha256_hash[:2] / sha256_hash[2:4] / sha256_hash
+
+
+async def receber_upload(file: UploadFile, chunk_size: int = CHUNK_SIZE) -> Tuple[Path, str, int]:
+    """Grava o upload em arquivo temporário calculando o sha256 bloco a bloco"""
+    temporario = TMP_DIR / f"{uuid.uuid4().hex}.part"
+    sha = hashlib.sha256()
+    tamanho = 0
+    try:
+        async with aiofiles.open(temporario, "wb") as f:
+            while True:
+                bloco = await file.read(chunk_size)
+                if not bloco:
+                    break
+                sha.update(bloco)
+                tamanho += len(bloco)
+                await f.write(bloco)
+    except BaseException:
+        temporario.unlink(missing_ok=True)
+        raise
+    return temporario, sha.hexdigest(), tamanho
+
+
+def promover(temporario: Path, sha256_hash: str) -> Path:
+    """
+    Move o temporário para o endereço definitivo, substituindo o que houver
+    (mesmo conteúdo). Chamar depois de adicionar_referencia.
+    """
+    destino = caminho_blob(sha256_hash)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(temporario, destino)
+    return destino
+
+
+def adicionar_referencia(db: Session, sha256_hash: str, tamanho: int, caminho: Path):
+    """Incrementa o refcount do blob (cria o registro na primeira referência)"""
+    stmt = update(Blob).where(Blob.sha256_hash == sha256_hash).values(refcount=Blob.refcount + 1)
+    if db.execute(stmt).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.execute(insert(Blob).values(
+                sha256_hash=sha256_hash,
+                storage_backend="filesystem",
+                storage_path=str(caminho),
+                tamanho_bytes=tamanho,
+                refcount=1
+            ))
+    except IntegrityError:
+        db.execute(stmt)
+
+
+def remover_referencia(db: Session, sha256_hash: str) -> bool:
+    """
+    Decrementa o refcount. Retorna True quando chegou a zero: depois do
+    commit, chamar apagar_se_orfao (que confere de novo, com a linha travada).
+    """
+    db.execute(
+        update(Blob).where(Blob.sha256_hash == sha256_hash, Blob.refcount > 0)
+        .values(refcount=Blob.refcount - 1)
+    )
+    return (db.scalar(select(Blob.refcount).where(Blob.sha256_hash == sha256_hash)) or 0) <= 0
+
+
+def apagar_se_orfao(db: Session, sha256_hash: str) -> bool:
+    """
+    Remove registro e arquivo de um blob sem referências. O refcount é relido
+    sob FOR UPDATE: um upload concorrente ou já pegou a referência (e o blob
+    fica) ou espera este commit e regrava o arquivo ao promover.
+    """
+    refcount = db.scalar(select(Blob.refcount).where(Blob.sha256_hash == sha256_hash).with_for_update())
+    if refcount is None or refcount > 0:
+        db.rollback()
+        return False
+    db.execute(delete(Blob).where(Blob.sha256_hash == sha256_hash))
+    apagar_blob(sha256_hash)
+    db.commit()
+    return True
+
+
+def apagar_blob(sha256_hash: str):
+    caminho = caminho_blob(sha256_hash)
+    caminho.unlink(missing_ok=True)
+    logger.info(f"Blob {sha256_hash} removido do storage")
@@ -0,0 +1,146 @@
+"""
+Cache de relatórios endereçado por conteúdo.
+
+Cada artefato é identificado por sha256(formato + filtros + versão dos dados),
+onde a versão vem do contador materializado em fc_core.core.stats. Pedidos
+idênticos sobre os mesmos dados reutilizam o mesmo arquivo; qualquer escrita
+em processos muda a versão e invalida o cache naturalmente.
+"""
+from pathlib import Path
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import uuid
+
+from sqlalchemy.orm import Session
+
+from fc_core.core.config import get_settings
+from fc_core.core.stats import ler_versao
+from fc_core.reporting.consultas import iterar_processos, FILTROS_RELATORIO
+from fc_core.reporting.excel_exporter import gerar_relatorio_excel_stream
+from fc_core.reporting.pdf_exporter import gerar_relatorio_processos_stream
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+REPORTS_DIR = Path(settings.reports_dir)
+REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+
+FORMATOS = {
+    "pdf": (".pdf", "application/pdf"),
+    "excel": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+NOME_ARTEFATO = re.compile(r"^[0-9a-f]{64}\.(pdf|xlsx)$")
+
+
+def normalizar_filtros(filtros: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    return {k: v for k, v in sorted((filtros or {}).items()) if v is not None and k in FILTROS_RELATORIO}
+
+
+def chave_relatorio(formato: str, filtros: Optional[Dict[str, Any]], versao: int) -> str:
+    payload = json.dumps(
+        {"formato": formato, "filtros": normalizar_filtros(filtros), "versao": versao},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def caminho_artefato(chave: str, formato: str) -> Path:
+    extensao, _ = FORMATOS[formato]
+    return REPORTS_DIR / f"{chave}{extensao}"
+
+
+def localizar(nome: str) -> Optional[Path]:
+    """Resolve um nome de artefato vindo da API (sem permitir path traversal)"""
+    if not NOME_ARTEFATO.match(nome):
+        return None
+    caminho = REPORTS_DIR / nome
+    return caminho if caminho.exists() else None
+
+
+def _usar(caminho: Path) -> bool:
+    """True se o artefato existe; marca uso recente para a política de retenção"""
+    try:
+        os.utime(caminho)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def artefato_em_cache(db: Session, formato: str, filtros: Optional[Dict[str, Any]] = None) -> Optional[Path]:
+    caminho = caminho_artefato(chave_relatorio(formato, filtros, ler_versao(db)), formato)
+    return caminho if _usar(caminho) else None
+
+
+def gerar_artefato(db: Session, formato: str, filtros: Optional[Dict[str, Any]] = None) -> Path:
+    """Retorna o artefato do cache ou gera um novo (escrita atômica)"""
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato {formato} não suportado")
+
+    filtros = normalizar_filtros(filtros)
+    chave = chave_relatorio(formato, filtros, ler_versao(db))
+    destino = caminho_artefato(chave, formato)
+
+    if _usar(destino):
+        logger.info(f"Relatório {destino.name} servido do cache")
+        return destino
+
+    temporario = REPORTS_DIR / f".{uuid.uuid4().hex}{destino.suffix}.tmp"
+    try:
+        linhas = iterar_processos(db, filtros)
+        if formato == "pdf":
+            gerar_relatorio_processos_stream(linhas, str(temporario), workers=settings.report_pdf_workers)
+        else:
+            gerar_relatorio_excel_stream(linhas, str(temporario))
+        os.replace(temporario, destino)
+    finally:
+        if temporario.exists():
+            temporario.unlink()
+
+    logger.info(f"Relatório {destino.name} gerado")
+    return destino
+
+
+def limpar_cache(
+    retencao_horas: Optional[int] = None,
+    limite_mb: Optional[int] = None
+) -> Dict[str, int]:
+    """Remove artefatos expirados e, se preciso, os menos usados até caber no limite"""
+    if retencao_horas is None:
+        retencao_horas = settings.report_retention_hours
+    if limite_mb is None:
+        limite_mb = settings.report_cache_max_mb
+    retencao = retencao_horas * 3600
+    limite = limite_mb * 1024 * 1024
+    agora = time.time()
+
+    removidos = 0
+    arquivos = []
+    for caminho in REPORTS_DIR.iterdir():
+        if not caminho.is_file():
+            continue
+        stat = caminho.stat()
+        # Temporários órfãos (worker morto no meio da geração) ficam no máximo 1h
+        expirado = agora - stat.st_mtime > (3600 if caminho.name.startswith(".") else retencao)
+        if expirado:
+            caminho.unlink(missing_ok=True)
+            removidos += 1
+        elif not caminho.name.startswith("."):
+            arquivos.append((stat.st_mtime, stat.st_size, caminho))
+
+    total = sum(tamanho for _, tamanho, _ in arquivos)
+    for _, tamanho, caminho in sorted(arquivos):
+        if total <= limite:
+            break
+        caminho.unlink(missing_ok=True)
+        total -= tamanho
+        removidos += 1
+
+    if removidos:
+        logger.info(f"Cache de relatórios: {removidos} arquivos removidos, {total // 1024} KB em uso")
+    return {"removidos": removidos, "bytes_em_uso": total}
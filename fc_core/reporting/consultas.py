@@ -0,0 +1,45 @@
+from typing import Iterator, Optional, Dict, Any
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from fc_core.core.models import Processo
+
+# Colunas exportadas nos relatórios (ordem das planilhas/tabelas)
+COLUNAS_RELATORIO = [
+    ("Pasta", Processo.pasta),
+    ("#Cliente", Processo.cliente),
+    ("Número Principal", Processo.numero_principal),
+    ("Situação", Processo.situacao),
+    ("Natureza", Processo.natureza),
+    ("#Categoria", Processo.categoria),
+    ("Polo", Processo.polo),
+    ("#Risco", Processo.risco_atual),
+    ("Valor da Causa", Processo.valor_causa),
+    ("Criado em", Processo.created_at),
+]
+
+FILTROS_RELATORIO = {
+    "situacao": Processo.situacao,
+    "natureza": Processo.natureza,
+    "risco": Processo.risco_atual,
+    "cliente": Processo.cliente,
+    "categoria": Processo.categoria,
+}
+
+
+def consulta_relatorio(filtros: Optional[Dict[str, Any]] = None):
+    """SELECT das colunas do relatório (sem materializar objetos ORM)"""
+    stmt = select(*[col for _, col in COLUNAS_RELATORIO]).where(Processo.deleted_at.is_(None))
+    for nome, valor in (filtros or {}).items():
+        if valor is not None and nome in FILTROS_RELATORIO:
+            stmt = stmt.where(FILTROS_RELATORIO[nome] == valor)
+    return stmt.order_by(Processo.pasta)
+
+
+def iterar_processos(db: Session, filtros: Optional[Dict[str, Any]] = None, chunk_size: int = 1000) -> Iterator[tuple]:
+    """
+    Itera as linhas do relatório com cursor do lado do servidor.
+    Mantém no máximo `chunk_size` linhas em memória.
+    """
+    stmt = consulta_relatorio(filtros).execution_options(stream_results=True, yield_per=chunk_size)
+    for row in db.execute(stmt):
+        yield tuple(row)
@@ -1,46 +1,61 @@
-import pandas as pd
-from openpyxl.styles import Font, PatternFill, Alignment
-from datetime import datetime
+import xlsxwriter
+from datetime import datetime, date
+from decimal import Decimal
+from typing import Iterable
+from fc_core.reporting.consultas import COLUNAS_RELATORIO
+
+LARGURA_MAXIMA = 50
+COL_VALOR = [nome for nome, _ in COLUNAS_RELATORIO].index("Valor da Causa")
+
+def _processo_para_linha(p):
+    return (
+        p.pasta, p.cliente, p.numero_principal, p.situacao, p.natureza,
+        p.categoria, p.polo, p.risco_atual, p.valor_causa, p.created_at
+    )
 
 def gerar_relatorio_excel(processos, output_path):
-    data = []
-    for p in processos:
-        data.append({
-            "Pasta": p.pasta,
-            "#Cliente": p.cliente,
-            "Número Principal": p.numero_principal,
-            "Situação": p.situacao,
-            "Natureza": p.natureza,
-            "#Categoria": p.categoria,
-            "Polo": p.polo,
-            "#Risco": p.risco_atual,
-            "Valor da Causa": float(p.valor_causa) if p.valor_causa else 0.0,
-            "Criado em": p.created_at
+    """Compatibilidade: aceita objetos Processo já carregados"""
+    return gerar_relatorio_excel_stream((_processo_para_linha(p) for p in processos), output_path)
+
+def gerar_relatorio_excel_stream(linhas: Iterable[tuple], output_path):
+    """
+    Escreve o relatório linha a linha em modo constant_memory do xlsxwriter.
+    As larguras das colunas são calculadas durante a escrita, sem reler células.
+    """
+    cabecalho = [nome for nome, _ in COLUNAS_RELATORIO]
+
+    workbook = xlsxwriter.Workbook(output_path, {"constant_memory": True, "remove_timezone": True})
+    try:
+        worksheet = workbook.add_worksheet("Processos")
+        fmt_header = workbook.add_format({
+            "bold": True, "font_color": "#FFFFFF", "bg_color": "#4472C4", "align": "center"
         })
-    
-    df = pd.DataFrame(data)
-    
-    with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='Processos', index=False)
-        
-        workbook = writer.book
-        worksheet = writer.sheets['Processos']
-        
-        for cell in worksheet[1]:
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-            cell.alignment = Alignment(horizontal="center")
-        
-        for column in worksheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            worksheet.column_dimensions[column_letter].width = adjusted_width
-    
+        fmt_data = workbook.add_format({"num_format": "dd/mm/yyyy hh:mm"})
+        fmt_valor = workbook.add_format({"num_format": "#,##0.00"})
+
+        larguras = [len(nome) for nome in cabecalho]
+        worksheet.write_row(0, 0, cabecalho, fmt_header)
+
+        for row_idx, linha in enumerate(linhas, start=1):
+            for col, valor in enumerate(linha):
+                if isinstance(valor, (datetime, date)):
+                    worksheet.write_datetime(row_idx, col, valor, fmt_data)
+                    tamanho = 16
+                elif isinstance(valor, Decimal) or col == COL_VALOR:
+                    valor = float(valor) if valor is not None else 0.0
+                    worksheet.write_number(row_idx, col, valor, fmt_valor)
+                    tamanho = len(f"{valor:,.2f}")
+                elif valor is None:
+                    continue
+                else:
+                    worksheet.write(row_idx, col, valor)
+                    tamanho = len(str(valor))
+                if tamanho > larguras[col]:
+                    larguras[col] = tamanho
+
+        for col, largura in enumerate(larguras):
+            worksheet.set_column(col, col, min(largura + 2, LARGURA_MAXIMA))
+    finally:
+        workbook.close()
+
     return output_path
@@ -1,44 +1,208 @@
 from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.units import cm
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Table, TableStyle
 from reportlab.lib import colors
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from itertools import chain, islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+import logging
+import shutil
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+CABECALHO = ["Pasta", "Número", "Situação", "Risco", "Valor"]
+PAGINAS_POR_PARTE = 50  # Páginas renderizadas por processo no modo paralelo
+
+# Layout da página (A4)
+MARGEM_TOPO = 2 * cm
+ALTURA_TITULO = 0.8 * cm  # Só na primeira página
+ESPACO_TABELA = 0.5 * cm  # Entre "Gerado em" e a tabela
+RODAPE = 1 * cm  # Linha de base do número da página
+FONTE_RODAPE = 9
+MARGEM_RODAPE = 0.3 * cm  # Folga entre a tabela e o rodapé
+AMOSTRA = ["0000.0.00000", "0000000-00.0000.0.00.0000", "-", "-", "R$ 0.00"]
+
+ESTILO_TABELA = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
+])
+
+def _formatar(pasta, numero, situacao, risco, valor) -> list:
+    return [
+        pasta,
+        numero or "-",
+        situacao or "-",
+        risco or "-",
+        f"R$ {valor:,.2f}" if valor else "-"
+    ]
+
+def _linha_relatorio(linha: tuple) -> list:
+    """Converte uma linha de fc_core.reporting.consultas para as colunas do PDF"""
+    return _formatar(linha[0], linha[2], linha[3], linha[7], linha[8])
+
+def _blocos(linhas: Iterable, tamanho: int) -> Iterator[list]:
+    it = iter(linhas)
+    while True:
+        bloco = list(islice(it, tamanho))
+        if not bloco:
+            return
+        yield bloco
+
+def _topo(numero_pagina: int) -> float:
+    """Linha de "Gerado em"; a primeira página desce o título"""
+    return A4[1] - MARGEM_TOPO - (ALTURA_TITULO if numero_pagina == 1 else 0)
+
+@lru_cache(maxsize=None)
+def capacidade() -> Tuple[int, int]:
+    """
+    (linhas na primeira página, linhas nas demais): o que cabe entre o topo da
+    tabela e o rodapé, com as alturas de linha medidas pelo próprio Table.
+    """
+    table = Table([CABECALHO, AMOSTRA], repeatRows=1)
+    table.setStyle(ESTILO_TABELA)
+    table.wrap(A4[0], A4[1])
+    cabecalho, linha = table._rowHeights
+    limite = RODAPE + FONTE_RODAPE + MARGEM_RODAPE
+    return tuple(
+        max(1, int((_topo(pagina) - ESPACO_TABELA - limite - cabecalho) // linha))
+        for pagina in (1, 2)
+    )
+
+def _paginas(linhas: Iterable[list], pagina_inicial: int, linhas_por_pagina: Optional[int] = None) -> Iterator[list]:
+    """Blocos de linhas por página a partir de `pagina_inicial`"""
+    primeira, demais = capacidade()
+    if linhas_por_pagina:
+        primeira, demais = min(primeira, linhas_por_pagina), min(demais, linhas_por_pagina)
+    it = iter(linhas)
+    if pagina_inicial == 1:
+        bloco = list(islice(it, primeira))
+        if not bloco:
+            return
+        yield bloco
+    yield from _blocos(it, demais)
+
+def _desenhar_pagina(c: canvas.Canvas, linhas: List[list], numero_pagina: int, gerado_em: str) -> float:
+    """Desenha a página e retorna a base da tabela"""
+    largura, altura = A4
+    topo = _topo(numero_pagina)
+    if numero_pagina == 1:
+        c.setFont("Helvetica-Bold", 16)
+        c.drawCentredString(largura / 2, topo + ALTURA_TITULO, "Relatório de Processos")
+    c.setFont("Helvetica", FONTE_RODAPE)
+    c.drawString(2 * cm, topo, f"Gerado em: {gerado_em}")
+    c.drawRightString(largura - 2 * cm, RODAPE, f"Página {numero_pagina}")
+
+    # Cada página tem sua própria tabela (cabeçalho repetido), layout de tamanho fixo
+    table = Table([CABECALHO] + linhas, repeatRows=1)
+    table.setStyle(ESTILO_TABELA)
+    _, h = table.wrapOn(c, largura - 4 * cm, topo - 2 * cm)
+    base = topo - ESPACO_TABELA - h
+    table.drawOn(c, (largura - table._width) / 2, base)
+    c.showPage()
+    return base
+
+def _renderizar(paginas: Iterable[List[list]], output_path: str, pagina_inicial: int, gerado_em: str) -> int:
+    c = canvas.Canvas(str(output_path), pagesize=A4, pageCompression=1)
+    c.setTitle("Relatório de Processos")
+    numero = pagina_inicial
+    for linhas in paginas:
+        _desenhar_pagina(c, linhas, numero, gerado_em)
+        numero += 1
+    if numero == pagina_inicial:
+        _desenhar_pagina(c, [], numero, gerado_em)
+        numero += 1
+    c.save()
+    return numero - pagina_inicial
+
+def _renderizar_parte(linhas: List[list], output_path: str, pagina_inicial: int, gerado_em: str, linhas_por_pagina: Optional[int]) -> str:
+    """Executado em processo separado no modo paralelo"""
+    _renderizar(_paginas(linhas, pagina_inicial, linhas_por_pagina), output_path, pagina_inicial, gerado_em)
+    return output_path
+
+def _concatenar(partes: List[str], output_path: str):
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for parte in partes:
+        writer.append(parte)
+    with open(output_path, "wb") as f:
+        writer.write(f)
 
 def gerar_relatorio_processos(processos, output_path):
-    doc = SimpleDocTemplate(output_path, pagesize=A4)
-    styles = getSampleStyleSheet()
-    story = []
-    
-    title = Paragraph("Relatório de Processos", styles['Title'])
-    story.append(title)
-    story.append(Spacer(1, 12))
-    
-    subtitle = Paragraph(f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M')}", styles['Normal'])
-    story.append(subtitle)
-    story.append(Spacer(1, 24))
-    
-    data = [["Pasta", "Número", "Situação", "Risco", "Valor"]]
-    
-    for p in processos:
-        data.append([
-            p.pasta,
-            p.numero_principal or "-",
-            p.situacao or "-",
-            p.risco_atual or "-",
-            f"R$ {p.valor_causa:,.2f}" if p.valor_causa else "-"
-        ])
-    
-    table = Table(data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    story.append(table)
-    doc.build(story)
+    """Compatibilidade: aceita objetos Processo já carregados"""
+    linhas = (
+        _formatar(p.pasta, p.numero_principal, p.situacao, p.risco_atual, p.valor_causa)
+        for p in processos
+    )
+    return _gerar(linhas, output_path)
+
+def gerar_relatorio_processos_stream(
+    linhas: Iterable[tuple],
+    output_path,
+    linhas_por_pagina: Optional[int] = None,
+    workers: Optional[int] = None
+):
+    """
+    Gera o relatório a partir de linhas de `iterar_processos`, uma página por vez.
+    Sem `linhas_por_pagina`, cada página leva o que cabe acima do rodapé (capacidade()).
+    Com `workers` > 1, faixas de páginas são renderizadas em paralelo e concatenadas.
+    """
+    formatadas = (_linha_relatorio(linha) for linha in linhas)
+    return _gerar(formatadas, output_path, linhas_por_pagina, workers)
+
+def _gerar(linhas: Iterable[list], output_path, linhas_por_pagina: Optional[int] = None, workers: Optional[int] = None):
+    gerado_em = datetime.now().strftime('%d/%m/%Y %H:%M')
+
+    if workers and workers > 1:
+        try:
+            import pypdf  # noqa: F401
+        except ImportError:
+            logger.warning("pypdf não instalado; gerando PDF em modo serial")
+            workers = None
+
+    if not workers or workers <= 1:
+        _renderizar(_paginas(linhas, 1, linhas_por_pagina), output_path, 1, gerado_em)
+        return output_path
+
+    # Partes começam em limite de página; a primeira inclui a página 1 (mais curta)
+    primeira, demais = (min(n, linhas_por_pagina or n) for n in capacidade())
+    parte_inicial = primeira + demais * (PAGINAS_POR_PARTE - 1)
+    linhas = iter(linhas)
+    blocos = chain(_blocos(islice(linhas, parte_inicial), parte_inicial), _blocos(linhas, demais * PAGINAS_POR_PARTE))
+    tmpdir = Path(tempfile.mkdtemp(prefix="relatorio_pdf_"))
+    try:
+        partes, pendentes = [], []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pagina = 1
+            for i, bloco in enumerate(blocos):
+                # Limita blocos em memória aguardando a parte mais antiga
+                if len(pendentes) >= workers * 2:
+                    pendentes.pop(0).result()
+                caminho = str(tmpdir / f"parte_{i:05d}.pdf")
+                pendentes.append(pool.submit(
+                    _renderizar_parte, bloco, caminho, pagina, gerado_em, linhas_por_pagina
+                ))
+                partes.append(caminho)
+                restantes = len(bloco) - (primeira if pagina == 1 else 0)
+                pagina += (pagina == 1) + -(-restantes // demais)
+            for futuro in pendentes:
+                futuro.result()
+
+        if not partes:
+            _renderizar([], output_path, 1, gerado_em)
+        else:
+            _concatenar(partes, str(output_path))
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
     return output_path
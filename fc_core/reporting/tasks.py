@@ -0,0 +1,22 @@
+from typing import Optional, Dict, Any
+from fc_core.core.celery_app import celery_app
+from fc_core.core.database import SessionLocal
+from fc_core.reporting.artefatos import gerar_artefato, limpar_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+@celery_app.task
+def gerar_relatorio_task(formato: str, filtros: Optional[Dict[str, Any]] = None):
+    """Gera (ou reaproveita do cache) um relatório PDF/Excel"""
+    db = SessionLocal()
+    try:
+        caminho = gerar_artefato(db, formato, filtros)
+        return {"formato": formato, "arquivo": caminho.name}
+    finally:
+        db.close()
+
+@celery_app.task
+def limpar_relatorios_task():
+    """Aplica a política de retenção do diretório de relatórios"""
+    return limpar_cache()
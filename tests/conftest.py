@@ -0,0 +1,49 @@
+import os
+
+# Valores padrão para rodar a suíte sem .env (o CI define os mesmos)
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("SECRET_KEY", "test_secret_key")
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+
+@pytest.fixture
+def db():
+    """Sessão isolada em SQLite em memória com o schema completo"""
+    from fc_core.core.database import Base
+    import fc_core.core.models  # noqa: F401
+
+    engine = create_engine("sqlite://")
+    # Chaves estrangeiras valendo, como no MySQL (InnoDB)
+    event.listen(engine, "connect", lambda conn, _: conn.execute("PRAGMA foreign_keys=ON"))
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def redis_fake(monkeypatch):
+    """get_redis()/get_redis_async() apontando para um fakeredis isolado"""
+    fakeredis = pytest.importorskip("fakeredis")
+    import fakeredis.aioredis
+    import redis
+    import redis.asyncio
+    from fc_core.core import redis_client
+
+    servidor = fakeredis.FakeServer()
+    monkeypatch.setattr(redis.Redis, "from_url", classmethod(
+        lambda cls, *a, **kw: fakeredis.FakeRedis(server=servidor, decode_responses=True)))
+    monkeypatch.setattr(redis.asyncio.Redis, "from_url", classmethod(
+        lambda cls, *a, **kw: fakeredis.aioredis.FakeRedis(server=servidor, decode_responses=True)))
+    redis_client.get_redis.cache_clear()
+    redis_client.get_redis_async.cache_clear()
+    yield redis_client.get_redis()
+    redis_client.get_redis.cache_clear()
+    redis_client.get_redis_async.cache_clear()
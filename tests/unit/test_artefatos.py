@@ -0,0 +1,31 @@
+import os
+from types import SimpleNamespace
+
+from fastapi.responses import FileResponse
+
+from fc_core.api.routes import processos
+from fc_core.reporting import artefatos
+
+
+def test_export_sem_cache_enfileira_em_vez_de_gerar(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(artefatos, "REPORTS_DIR", tmp_path)
+    enfileirados = []
+    monkeypatch.setattr(processos.gerar_relatorio_task, "delay",
+                        lambda formato, filtros: enfileirados.append(formato) or SimpleNamespace(id="job-1"))
+
+    resp = processos.export_pdf(db)
+    assert resp.status_code == 202
+    assert resp.headers["location"] == "/api/processos/export/jobs/job-1"
+    assert enfileirados == ["pdf"]
+    assert not list(tmp_path.iterdir())
+
+
+def test_export_em_cache_serve_e_renova_o_uso(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(artefatos, "REPORTS_DIR", tmp_path)
+    caminho = artefatos.caminho_artefato(artefatos.chave_relatorio("excel", {}, 0), "excel")
+    caminho.write_bytes(b"xlsx")
+    os.utime(caminho, (0, 0))
+
+    resp = processos.export_excel(db)
+    assert isinstance(resp, FileResponse) and resp.path == caminho
+    assert caminho.stat().st_mtime > 0
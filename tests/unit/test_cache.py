@@ -0,0 +1,118 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import time
+
+from fc_core.core import cache
+from fc_core.core.models import Processo
+
+
+def test_tags_da_listagem_seguem_as_dimensoes_filtradas():
+    assert cache.tags_lista({"situacao": None, "natureza": None, "risco": None, "search": "0001"}) == [cache.TODOS]
+    assert cache.tags_lista({"situacao": "Ativo", "natureza": None, "risco": "Provável"}) == [
+        "lista:situacao:Ativo", "lista:risco:Provável"
+    ]
+
+
+def test_chave_muda_com_a_versao_das_tags():
+    filtros = {"situacao": "Ativo", "page": 1}
+    # Tag nunca invalidada (sem chave no Redis) equivale à versão 0
+    assert cache._chave("processos:lista", filtros, [None]) == cache._chave("processos:lista", filtros, [0])
+    assert cache._chave("processos:lista", filtros, ["1"]) != cache._chave("processos:lista", filtros, ["2"])
+    assert cache._chave("processos:lista", filtros, ["1"]) != cache._chave("processos:lista", dict(filtros, page=2), ["1"])
+
+
+def test_valores_filtro_usam_os_atributos_do_processo():
+    processo = Processo(pasta="0001", situacao="Ativo", natureza="Cível", risco_atual="Remoto")
+    assert cache.valores_filtro(processo) == {"situacao": "Ativo", "natureza": "Cível", "risco": "Remoto"}
+
+
+class Contador:
+    def __init__(self, valor=None, espera=0.0):
+        self.chamadas = 0
+        self.valor = valor
+        self.espera = espera
+
+    def __call__(self):
+        self.chamadas += 1
+        time.sleep(self.espera)
+        return self.valor if self.valor is not None else {"chamada": self.chamadas}
+
+
+def _chave(r, nome, params, tags):
+    return cache._chave(nome, params, r.mget([cache._chave_tag(t) for t in tags]))
+
+
+def test_lembrar_hit_miss_e_ttl(redis_fake):
+    calcular = Contador()
+    params = {"page": 1}
+    assert cache.lembrar("processos:lista", params, [cache.TODOS], calcular) == {"chamada": 1}
+    assert cache.lembrar("processos:lista", params, [cache.TODOS], calcular) == {"chamada": 1}
+    assert cache.lembrar("processos:lista", {"page": 2}, [cache.TODOS], calcular) == {"chamada": 2}
+    assert calcular.chamadas == 2
+
+    chave = _chave(redis_fake, "processos:lista", params, [cache.TODOS])
+    assert 0 < redis_fake.ttl(chave) <= cache.settings.cache_ttl_seconds
+    assert not redis_fake.exists(f"{chave}:trava")
+
+    # Expirada a entrada, o próximo acesso recalcula
+    redis_fake.delete(chave)
+    assert cache.lembrar("processos:lista", params, [cache.TODOS], calcular) == {"chamada": 3}
+
+
+def test_lembrar_async_usa_o_mesmo_cache(redis_fake):
+    calcular = Contador()
+    cache.lembrar("processos:detalhe", {"id": "1"}, [cache.tag_processo("1")], calcular)
+
+    async def calcular_async():
+        return calcular()
+
+    assert asyncio.run(cache.lembrar_async("processos:detalhe", {"id": "1"}, [cache.tag_processo("1")], calcular_async)) == {"chamada": 1}
+    assert calcular.chamadas == 1
+
+
+def test_invalidar_processo_troca_a_versao_so_das_tags_afetadas(redis_fake):
+    calcular = Contador()
+    ativos = {"situacao": "Ativo"}
+    baixados = {"situacao": "Baixado"}
+
+    def ler():
+        return [
+            cache.lembrar("processos:detalhe", {"id": "p1"}, [cache.tag_processo("p1")], calcular),
+            cache.lembrar("processos:lista", ativos, cache.tags_lista(ativos), calcular),
+            cache.lembrar("processos:lista", baixados, cache.tags_lista(baixados), calcular),
+            cache.lembrar("processos:lista", {}, cache.tags_lista({}), calcular),
+        ]
+
+    antes = ler()
+    assert ler() == antes and calcular.chamadas == 4
+
+    # p1 passou de Ativo para Suspenso: Baixado continua em cache
+    cache.invalidar_processo("p1", {"situacao": "Ativo", "natureza": None, "risco": None}, {"situacao": "Suspenso"})
+    depois = ler()
+    assert calcular.chamadas == 7
+    assert depois[2] == antes[2]
+    assert all(d != a for d, a in zip(depois[:2] + depois[3:], antes[:2] + antes[3:]))
+    assert redis_fake.get(cache._chave_tag("lista:situacao:Ativo")) == "1"
+    assert redis_fake.get(cache._chave_tag("lista:situacao:Suspenso")) == "1"
+
+
+def test_trava_evita_que_misses_concorrentes_recalculem(redis_fake):
+    calcular = Contador(valor={"total": 10}, espera=0.3)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        resultados = list(pool.map(
+            lambda _: cache.lembrar("processos:stats", {}, [cache.TODOS], calcular), range(8)
+        ))
+    assert resultados == [{"total": 10}] * 8
+    assert calcular.chamadas == 1
+
+
+def test_sem_resposta_de_quem_tem_a_trava_calcula_direto(redis_fake, monkeypatch):
+    monkeypatch.setattr(cache.settings, "cache_trava_ms", 200)
+    chave = _chave(redis_fake, "processos:stats", {}, [cache.TODOS])
+    redis_fake.set(f"{chave}:trava", "outro-processo", px=10_000)
+
+    calcular = Contador()
+    assert cache.lembrar("processos:stats", {}, [cache.TODOS], calcular) == {"chamada": 1}
+    # Não grava nem libera a trava alheia
+    assert redis_fake.get(chave) is None
+    assert redis_fake.get(f"{chave}:trava") == "outro-processo"
@@ -0,0 +1,65 @@
+import os
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+from fc_core.core import database
+
+
+def test_pool_divide_o_teto_entre_processos():
+    # Worker prefork -c 8: uma task por filho, sessões aninhadas cabem no overflow
+    assert database.dimensionar_pool(processos=8, threads=1, teto=60) == (1, 1)
+    # API com 2 processos de 40 threads: 30 conexões por processo no máximo
+    assert database.dimensionar_pool(processos=2, threads=40, teto=60) == (30, 0)
+    assert database.dimensionar_pool(processos=1, threads=40, teto=60) == (40, 20)
+    # Concorrência acima do teto ainda garante uma conexão por processo
+    assert database.dimensionar_pool(processos=100, threads=1, teto=60) == (1, 0)
+
+
+def test_metricas_do_pool(tmp_path):
+    engine = database.criar_engine(f"sqlite:///{tmp_path / 'pool.db'}", processos=60, threads=1)
+    engine.pool._timeout = 0.05
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            metricas = engine.pool.metricas()
+            assert metricas["em_uso"] == 1
+            assert (metricas["tamanho"], metricas["max_overflow"]) == (1, 0)
+            with pytest.raises(PoolTimeout):
+                engine.connect()
+        metricas = engine.pool.metricas()
+        assert metricas["em_uso"] == 0
+        assert metricas["checkouts"] == 2
+        assert metricas["timeouts"] == 1
+        assert metricas["espera_max_ms"] >= 50
+    finally:
+        engine.dispose()
+
+
+def test_filho_do_fork_descarta_conexoes_herdadas():
+    with database.engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0 if database.engine.pool.checkedin() == 0 else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert database.engine.pool.checkedin() == 1
+
+
+def test_url_async_troca_so_o_driver():
+    assert database.url_async("mysql+pymysql://u:s%40nha@db:3306/fc?charset=utf8mb4") == "mysql+aiomysql://u:s%40nha@db:3306/fc?charset=utf8mb4"
+    assert database.url_async("postgresql://u:p@db/fc") == "postgresql+asyncpg://u:p@db/fc"
+    assert database.url_async("sqlite:///./fc.db") == "sqlite+aiosqlite:///./fc.db"
+    with pytest.raises(ValueError):
+        database.url_async("oracle://u:p@db/fc")
+
+
+def test_sem_driver_async_usa_rotas_sincronas():
+    assert database.driver_async_disponivel("sqlite:///./fc.db")
+    assert not database.driver_async_disponivel("oracle://u:p@db/fc")
+    try:
+        import aiomysql  # noqa: F401
+    except ImportError:
+        assert not database.driver_async_disponivel("mysql+pymysql://u:p@db/fc")
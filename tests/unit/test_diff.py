@@ -0,0 +1,48 @@
+from fc_core.automation import diff
+from fc_core.automation.snapshots import registrar_snapshot
+from fc_core.core.models import EventoProcesso, Processo
+
+PROCESSO = {"classe": "Procedimento  Comum ", "situacao": "Ativo", "valor_causa": "1000.00", "extraido_em": "2025-01-01"}
+MOVIMENTACOES = [{"data": "10/01/2025", "descricao": "Conclusos"}]
+
+
+def test_hash_ignora_formatacao_e_campos_volateis():
+    reformatado = {"extraido_em": "2025-02-01", "valor_causa": "1000.00", "situacao": "Ativo", "classe": "Procedimento Comum", "juiz": ""}
+    assert diff.hash_snapshot(diff.montar_snapshot(PROCESSO, MOVIMENTACOES)) == \
+        diff.hash_snapshot(diff.montar_snapshot(reformatado, MOVIMENTACOES))
+
+
+def test_diff_gera_eventos_compactos():
+    anterior = diff.montar_snapshot(PROCESSO, MOVIMENTACOES)
+    atual = diff.montar_snapshot(
+        dict(PROCESSO, situacao="Suspenso", valor_causa="2000.00"),
+        MOVIMENTACOES + [{"data": "15/01/2025", "descricao": "Sentença"}]
+    )
+    eventos = diff.diff(anterior, atual)
+    assert [e["tipo"] for e in eventos] == [diff.SITUACAO_ALTERADA, diff.VALOR_ALTERADO, diff.MOVIMENTACAO_NOVA]
+    assert eventos[0] == {"tipo": diff.SITUACAO_ALTERADA, "campo": "situacao", "de": "Ativo", "para": "Suspenso"}
+    assert eventos[2]["movimentacao"]["descricao"] == "Sentença"
+    assert diff.diff(None, atual) == [{"tipo": diff.SNAPSHOT_INICIAL, "movimentacoes": 2}]
+
+
+def test_snapshot_inalterado_nao_grava(db):
+    processo = Processo(pasta="0001.3.00001")
+    db.add(processo)
+    db.commit()
+
+    assert registrar_snapshot(db, processo.id, "tjsp", PROCESSO, MOVIMENTACOES) is not None
+    db.commit()
+    assert registrar_snapshot(db, processo.id, "tjsp", dict(PROCESSO, extraido_em="outro"), MOVIMENTACOES) is None
+    assert not db.new and not db.dirty
+    assert db.query(EventoProcesso).count() == 1
+
+
+def test_processo_novo_gravado_antes_de_snapshot_e_eventos(db, redis_fake):
+    # FK ligada no fixture: snapshot/evento antes do processo falharia no flush
+    from fc_core.automation.tasks import _salvar_processo
+
+    referencia = _salvar_processo(db, "1234567-89.2024.8.21.0001", "tjrs", PROCESSO, MOVIMENTACOES)
+    assert referencia["mudancas"] == 1
+    evento = db.query(EventoProcesso).one()
+    assert evento.tipo == diff.SNAPSHOT_INICIAL
+    assert str(evento.processo_id) == referencia["processo_id"]
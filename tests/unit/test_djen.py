@@ -0,0 +1,83 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from fc_core.automation import djen
+from fc_core.automation.djen import OAB, PARTE, Termo, registrar_publicacoes, termos_monitorados
+from fc_core.core.database import Base
+from fc_core.core.filiais import Filial
+from fc_core.core.models import EventoProcesso, Processo, PublicacaoDJEN
+
+AGORA = datetime(2025, 6, 2, 12, 0, tzinfo=timezone.utc)
+
+
+class Filiais:
+    def get_all(self):
+        return [
+            Filial(1, "Vipal Borrachas S.A.", "1", "92.930.538/0001-07", "VIPAL BORRACHAS S.A."),
+            Filial(2, "Vipal Borrachas S.A.", "2", "92.930.538/0005-22", "VIPAL BORRACHAS S.A."),
+            Filial(3, "Fulano de Tal", None, None, "FULANO DE TAL"),
+        ]
+
+
+def test_termos_agrupam_filiais_por_empresa():
+    termos = termos_monitorados(Filiais(), oabs="12345/rs, invalida")
+    assert termos == [Termo(PARTE, "FULANO DE TAL"), Termo(PARTE, "VIPAL BORRACHAS S.A."), Termo(OAB, "12345/RS")]
+
+
+def test_publicacoes_deduplicadas_e_distribuidas(db):
+    processo = Processo(pasta="0001.3.00001", numero_principal="5000123-45.2024.8.13.0000")
+    db.add(processo)
+    db.commit()
+
+    item = {
+        "numeroprocessocommascara": "5000123-45.2024.8.13.0000", "siglaTribunal": "TJMG",
+        "data_disponibilizacao": "2025-06-01", "texto": "Intimação  de Acórdão", "tipoComunicacao": "Intimação"
+    }
+    fora = dict(item, numeroprocessocommascara="0000001-00.2024.8.13.0001")
+    termo = Termo(PARTE, "VIPAL BORRACHAS S.A.")
+
+    assert registrar_publicacoes(db, [item, dict(item, texto="Intimação de Acórdão"), fora], termo, AGORA) == (2, 1)
+    db.commit()
+    assert registrar_publicacoes(db, [item, fora], termo, AGORA) == (0, 0)
+
+    assert db.query(PublicacaoDJEN).count() == 2
+    evento = db.query(EventoProcesso).one()
+    assert evento.tipo == "publicacao_djen" and evento.dados["tribunal"] == "TJMG"
+    assert processo.proxima_verificacao.replace(tzinfo=timezone.utc) == AGORA
+
+
+def test_termos_concorrentes_nao_duplicam_publicacao(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'djen.db'}")
+    Base.metadata.create_all(engine)
+    Sessao = sessionmaker(bind=engine, autoflush=False)
+    a, b = Sessao(), Sessao()
+    processo = Processo(pasta="0001.3.00001", numero_principal="5000123-45.2024.8.13.0000")
+    a.add(processo)
+    a.commit()
+
+    item = {
+        "numeroprocessocommascara": "5000123-45.2024.8.13.0000", "siglaTribunal": "TJMG",
+        "data_disponibilizacao": "2025-06-01", "texto": "Intimação", "tipoComunicacao": "Intimação"
+    }
+    outra = dict(item, texto="Despacho")
+
+    # O termo da OAB grava a mesma publicação logo depois de o termo da parte checar as vistas
+    em_lotes, chamadas = djen._em_lotes, []
+
+    def intercalar(itens, *args):
+        chamadas.append(itens)
+        if len(chamadas) == 2:
+            assert registrar_publicacoes(a, [item], Termo(OAB, "12345/RS"), AGORA) == (1, 1)
+            a.commit()
+        return em_lotes(itens, *args)
+
+    monkeypatch.setattr(djen, "_em_lotes", intercalar)
+    assert registrar_publicacoes(b, [item, outra], Termo(PARTE, "VIPAL BORRACHAS S.A."), AGORA) == (1, 1)
+    b.commit()
+
+    assert b.query(PublicacaoDJEN).count() == 2
+    assert sorted(e.dados["resumo"] for e in b.query(EventoProcesso)) == ["Despacho", "Intimação"]
+    a.close(), b.close()
+    engine.dispose()
@@ -0,0 +1,28 @@
+from fc_core.automation import errors
+from fc_core.automation.errors import classificar, espera_retry, retentavel
+
+
+class TimeoutException(Exception):
+    """Mesmo nome da exceção do Selenium"""
+
+
+def test_classificar():
+    assert classificar(TimeoutException("page load")) == errors.TRANSITORIO
+    assert classificar(Exception("HTTP 503 Service Unavailable")) == errors.TRIBUNAL_FORA
+    assert classificar(Exception("Falha no login")) == errors.AUTENTICACAO
+    assert classificar(ValueError("Sistema xpto não suportado")) == errors.NAO_SUPORTADO
+    assert classificar(KeyError("classe")) == errors.PARSE
+    # Dígitos do número CNJ não podem ser lidos como código HTTP
+    assert classificar("Processo 0000503-12.2024.8.26.0100 não encontrado") == errors.NAO_ENCONTRADO
+    assert classificar(errors.FalhaAutenticacao("token expirado")) == errors.AUTENTICACAO
+
+
+def test_apenas_transitorios_sao_retentados():
+    assert retentavel(errors.TRANSITORIO) and retentavel(errors.TRIBUNAL_FORA)
+    assert not retentavel(errors.AUTENTICACAO) and not retentavel(errors.NAO_ENCONTRADO)
+
+
+def test_espera_retry_tem_teto_e_jitter():
+    esperas = [espera_retry(10, base=30, teto=600) for _ in range(200)]
+    assert all(1 <= e <= 600 for e in esperas)
+    assert len({round(e) for e in esperas}) > 50
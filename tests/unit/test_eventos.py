@@ -0,0 +1,51 @@
+import asyncio
+import hashlib
+import hmac
+
+import pytest
+
+from fc_core.automation import eventos
+from fc_core.automation.eventos import _campos, assinar, decodificar, filtrar
+
+
+def test_evento_ida_e_volta_pelo_stream():
+    evento = decodificar("1-0", _campos("situacao_alterada", {"de": "Ativo", "para": "Baixado"}, "abc", "tjsp", 7))
+    assert evento == {
+        "id": "1-0", "tipo": "situacao_alterada", "processo_id": "abc", "fonte": "tjsp",
+        "evento_id": 7, "dados": {"de": "Ativo", "para": "Baixado"}
+    }
+    transiente = decodificar("2-0", _campos("lote_concluido", {"lote_id": "x"}))
+    assert transiente["processo_id"] is None and transiente["evento_id"] is None
+
+    assert filtrar(evento, processo_id="abc", tipos={"situacao_alterada"})
+    assert not filtrar(evento, processo_id="outro")
+    assert not filtrar(transiente, tipos={"situacao_alterada"})
+
+
+def test_assinatura_hmac():
+    corpo = b'{"eventos": []}'
+    esperado = hmac.new(b"segredo", b"1700000000." + corpo, hashlib.sha256).hexdigest()
+    assert assinar("segredo", "1700000000", corpo) == f"sha256={esperado}"
+
+
+def test_sse_le_o_stream_pelo_cliente_async(redis_fake):
+    eventos.publicar(eventos.LOTE_CONCLUIDO, {"lote_id": "x"})
+    entradas = asyncio.run(eventos.ler_async("0", bloquear_ms=10))
+    assert [e["dados"] for _, e in entradas] == [{"lote_id": "x"}]
+
+
+@pytest.mark.parametrize("url", [
+    "http://8.8.8.8/hook",
+    "https://127.0.0.1/hook",
+    "https://10.0.0.5/hook",
+    "https://169.254.169.254/latest/meta-data",
+    "https://[::1]/hook",
+    "file:///etc/passwd",
+])
+def test_webhook_recusa_destinos_internos(url):
+    with pytest.raises(ValueError):
+        eventos.validar_url_webhook(url)
+
+
+def test_webhook_aceita_host_publico():
+    assert eventos.validar_url_webhook("https://8.8.8.8/hook") == "https://8.8.8.8/hook"
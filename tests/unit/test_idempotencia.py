@@ -0,0 +1,22 @@
+import pytest
+from kombu.exceptions import OperationalError
+
+from fc_core.automation import idempotencia, tasks
+
+CNJ = "5000123-45.2024.8.13.0000"
+
+
+def test_falha_ao_publicar_libera_a_reserva(redis_fake, monkeypatch):
+    def broker_fora(*args, **kwargs):
+        raise OperationalError("broker indisponível")
+
+    monkeypatch.setattr(tasks.scrape_processo_task, "apply_async", broker_fora)
+    with pytest.raises(OperationalError):
+        tasks.submeter_scrape("tjmg", CNJ)
+    assert redis_fake.get(idempotencia.chave_scrape("tjmg", CNJ)) is None
+
+    publicadas = []
+    monkeypatch.setattr(tasks.scrape_processo_task, "apply_async", lambda *a, **kw: publicadas.append(kw["task_id"]))
+    task_id, duplicado = tasks.submeter_scrape("tjmg", CNJ)
+    assert not duplicado and publicadas == [task_id]
+    assert tasks.submeter_scrape("tjmg", CNJ) == (task_id, True)
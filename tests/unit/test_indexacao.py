@@ -0,0 +1,36 @@
+from fc_core.analysis.indexacao import IndexadorDocumentos, documentos_pendentes, hash_texto
+from fc_core.core.models import Documento, Processo
+
+
+class IndiceMemoria:
+    def __init__(self):
+        self.ids = {}
+
+    def upsert(self, ids, vetores, textos, metadados):
+        self.ids.update(zip(ids, textos))
+
+    def remover(self, ids_prefixo):
+        self.ids = {i: t for i, t in self.ids.items() if not i.startswith(ids_prefixo)}
+
+
+def test_novo_texto_do_mesmo_arquivo_e_reindexado(db):
+    processo = Processo(pasta="0001.3.00001")
+    db.add(processo)
+    db.flush()
+    documento = Documento(processo_id=processo.id, nome_arquivo="a.pdf", sha256_hash="f" * 64,
+                          storage_path="/x", texto_extraido="texto antigo")
+    db.add(documento)
+    db.commit()
+
+    indice = IndiceMemoria()
+    indexador = IndexadorDocumentos(indice, lambda textos: [[1.0, 0.0]] * len(textos), modelo="m", batch_size=8)
+    assert indexador.backfill(db)["processados"] == 1
+    assert documentos_pendentes(db, "m").count() == 0
+
+    # Novo OCR: mesmo arquivo (sha256_hash), texto diferente
+    documento.texto_extraido = "texto corrigido"
+    documento.texto_sha256 = hash_texto(documento.texto_extraido)
+    db.commit()
+    assert documentos_pendentes(db, "m").count() == 1
+    indexador.backfill(db)
+    assert list(indice.ids.values()) == ["texto corrigido"]
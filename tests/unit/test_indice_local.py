@@ -0,0 +1,87 @@
+import multiprocessing
+
+import numpy as np
+
+from fc_core.analysis.indice_local import IndiceVetorialLocal
+
+
+def _metadados(processo_id, cliente="ACME"):
+    return {"processo_id": processo_id, "cliente": cliente}
+
+
+def test_upsert_remocao_e_filtros(tmp_path):
+    escritor = IndiceVetorialLocal(str(tmp_path))
+    escritor.upsert(
+        ["1:0", "1:1", "2:0"],
+        [[1, 0, 0], [0, 1, 0], [0.9, 0.1, 0]],
+        ["a", "b", "c"],
+        [_metadados("p1"), _metadados("p1"), _metadados("p2", "Outro")]
+    )
+    escritor.upsert(["1:0"], [[0, 0, 1]], ["a2"], [_metadados("p1")])
+
+    leitor = IndiceVetorialLocal(str(tmp_path))
+    assert [leitor.id_da_linha(r) for r, _ in leitor.buscar_vetor([1, 0, 0], k=3)] == ["2:0", "1:1", "1:0"]
+    assert leitor._texto(leitor.linha_do_id("1:0")) == "a2"
+    assert [leitor.id_da_linha(r) for r, _ in leitor.buscar_vetor([1, 0, 0], k=3, cliente="Outro")] == ["2:0"]
+
+    escritor.remover("2:")
+    assert [leitor.id_da_linha(r) for r, _ in leitor.buscar_vetor([1, 0, 0], k=3)] == ["1:1", "1:0"]
+    assert leitor.buscar_vetor([1, 0, 0], k=3, processo_id="inexistente") == []
+
+
+def test_sobras_de_upsert_interrompido_sao_descartadas(tmp_path):
+    escritor = IndiceVetorialLocal(str(tmp_path))
+    escritor.upsert(["1:0"], [[1, 0, 0]], ["a"], [_metadados("p1")])
+    # Escritor morto depois de gravar os dados e antes de confirmar em commit.i64
+    for nome, sobra in {"vetores.f32": 12, "textos.bin": 3, "textos.idx": 16, "linhas.jsonl": 20, "ids.i64": 8, "commit.i64": 3}.items():
+        with open(tmp_path / nome, "ab") as f:
+            f.write(b"\x01" * sobra)
+
+    reaberto = IndiceVetorialLocal(str(tmp_path))
+    assert reaberto.n == 1
+    reaberto.upsert(["2:0"], [[0, 1, 0]], ["b"], [_metadados("p2")])
+
+    leitor = IndiceVetorialLocal(str(tmp_path))
+    assert [leitor.id_da_linha(r) for r, _ in leitor.buscar_vetor([0, 1, 0], k=2)] == ["2:0", "1:0"]
+    assert leitor._texto(leitor.linha_do_id("2:0")) == "b"
+    assert [leitor.id_da_linha(r) for r, _ in leitor.buscar_vetor([0, 1, 0], k=2, processo_id="p2")] == ["2:0"]
+    assert (tmp_path / "vetores.f32").stat().st_size == 2 * 3 * 4
+
+
+def _escrever(diretorio, prefixo):
+    indice = IndiceVetorialLocal(diretorio)
+    for i in range(40):
+        indice.upsert([f"{prefixo}{i}:0"], [[i + 1, 1, 0]], [f"{prefixo}{i}"], [_metadados(prefixo)])
+
+
+def test_escritores_em_processos_diferentes_nao_desalinham(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    processos = [ctx.Process(target=_escrever, args=(str(tmp_path), p)) for p in ("a", "b")]
+    for p in processos:
+        p.start()
+    for p in processos:
+        p.join()
+    assert all(p.exitcode == 0 for p in processos)
+
+    leitor = IndiceVetorialLocal(str(tmp_path))
+    assert leitor.n == 80
+    for row in range(leitor.n):
+        id_chunk = leitor.id_da_linha(row)
+        assert leitor._texto(row) == id_chunk.split(":")[0]
+        assert leitor.linha_do_id(id_chunk) == row
+
+
+def test_ivf_recupera_vizinhos_da_busca_exata(tmp_path):
+    rng = np.random.default_rng(1)
+    centros = rng.standard_normal((20, 16))
+    vetores = centros[rng.integers(0, 20, 3000)] + 0.3 * rng.standard_normal((3000, 16))
+    indice = IndiceVetorialLocal(str(tmp_path), nprobe=8)
+    indice.upsert([f"{i}:0" for i in range(3000)], vetores, [""] * 3000, [_metadados(None)] * 3000)
+    indice.treinar()
+
+    recall = []
+    for q in vetores[:20]:
+        exato = {r for r, _ in indice.buscar_vetor(q, k=10, exato=True)}
+        aprox = {r for r, _ in indice.buscar_vetor(q, k=10)}
+        recall.append(len(exato & aprox) / 10)
+    assert np.mean(recall) >= 0.9
@@ -0,0 +1,44 @@
+from fc_core.automation import lotes, tasks
+from fc_core.automation.cnj import normalizar_cnj, tribunal_do_cnj
+from fc_core.automation.errors import DESCONHECIDO, NAO_ENCONTRADO
+from fc_core.automation.lotes import planejar_lote
+
+
+def test_tribunal_do_cnj():
+    assert tribunal_do_cnj("1234567-89.2023.8.26.0100") == "tjsp"
+    assert tribunal_do_cnj("12345678920235030001") == "trt3"
+    assert tribunal_do_cnj("1234567-89.2023.4.04.7100") == "trf4"
+    assert tribunal_do_cnj("0001.3.00001") is None
+    assert normalizar_cnj("12345678920238260100") == "1234567-89.2023.8.26.0100"
+
+
+def test_planejar_lote_agrupa_por_tribunal_e_equilibra_chunks():
+    trt3 = [f"{i:07d}-00.2024.5.03.0001" for i in range(30)]
+    tjmg = [f"{i:07d}-00.2024.8.13.0024" for i in range(5)]
+    plano = planejar_lote("pje", trt3 + tjmg + trt3[:3], tamanho_chunk=25)
+
+    assert [(fonte, len(numeros)) for fonte, numeros in plano] == [("trt3", 15), ("trt3", 15), ("tjmg", 5)]
+    assert sorted(n for fonte, numeros in plano if fonte == "trt3" for n in numeros) == sorted(trt3)
+
+
+class ScraperQuebrado:
+    """Conclui o primeiro processo e quebra no meio do lote"""
+
+    def executar_lote(self, numeros, credentials, ao_concluir, deve_parar):
+        ao_concluir({"numero": numeros[0], "success": False, "error": "Não encontrado", "categoria": NAO_ENCONTRADO})
+        raise RuntimeError("navegador caiu")
+
+
+def test_chunk_com_erro_inesperado_ainda_finaliza_o_lote(redis_fake, monkeypatch):
+    monkeypatch.setattr(tasks.ScraperFactory, "create", lambda fonte, headless=True: ScraperQuebrado())
+    numeros = ["0000001-00.2024.8.13.0024", "0000002-00.2024.8.13.0024", "0000003-00.2024.8.13.0024"]
+    lote_id = lotes.criar_lote("tjmg", len(numeros))
+    lotes.iniciar_lote(lote_id, 1)
+
+    resumo = tasks.scrape_chunk_task.apply(args=(lote_id, "tjmg", numeros)).get()
+    assert resumo["sucesso"] == 0
+    assert [f["categoria"] for f in resumo["falhas"]] == [NAO_ENCONTRADO, DESCONHECIDO, DESCONHECIDO]
+
+    tasks.finalizar_lote_task([resumo], lote_id)
+    status = lotes.status_lote(lote_id)
+    assert (status["estado"], status["falhas"], status["pendentes"]) == ("CONCLUIDO", 3, 0)
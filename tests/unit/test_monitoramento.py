@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta, timezone
+
+from fc_core.automation.monitoramento import calcular_intervalo, data_mais_recente, INTERVALO_MAX, INTERVALO_MIN
+from fc_core.core.models import Processo
+
+AGORA = datetime(2025, 6, 2, 12, 0, tzinfo=timezone.utc)
+
+
+def _processo(dias_sem_movimento=None, risco=None, situacao=None):
+    ultima = AGORA - timedelta(days=dias_sem_movimento) if dias_sem_movimento is not None else None
+    return Processo(
+        pasta="0001.3.00001", numero_principal="1234567-89.2024.8.21.0001",
+        ultima_movimentacao=ultima, risco_atual=risco, situacao=situacao
+    )
+
+
+def test_intervalo_segue_atividade_risco_e_situacao():
+    quente = calcular_intervalo(_processo(2), AGORA, jitter=False)
+    morno = calcular_intervalo(_processo(20), AGORA, jitter=False)
+    parado = calcular_intervalo(_processo(400), AGORA, jitter=False)
+    assert quente == INTERVALO_MIN < morno < parado == INTERVALO_MAX
+
+    assert calcular_intervalo(_processo(20, risco="Provável"), AGORA, jitter=False) == morno / 2
+    assert calcular_intervalo(_processo(20, risco="Remota"), AGORA, jitter=False) == morno * 2
+    assert calcular_intervalo(_processo(2, situacao="Arquivado"), AGORA, jitter=False) == INTERVALO_MAX
+
+
+def test_data_mais_recente():
+    movimentacoes = [{"data": "10/01/2024"}, {"data": "05/03/2024 14:30"}, {"data": "sem data"}]
+    assert data_mais_recente(movimentacoes) == datetime(2024, 3, 5, 14, 30, tzinfo=timezone.utc)
+    assert data_mais_recente([]) is None
+
+
+def test_scraping_sem_mudancas_reagenda_a_verificacao(db, redis_fake):
+    from fc_core.automation.orchestrator import DataSource, Orchestrator, ScrapingResult
+
+    cnj = "1234567-89.2024.8.21.0001"
+    db.add(Processo(pasta="0001.3.00001", numero_principal=cnj))
+    db.commit()
+    resultado = ScrapingResult(source=DataSource.PJE, success=True, data={"classe": "Procedimento Comum"})
+    Orchestrator(db)._save_to_db(cnj, [resultado])
+
+    processo = db.query(Processo).filter(Processo.numero_principal == cnj).one()
+    processo.proxima_verificacao = None
+    db.commit()
+    # Mesmo retorno: nenhum snapshot novo, mas a verificação é reagendada e gravada
+    Orchestrator(db)._save_to_db(cnj, [resultado])
+
+    db.expire_all()
+    processo = db.query(Processo).filter(Processo.numero_principal == cnj).one()
+    assert processo.proxima_verificacao is not None
@@ -0,0 +1,51 @@
+import pytest
+
+from fc_core.analysis import ocr_paginado as modulo
+from fc_core.analysis import processamento
+from fc_core.core.models import PaginaOCR
+
+pypdf = pytest.importorskip("pypdf")
+
+
+class OCRInstavel:
+    """Falha a segunda chamada; as demais devolvem o número da chamada"""
+
+    def __init__(self):
+        self.chamadas = 0
+
+    def processar_documento(self, caminho):
+        self.chamadas += 1
+        if self.chamadas == 2:
+            return {"success": False, "error": "timeout"}
+        return {"success": True, "texto": f"pagina {self.chamadas}"}
+
+
+class Servicos:
+    def __init__(self, ocr):
+        self.ocr = ocr
+
+    def get(self, nome):
+        return self.ocr
+
+
+def test_pagina_com_falha_nao_entra_no_cache(db, redis_fake, tmp_path, monkeypatch):
+    writer = pypdf.PdfWriter()
+    for _ in range(3):
+        writer.add_blank_page(width=200, height=200)
+    caminho = tmp_path / "escaneado.pdf"
+    with open(caminho, "wb") as f:
+        writer.write(f)
+    ocr = OCRInstavel()
+    monkeypatch.setattr(processamento, "servicos", Servicos(ocr))
+
+    resultado = modulo.ocr_paginado(db, str(caminho), "a" * 64)
+    assert not resultado["success"]
+    assert resultado["paginas_falhas"] == [1]
+    assert sorted(modulo.paginas_em_cache(db, "a" * 64)) == [0, 2]
+
+    # Nova rodada: só a página que falhou vai ao OCR
+    resultado = modulo.ocr_paginado(db, str(caminho), "a" * 64)
+    assert resultado["success"]
+    assert (resultado["paginas_ocr"], resultado["paginas_cache"]) == (1, 2)
+    assert resultado["texto"] == "pagina 1\n\npagina 4\n\npagina 3"
+    assert db.query(PaginaOCR).count() == 3
@@ -0,0 +1,32 @@
+import io
+
+import pytest
+
+from fc_core.reporting import pdf_exporter as pdf
+
+pytest.importorskip("reportlab")
+
+LINHA = ["0001.3.00001", "0000000-00.0000.0.00.0000", "Ativo", "Alto", "R$ 1,000,000.00"]
+
+
+def _base(linhas, numero_pagina):
+    c = pdf.canvas.Canvas(io.BytesIO(), pagesize=pdf.A4)
+    return pdf._desenhar_pagina(c, [LINHA] * linhas, numero_pagina, "01/01/2026 00:00")
+
+
+def test_tabela_cheia_termina_acima_do_rodape():
+    topo_rodape = pdf.RODAPE + pdf.FONTE_RODAPE
+    primeira, demais = pdf.capacidade()
+    assert primeira < demais  # O título ocupa espaço na primeira página
+
+    assert _base(primeira, 1) > topo_rodape
+    assert _base(demais, 2) > topo_rodape
+    # A capacidade é justa: uma linha a mais já invade a folga do rodapé
+    assert _base(primeira + 1, 1) < topo_rodape + pdf.MARGEM_RODAPE
+    assert _base(demais + 1, 2) < topo_rodape + pdf.MARGEM_RODAPE
+
+
+def test_paginas_respeitam_a_capacidade():
+    primeira, demais = pdf.capacidade()
+    blocos = [len(b) for b in pdf._paginas([LINHA] * (primeira + 2 * demais + 1), 1)]
+    assert blocos == [primeira, demais, demais, 1]
@@ -0,0 +1,54 @@
+from datetime import date
+
+import numpy as np
+
+from fc_core.core import prazos
+from fc_core.core.models import PrazoComunicacao, Processo
+
+
+def test_pascoa_e_feriados_moveis():
+    assert prazos.pascoa(2024) == date(2024, 3, 31)
+    assert prazos.pascoa(2025) == date(2025, 4, 20)
+    feriados = prazos.feriados_nacionais(2025)
+    assert date(2025, 3, 3) in feriados and date(2025, 3, 4) in feriados  # Carnaval
+    assert date(2025, 4, 18) in feriados and date(2025, 6, 19) in feriados  # Sexta Santa, Corpus Christi
+
+
+def test_vencimentos_vetorizados_por_uf():
+    inicios = ["2025-06-02", "2025-06-14", "2025-07-07", "2025-07-07", "2025-12-15"]
+    vencimentos = prazos.calcular_vencimentos(inicios, [5, 1, 5, 5, 5], [None, None, None, "sp", None])
+    assert vencimentos.tolist() == [
+        date(2025, 6, 9),    # segunda + 5 dias úteis
+        date(2025, 6, 17),   # ciência no sábado vale na segunda; 19/06 nem entra
+        date(2025, 7, 14),
+        date(2025, 7, 15),   # 09/07 é feriado em SP
+        date(2026, 1, 21),   # 4 dias antes do recesso (20/12 a 20/01), o 5º depois
+    ]
+    assert prazos.calcular_vencimentos([], []).size == 0
+
+
+def test_suspensoes_extras():
+    extras = prazos.suspensoes_extras("2025-03-05, sp:2025-02-10..2025-02-12")
+    assert extras[None] == [date(2025, 3, 5)]
+    assert extras["sp"] == [date(2025, 2, 10), date(2025, 2, 11), date(2025, 2, 12)]
+
+
+def test_registrar_comunicacoes_e_proximos(db):
+    processo = Processo(pasta="0001.3.00001", numero_principal="5000123-45.2024.8.26.0100", cliente="Vipal")
+    db.add(processo)
+    db.commit()
+    comunicacoes = [
+        {"tipo": "Citação Eletrônica", "status": "Pendente", "data_disponibilizacao": "2025-06-02", "prazo_final": "2025-06-20"},
+        {"tipo": "Intimação", "status": "Lida", "data_disponibilizacao": "2025-06-02"},
+        {"tipo": "Intimação", "status": "Lida"},
+    ]
+    assert prazos.registrar_comunicacoes(db, processo.id, processo.numero_principal, comunicacoes, "sp", "dje") == 2
+    db.commit()
+    assert prazos.registrar_comunicacoes(db, processo.id, processo.numero_principal, comunicacoes[:1], "sp", "dje") == 1
+    db.commit()
+    assert db.query(PrazoComunicacao).count() == 2
+
+    proximos = prazos.proximos(db, 7, hoje=date(2025, 6, 5)).all()
+    assert [(p.tipo, p.vencimento, pasta) for p, pasta, _ in proximos] == [("Intimação", date(2025, 6, 9), "0001.3.00001")]
+    citacao = prazos.proximos(db, 30, hoje=date(2025, 6, 5), cliente="Vipal").all()[-1][0]
+    assert citacao.vencimento == date(2025, 6, 24) and citacao.prazo_informado == date(2025, 6, 20)
@@ -0,0 +1,53 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from fc_core.automation.scrapers.schema import CabecalhoProcesso, ResultadoScraping, parse_brl, parse_data
+from fc_core.core import codec
+
+
+def test_parse_brl():
+    assert parse_brl("R$ 1.234,56") == Decimal("1234.56")
+    assert parse_brl("1234.56") == Decimal("1234.56")
+    assert parse_brl("R$ 1.000.000") == Decimal("1000000.00")
+    assert parse_brl("-R$ 10,5") == Decimal("-10.50")
+    assert parse_brl(1500) == Decimal("1500")
+    assert parse_brl("Não informado") is None and parse_brl(None) is None
+
+
+def test_parse_data():
+    assert parse_data("15/01/2024") == date(2024, 1, 15)
+    assert parse_data("Distribuído em 05/03/2024 às 14:30") == datetime(2024, 3, 5, 14, 30)
+    assert parse_data("2024-01-15") == date(2024, 1, 15)
+    assert parse_data("31/02/2024") is None and parse_data("sem data") is None
+
+
+def test_resultado_normalizado_e_idempotente():
+    bruto = {
+        "numero": "5000123-45.2024.8.13.0000", "valor": "R$ 10.000,00", "risco": "Provável",
+        "distribuicao": "10/01/2024", "classe": "  Procedimento   Comum ", "juiz": "Fulano", "vazio": None,
+        "comunicacoes": [{"tipo": "Intimação", "data_disponibilizacao": "15/01/2024", "prazo_final": "2024-01-22"}],
+    }
+    resultado = ResultadoScraping.de_dados(bruto, [{"data": "16/01/2024 10:00", "descricao": "Conclusos"}])
+    assert resultado.processo.valor_causa == Decimal("10000.00")
+    assert resultado.processo.campos_processo() == {"valor_causa": Decimal("10000.00"), "risco_atual": "Provável"}
+
+    dados = resultado.para_dict()
+    assert dados["processo"]["classe"] == "Procedimento Comum" and dados["processo"]["juiz"] == "Fulano"
+    assert dados["processo"]["comunicacoes"][0]["data_disponibilizacao"] == "2024-01-15"
+    assert dados["movimentacoes"] == [{"data": "2024-01-16T10:00:00", "descricao": "Conclusos"}]
+    assert ResultadoScraping.de_dados(dados["processo"], dados["movimentacoes"]).para_dict() == dados
+
+    assert codec.loads(codec.dumps(dados)) == dados
+    assert codec.loads(codec.dumps({"valor": Decimal("1.50"), "dia": date(2024, 1, 2)})) == {"valor": "1.50", "dia": "2024-01-02"}
+    assert isinstance(CabecalhoProcesso.de_dict(None), CabecalhoProcesso)
+
+
+def test_fcpack_comprime_so_acima_do_limite():
+    pequeno = {"success": True, "processo_id": "abc"}
+    grande = {"movimentacoes": [{"descricao": "Juntada de petição " * 10}] * 50}
+    formato = codec.MSGPACK if codec.msgpack is not None else codec.JSON
+    assert codec.empacotar(pequeno, 1024)[:1] == formato
+    assert codec.empacotar(grande, 1024)[:1] == codec.COMPRIMIDO[formato]
+    for payload in (pequeno, grande):
+        assert codec.desempacotar(codec.empacotar(payload, 1024)) == payload
+    assert codec.desempacotar(codec.empacotar({"valor": Decimal("1.50")}, 0)) == {"valor": "1.50"}
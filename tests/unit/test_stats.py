@@ -0,0 +1,60 @@
+from sqlalchemy import func
+from fc_core.core.models import Processo, ProcessoStats
+from fc_core.core.stats import inicializar, ler_resumo, reconciliar
+
+
+def test_contadores_acompanham_escritas(db):
+    assert reconciliar(db)["versao"] == 1
+    db.add(Processo(pasta="0001.3.00001", situacao="Ativo", risco_atual="Provável", valor_causa=100))
+    db.add(Processo(pasta="0001.3.00002", situacao="Ativo", valor_causa=50))
+    db.commit()
+
+    resumo = ler_resumo(db)
+    assert resumo["total"] == 2
+    assert resumo["valor_total"] == 150.0
+    assert resumo["por_situacao"] == {"Ativo": 2}
+    assert resumo["por_risco"] == {"Provável": 1, None: 1}
+
+    p = db.query(Processo).filter_by(pasta="0001.3.00002").one()
+    p.situacao = "Baixado"
+    db.commit()
+
+    p = db.query(Processo).filter_by(pasta="0001.3.00001").one()
+    p.deleted_at = func.now()
+    db.commit()
+
+    resumo = ler_resumo(db)
+    assert resumo["total"] == 1
+    assert resumo["por_situacao"] == {"Baixado": 1}
+    assert resumo["versao"] == 4
+
+
+def test_reconciliar_recria_contadores(db):
+    db.add(Processo(pasta="0001.3.00001", situacao="Ativo", cliente="Vipal", valor_causa=10))
+    db.commit()
+    antes = ler_resumo(db)
+
+    reconciliar(db)
+    depois = ler_resumo(db)
+
+    assert depois["versao"] == antes["versao"] + 1
+    depois.pop("versao"), antes.pop("versao")
+    assert depois == antes
+
+
+def test_inicializar_reconcilia_quando_falta_a_versao(db):
+    # Banco populado antes da tabela de contadores existir
+    db.add(Processo(pasta="0001.3.00001", situacao="Ativo", valor_causa=10))
+    db.commit()
+    db.query(ProcessoStats).delete()
+    db.commit()
+    # Um worker gravou deltas antes do primeiro startup da API: tabela não vazia, contagem parcial
+    db.add(Processo(pasta="0001.3.00002", situacao="Baixado", valor_causa=5))
+    db.commit()
+    assert ler_resumo(db)["total"] == 1
+    assert ler_resumo(db)["versao"] == 0
+
+    resultado = inicializar(db)
+    assert (resultado["total"], resultado["versao"]) == (2, 1)
+    assert ler_resumo(db)["por_situacao"] == {"Ativo": 1, "Baixado": 1}
+    assert inicializar(db) is None
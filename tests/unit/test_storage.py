@@ -0,0 +1,41 @@
+from fc_core.core import storage
+from fc_core.core.models import Blob
+
+HASH = "ab" * 32
+
+
+def _upload(db, tmp_path):
+    """Mesma ordem da rota de upload: referência, arquivo, commit"""
+    temporario = tmp_path / "upload.part"
+    temporario.write_bytes(b"conteudo")
+    storage.adicionar_referencia(db, HASH, 8, storage.caminho_blob(HASH))
+    storage.promover(temporario, HASH)
+    db.commit()
+
+
+def test_exclusao_nao_apaga_blob_reaproveitado_por_upload_concorrente(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "STORAGE_DIR", tmp_path)
+    _upload(db, tmp_path)
+
+    assert storage.remover_referencia(db, HASH)
+    db.commit()
+    # Upload do mesmo conteúdo entre o commit da exclusão e a remoção do arquivo
+    _upload(db, tmp_path)
+
+    assert not storage.apagar_se_orfao(db, HASH)
+    assert storage.caminho_blob(HASH).exists()
+    assert db.get(Blob, HASH).refcount == 1
+
+
+def test_upload_depois_da_exclusao_regrava_o_arquivo(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "STORAGE_DIR", tmp_path)
+    _upload(db, tmp_path)
+
+    assert storage.remover_referencia(db, HASH)
+    db.commit()
+    assert storage.apagar_se_orfao(db, HASH)
+    assert not storage.caminho_blob(HASH).exists()
+    assert db.get(Blob, HASH) is None
+
+    _upload(db, tmp_path)
+    assert storage.caminho_blob(HASH).read_bytes() == b"conteudo"
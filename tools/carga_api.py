@@ -0,0 +1,131 @@
+"""
+Teste de carga das rotas de leitura da API (async x síncrona).
+
+Uso:
+    # Contra uma API já no ar
+    python tools/carga_api.py --url http://localhost:8000 --clientes 500 --segundos 30
+
+    # Sobe a API duas vezes (API_LEITURA_ASYNC=true/false) e compara
+    python tools/carga_api.py --comparar --clientes 500 --segundos 30
+
+Cada cliente repete as leituras quentes (lista de processos, detalhe,
+resumo do dashboard e documentos) em laço até o fim do tempo. Os ids são
+lidos da própria API no início. Mede requisições/s, latência (p50/p95/p99)
+e erros; com --comparar usa o mesmo DATABASE_URL do ambiente nos dois modos.
+"""
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+async def _rotas(cliente: httpx.AsyncClient) -> List[str]:
+    resp = await cliente.get("/api/processos/", params={"page_size": 100})
+    resp.raise_for_status()
+    ids = [item["id"] for item in resp.json()["items"]]
+    rotas = ["/api/processos/", "/api/processos/?page=2&page_size=50", "/api/processos/stats/summary"]
+    for processo_id in ids:
+        rotas += [f"/api/processos/{processo_id}", f"/api/documentos/{processo_id}/documentos"]
+    return rotas
+
+
+async def _cliente(cliente: httpx.AsyncClient, rotas: List[str], fim: float, latencias: List[float], erros: Dict[str, int]):
+    rng = random.Random()
+    while time.perf_counter() < fim:
+        inicio = time.perf_counter()
+        try:
+            resp = await cliente.get(rng.choice(rotas))
+            if resp.status_code >= 400:
+                erros[str(resp.status_code)] = erros.get(str(resp.status_code), 0) + 1
+                continue
+        except httpx.HTTPError as e:
+            erros[type(e).__name__] = erros.get(type(e).__name__, 0) + 1
+            continue
+        latencias.append(time.perf_counter() - inicio)
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    return valores[min(len(valores) - 1, int(len(valores) * p))] * 1000
+
+
+async def carga(url: str, clientes: int, segundos: float) -> dict:
+    limites = httpx.Limits(max_connections=clientes, max_keepalive_connections=clientes)
+    async with httpx.AsyncClient(base_url=url, limits=limites, timeout=60) as cliente:
+        rotas = await _rotas(cliente)
+        latencias: List[float] = []
+        erros: Dict[str, int] = {}
+        fim = time.perf_counter() + segundos
+        inicio = time.perf_counter()
+        await asyncio.gather(*(_cliente(cliente, rotas, fim, latencias, erros) for _ in range(clientes)))
+        duracao = time.perf_counter() - inicio
+        pool = (await cliente.get("/health/db")).json()
+
+    latencias.sort()
+    return {
+        "requisicoes": len(latencias),
+        "rps": len(latencias) / duracao,
+        "p50_ms": _percentil(latencias, 0.50),
+        "p95_ms": _percentil(latencias, 0.95),
+        "p99_ms": _percentil(latencias, 0.99),
+        "erros": erros,
+        "pool": pool,
+    }
+
+
+def _subir_api(porta: int, leitura_async: bool) -> subprocess.Popen:
+    env = dict(os.environ, API_LEITURA_ASYNC=str(leitura_async).lower())
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "fc_core.api.main:app", "--port", str(porta), "--log-level", "warning"],
+        env=env
+    )
+    for _ in range(100):
+        try:
+            if httpx.get(f"http://127.0.0.1:{porta}/health", timeout=1).status_code == 200:
+                return processo
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    processo.terminate()
+    raise RuntimeError("API não respondeu em /health")
+
+
+def _imprimir(modo: str, r: dict):
+    print(f"{modo:<8} {r['requisicoes']:>10} {r['rps']:>9.1f} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f}  {r['erros'] or '-'}")
+    print(f"{'':<8} pool: {r['pool']}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clientes", type=int, default=500)
+    parser.add_argument("--segundos", type=float, default=30)
+    parser.add_argument("--comparar", action="store_true", help="Sobe a API local nos modos async e síncrono")
+    parser.add_argument("--porta", type=int, default=8765, help="Porta da API local (--comparar)")
+    args = parser.parse_args(argv)
+
+    print(f"{args.clientes} clientes, {args.segundos:.0f}s\n")
+    print(f"{'modo':<8} {'requisições':>10} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  erros")
+    if not args.comparar:
+        _imprimir("-", asyncio.run(carga(args.url, args.clientes, args.segundos)))
+        return
+
+    for leitura_async in (True, False):
+        processo = _subir_api(args.porta, leitura_async)
+        try:
+            resultado = asyncio.run(carga(f"http://127.0.0.1:{args.porta}", args.clientes, args.segundos))
+        finally:
+            processo.terminate()
+            processo.wait()
+        _imprimir("async" if leitura_async else "sync", resultado)
+
+
+if __name__ == "__main__":
+    main()
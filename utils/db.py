@@ -4,6 +4,11 @@ from sqlalchemy import create_engine, text
 import pandas as pd
 
 MYSQL_URI = os.getenv("MYSQL_URI", "")
+# Mesmo teto por processo da API/workers (fc_core.core.database); o app Streamlit é um processo só
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE") or 5)
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW") or 2)
+POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT_SECONDS") or 10)
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE_SECONDS") or 1800)
 
 def ensure_uri():
     if not MYSQL_URI:
@@ -13,7 +18,14 @@ def ensure_uri():
 @lru_cache(maxsize=1)
 def engine():
     uri = ensure_uri()
-    return create_engine(uri, pool_pre_ping=True)
+    return create_engine(
+        uri,
+        pool_pre_ping=True,
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        pool_recycle=POOL_RECYCLE,
+    )
 
 def quick_check():
     with engine().connect() as conn: